@@ -0,0 +1,139 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Confidence-weight calibration
+#
+# Feature matrix columns match compute_confidence: (1-U, M, Y, C, P).
+# Weights are searched exhaustively over a simplex grid (all non-negative
+# weight vectors summing to 1 at the given step). Each candidate is scored by
+# AUC against graded outcomes; everything is a single matrix product plus a
+# row-wise rank, done in chunks to bound memory. Scores are quantized, so ties
+# are common: tied scores share their average rank (midranks), which keeps the
+# AUC, and the chosen weights, independent of sample order.
+
+WEIGHT_KEYS = ("U", "M", "Y", "C", "P")
+GRID_STEP = 0.05
+CHUNK = 2048
+PACE_GRID = np.round(np.arange(0.30, 0.71, 0.05), 2)
+MIN_PICKS = 20
+
+
+def simplex_grid(step: float = GRID_STEP, dims: int = len(WEIGHT_KEYS)) -> np.ndarray:
+    """All weight vectors on a `step` lattice with non-negative entries summing to 1."""
+    n = int(round(1 / step))
+    rows = []
+    # stars and bars: choose dims-1 bar positions among n+dims-1 slots
+    for bars in combinations(range(n + dims - 1), dims - 1):
+        prev = -1
+        parts = []
+        for b in bars:
+            parts.append(b - prev - 1)
+            prev = b
+        parts.append(n + dims - 2 - prev)
+        rows.append(parts)
+    return np.asarray(rows, dtype=np.float64) / n
+
+
+def to_matrix(feature_rows: List[List[float]]) -> np.ndarray:
+    """(U, M, Y, C, P) rows → model matrix with U flipped to 1-U."""
+    X = np.asarray(feature_rows, dtype=np.float64)
+    X[:, 0] = 1 - X[:, 0]
+    return X
+
+
+def auc_rows(scores: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """AUC of every candidate row in scores (k × n) against binary labels y (Mann–Whitney U)."""
+    pos = y.astype(bool)
+    n_pos = int(pos.sum())
+    n_neg = len(y) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return np.full(scores.shape[0], 0.5)
+
+    # Row-wise sort keeps memory contiguous; tied scores share their midrank
+    order = np.argsort(scores, axis=1)
+    rank_sum = (pos[order] * midranks(scores, order)).sum(axis=1)
+    return (rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def midranks(scores: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """1-based ranks of each row's sorted scores (scores[row, order[row]]), ties averaged."""
+    s = np.take_along_axis(scores, order, axis=1)
+    k, n = s.shape
+    idx = np.arange(n)
+    starts = np.ones((k, n), dtype=bool)
+    starts[:, 1:] = s[:, 1:] != s[:, :-1]
+    ends = np.ones((k, n), dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, idx, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, idx, n - 1)[:, ::-1], axis=1)[:, ::-1]
+    return (first + last) / 2 + 1
+
+
+def best_weights(X: np.ndarray, y: np.ndarray, grid: np.ndarray) -> Tuple[np.ndarray, float]:
+    best_auc, best_w = -1.0, grid[0]
+    for i in range(0, len(grid), CHUNK):
+        W = grid[i:i + CHUNK]
+        aucs = auc_rows(W @ X.T, y)
+        j = int(np.argmax(aucs))
+        if aucs[j] > best_auc:
+            best_auc, best_w = float(aucs[j]), W[j]
+    return best_w, best_auc
+
+
+def _fit_fold(args) -> Tuple[np.ndarray, float]:
+    X, y, train, test, grid = args
+    w, _ = best_weights(X[train], y[train], grid)
+    held_out = auc_rows((X[test] @ w)[None, :], y[test])[0]
+    return w, float(held_out)
+
+
+def fit_weights(X: np.ndarray, y: np.ndarray, folds: int = 5, step: float = GRID_STEP,
+                workers: int = None) -> Dict:
+    """Cross-validated grid fit; folds run in parallel worker processes."""
+    grid = simplex_grid(step)
+    rng = np.random.default_rng(0)
+    fold_of = rng.integers(0, folds, size=len(y))
+
+    everything = np.ones(len(y), dtype=bool)
+    jobs = [
+        (X, y, fold_of != k, fold_of == k, grid)
+        for k in range(folds)
+    ]
+    # Full-data refit for the proposal runs alongside the folds, which only
+    # estimate how well it generalizes
+    jobs.append((X, y, everything, everything, grid))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_fit_fold, jobs))
+
+    w, auc = results.pop()
+    fold_weights = np.array([fw for fw, _ in results])
+    fold_aucs = [fa for _, fa in results]
+
+    return {
+        "weights": {k: round(float(v), 4) for k, v in zip(WEIGHT_KEYS, w)},
+        "train_auc": round(auc, 4),
+        "cv_auc": round(float(np.mean(fold_aucs)), 4),
+        "fold_weight_std": {k: round(float(v), 4) for k, v in zip(WEIGHT_KEYS, fold_weights.std(axis=0))},
+    }
+
+
+def fit_label_thresholds(conf: np.ndarray, tiers: int = 4) -> List[float]:
+    """Cut confidence into equally populated tiers (POINTS_CONFIDENCE_MAP minus the 1.01 cap)."""
+    qs = np.linspace(0, 1, tiers + 1)[1:-1]
+    return [round(float(c), 2) for c in np.quantile(conf, qs)]
+
+
+def fit_pace_trigger(pace: np.ndarray, y: np.ndarray) -> Tuple[float, Dict[str, int]]:
+    """Pick the pace cut-off that maximizes net wins among the alerts it would fire."""
+    fired = pace[:, None] < PACE_GRID[None, :]
+    wins = (fired & y.astype(bool)[:, None]).sum(axis=0)
+    picks = fired.sum(axis=0)
+    net = np.where(picks >= MIN_PICKS, 2 * wins - picks, np.iinfo(np.int64).min)
+
+    j = int(np.argmax(net))
+    return float(PACE_GRID[j]), {"wins": int(wins[j]), "losses": int(picks[j] - wins[j])}
@@ -0,0 +1,51 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from app.constants import SLATE_ROLLOVER_HOURS
+
+# Current time for everything an AlertEngine (app/engine.py) drives
+#
+# AlertEngine.context() makes the engine's injected clock current with
+# use_clock(), so the date-keyed state it touches further down (join tables,
+# live-tracker files, roster refresh stamps, performance logs) follows that
+# clock instead of the wall clock. Like http_client.use_client it applies to
+# the current context only; work handed to a thread pool needs
+# contextvars.copy_context().run.
+#
+# Rate limits, circuit breakers and halftime leases deliberately stay on wall
+# time: they're shared with other processes through state files and SQLite.
+
+
+def wall_clock() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+_clock: ContextVar[Callable[[], datetime]] = ContextVar("clock", default=wall_clock)
+
+
+@contextmanager
+def use_clock(clock: Callable[[], datetime]):
+    """Make `clock` (() -> aware datetime) current within this context."""
+    token = _clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _clock.reset(token)
+
+
+def now() -> datetime:
+    return _clock.get()()
+
+
+def slate_date(when: Optional[datetime] = None) -> date:
+    """
+    The night a moment belongs to: the local date, except that the first
+    SLATE_ROLLOVER_HOURS after midnight still count as the previous night, so a
+    late game's halftime lands in the same join table, log and live files as
+    its tip-off.
+    """
+    local = (when or now()).astimezone()
+    return (local - timedelta(hours=SLATE_ROLLOVER_HOURS)).date()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.constants import CLOSING_GRACE, CLOSING_GROUP_WINDOW, CLOSING_LEAD, CLOSING_RETRY
+from app.leagues import League, NBA
+from app.odds_api import (
+    fetch_event_lines,
+    get_closing_captured,
+    get_pregame_events,
+    record_closing_lines,
+)
+from app.teams import MatchupKey
+
+# Closing-line capture
+#
+# pregame_setup records lines whenever it runs, hours before a late tip. This
+# schedules a capture per game at commence_time - CLOSING_LEAD and overwrites
+# that game's pregame baseline with the close, so halftime movement is
+# measured from the true closing line. Games whose capture times fall within
+# CLOSING_GROUP_WINDOW of each other share one request: the Odds API bills per
+# market, not per event, so a 7:00 + 7:10 pair costs the same as one game.
+
+Slot = Tuple[MatchupKey, str, datetime]     # (matchup key, Odds API event ID, tip time)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def pending_games(league: League = NBA) -> List[Slot]:
+    """Games from the pregame file whose closing line hasn't been captured yet, by tip time."""
+    captured = get_closing_captured(league)
+    slots = [
+        (key, ev["id"], datetime.fromisoformat(ev["commence"]))
+        for key, ev in get_pregame_events(league).items()
+        if key not in captured and ev.get("id") and ev.get("commence")
+    ]
+    return sorted(slots, key=lambda s: s[2])
+
+
+def capture_time(slot: Slot) -> datetime:
+    return slot[2] - timedelta(seconds=CLOSING_LEAD)
+
+
+def group_slots(slots: List[Slot]) -> List[List[Slot]]:
+    """Batch games whose capture times are within CLOSING_GROUP_WINDOW of the batch's first."""
+    groups: List[List[Slot]] = []
+    for slot in slots:
+        if groups and capture_time(slot) - capture_time(groups[-1][0]) <= timedelta(seconds=CLOSING_GROUP_WINDOW):
+            groups[-1].append(slot)
+        else:
+            groups.append([slot])
+    return groups
+
+
+def due_groups(league: League = NBA, now: Optional[datetime] = None):
+    """(groups due now, games missed, next capture time or None)."""
+    now = now or _utc_now()
+    due, missed = [], []
+    pending = []
+
+    for slot in pending_games(league):
+        if now > slot[2] + timedelta(seconds=CLOSING_GRACE):
+            missed.append(slot)          # long tipped off: live lines, not a close
+        else:
+            pending.append(slot)
+
+    upcoming = None
+    for group in group_slots(pending):
+        if capture_time(group[0]) <= now:
+            due.append(group)
+        elif upcoming is None:
+            upcoming = capture_time(group[0])
+
+    return due, missed, upcoming
+
+
+def capture_due(league: League = NBA, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Capture every due group (one Odds API request each); returns the next capture time."""
+    now = now or _utc_now()
+    due, missed, upcoming = due_groups(league, now)
+
+    for key, _, tip in missed:
+        print(f"⌛ {league.label} {league.teams.matchup_str(key)} tipped at {tip:%H:%M}Z; closing line missed.")
+    if missed:
+        record_closing_lines({}, league, missed=[key for key, _, _ in missed])
+
+    for group in due:
+        ids: Dict[str, MatchupKey] = {event_id: key for key, event_id, _ in group}
+        lines = fetch_event_lines(list(ids), league)
+        if lines is None:
+            # Failed or over quota: try again shortly, until the grace period runs out
+            retry = now + timedelta(seconds=CLOSING_RETRY)
+            upcoming = min(upcoming, retry) if upcoming else retry
+            continue
+
+        record_closing_lines(lines, league)
+        names = ", ".join(league.teams.matchup_str(k) for k in lines)
+        print(f"🔒 {league.label} closing lines captured in 1 request: {names or 'none returned'}")
+
+    return upcoming
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+from typing import Any
+
+# JSON codec used for every HTTP payload and state file.
+#
+# orjson (if installed) decodes the ESPN summary / full-slate odds documents
+# several times faster than the stdlib and encodes straight to bytes; without
+# it everything falls back to the stdlib json module with identical results.
+# State files are written compact and atomically: a uniquely named temp file in
+# the same directory, fsynced, then renamed over the target, so several
+# processes (check_halftimes_once, halftime workers, capture_closing_lines)
+# can write the same file without clobbering each other's temp file.
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def loads(data) -> Any:
+    """Decode bytes or str."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """Encode to UTF-8 bytes; compact unless pretty (2-space indent)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def read(path: str, default=None) -> Any:
+    """Decode a JSON file, or return default if it doesn't exist."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write(path: str, obj, pretty: bool = False):
+    """Atomically replace path with obj encoded as JSON."""
+    write_raw(path, dumps(obj, pretty))
+
+
+def write_raw(path: str, data: bytes):
+    """Atomically replace path with already-encoded bytes (e.g. a snapshot taken under a lock)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)        # mkstemp creates 0600
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def append_lines(path: str, rows):
+    """Append rows as JSON lines."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        for row in rows:
+            f.write(dumps(row) + b"\n")
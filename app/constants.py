@@ -1,13 +1,61 @@
 # General runtime
+import os
 import random
 
+from app import codec
+
 
 HALFTIME_CHECK_INTERVAL = 300   # seconds between scoreboard polls
 SEASON = "2026"
 TOP_SCORER_LIMIT = 50
+MAX_CONCURRENT_GAMES = 16       # halftime games analyzed in parallel per tick
+SLATE_ROLLOVER_HOURS = 6        # local hours after midnight that still belong to the previous night's slate
+
+# Circuit breakers / hedged requests (app/resilience.py)
+BREAKER_FAILURE_THRESHOLD = 3   # consecutive failures before the circuit opens
+BREAKER_COOLDOWN = 120          # seconds an open circuit fails fast before probing
+HEDGE_PERCENTILE = 0.95         # hedge once a request outlives this latency percentile
+HEDGE_MIN_BUDGET = 0.5          # never hedge sooner than this (seconds)
+LATENCY_SAMPLES = 50            # recent latencies kept per upstream
+
+# Shared upstream rate limits (requests per second, burst)
+RATE_LIMITS = {
+    "espn": (10.0, 20),
+    "odds": (2.0, 4),
+    "discord": (2.5, 5),
+    "nba_cdn": (5.0, 10),
+}
+
+# Stats providers (app/providers/)
+PROVIDER_EWMA_ALPHA = 0.3       # weight of the newest sample in a provider's latency / error averages
+PROVIDER_ERROR_PENALTY = 4.0    # score = latency × (1 + penalty × error rate); lowest is tried first
+
+# Odds API quota (app/odds_quota.py) and closing-line capture (app/closing_lines.py)
+ODDS_REGIONS = "us"
+ODDS_QUOTA_RESERVE = 50         # keep this many requests back for halftime lookups
+CLOSING_LEAD = 300              # capture a game's closing line this many seconds before tip
+CLOSING_GROUP_WINDOW = 900      # games tipping within this many seconds share one request
+CLOSING_GRACE = 600             # still capture up to this long after tip; later counts as missed
+CLOSING_RETRY = 60              # seconds before retrying a failed capture
+PROPS_CACHE_TTL = 1200          # player points lines are reused for the rest of the half
+HALFTIME_AFTER_TIP = 4500       # typical seconds from tip-off to halftime, for the halftime odds planner
+FREE_LINE_SPREAD_MARGIN = 1.0   # ESPN spread moves within this many pts of the trigger still buy the Odds API line
+FREE_LINE_TOTAL_MARGIN = 0.01   # same for totals, as a fraction of the pregame total
+
+# Halftime worker processes (app/leases.py, scripts/halftime_worker.py)
+LEASE_TTL = 90                  # seconds a game lease survives without a heartbeat
+WORKER_HEARTBEAT = 20           # seconds between worker heartbeats / scoreboard polls
 
-# Thresholds
+# In-game tracking (app/live_tracker.py, app/pbp.py)
+LIVE_POLL_INTERVAL = 120        # seconds between second-half polls of alerted games
+PBP_PAGE_SIZE = 300             # plays per ESPN core API page
+PBP_CURSOR_TTL = 12 * 3600      # seconds before an untouched play-by-play cursor is pruned
+
+# Thresholds (NBA defaults; per-league overrides live in app/leagues.py)
+SPREAD_MOVE_TRIGGER = 3.0                # pts of live spread movement
+TOTAL_MOVE_TRIGGER = 0.05                # 5% live total movement
 PERCENT_UNDERPERFORMANCE_TRIGGER = 0.4   # 40% of average at halftime
+PACE_TRIGGER = 0.50                      # player alert fires below 50% of season avg at half
 MIN_MINUTES_FOR_VALID_SAMPLE = 5.0       # ignore players with less than 5 min
 
 # Confidence model weights
@@ -24,6 +72,19 @@ EXPECTED_HALF_MINUTES = 18.0
 EXPECTED_LEAGUE_LEADER_PPG = 30.0
 EXPECTED_HALF_FGA = 10.0
 
+# Monte Carlo second-half projections (app/projections.py)
+PROJECTION_SIMS = 20000          # simulations per game
+PROJECTION_PRIOR_MINUTES = 24.0  # season scoring rate counts as this many minutes of evidence
+PLAYER_RATE_SHAPE = 8.0          # gamma shape of a player's 2H scoring-rate uncertainty
+PLAYER_MINUTES_SD = 0.15         # 2H minutes sd, as a fraction of the expected minutes
+BLOWOUT_MARGIN = 15              # margins beyond this start cutting starters' 2H minutes
+TOTAL_PACE_PRIOR = 0.6           # weight of the pregame total vs first-half pace in the 2H mean
+TOTAL_SECOND_HALF_SD = 13.0      # NBA 2H combined points sd; scaled by sqrt(mean / 115)
+
+# Per-player baselines from the season store (state/season_store)
+BASELINE_WINDOW = 10      # rolling window, games
+MIN_BASELINE_GAMES = 5    # fall back to the league-wide constants below this
+
 TEAM_MAP = {
     "ATL": "Atlanta Hawks",
     "BOS": "Boston Celtics",
@@ -57,16 +118,48 @@ TEAM_MAP = {
     "WAS": "Washington Wizards",
 }
 
-ESPN_TEAM_MAP = {
+# ESPN short codes (and other stray aliases) → our abbreviation
+ESPN_TEAM_ALIASES = {
     "NO": "NOP",
     "GS": "GSW",
     "PHO": "PHX",
     "SA": "SAS",
     "NY": "NYK",
-    "UTA": "UTAH",
+    "UTAH": "UTA",
+    "WSH": "WAS",
+    "INDY": "IND",
+    "CHAR": "CHA",
+    "BRK": "BKN",
+    "NJ": "BKN",
+    "LA CLIPPERS": "LAC",
 }
 
-REV_ESPN_TEAM_MAP = {v: k for k, v in ESPN_TEAM_MAP.items()}
+WNBA_TEAM_MAP = {
+    "ATL": "Atlanta Dream",
+    "CHI": "Chicago Sky",
+    "CON": "Connecticut Sun",
+    "DAL": "Dallas Wings",
+    "GSV": "Golden State Valkyries",
+    "IND": "Indiana Fever",
+    "LVA": "Las Vegas Aces",
+    "LAS": "Los Angeles Sparks",
+    "MIN": "Minnesota Lynx",
+    "NYL": "New York Liberty",
+    "PHX": "Phoenix Mercury",
+    "POR": "Portland Fire",
+    "SEA": "Seattle Storm",
+    "TOR": "Toronto Tempo",
+    "WAS": "Washington Mystics",
+}
+
+WNBA_ESPN_TEAM_ALIASES = {
+    "GS": "GSV",
+    "LV": "LVA",
+    "LA": "LAS",
+    "NY": "NYL",
+    "WSH": "WAS",
+    "CONN": "CON",
+}
 
 POINTS_CONFIDENCE_MAP = [
     (0.30, ["Fade him", "Pass on it", "Skip it", "Nah this a guy b bet"]),
@@ -82,6 +175,17 @@ TOTAL_CONFIDENCE_MAP = [
     (1.01, ["Hammer the", "Slam the", "Unload on the", "No-brainer on the"]),
 ]
 
+# Total alerts with a halftime score are labelled by the simulated edge
+# (app/projections.py: P(favoured side) - 0.5), not by the size of the line
+# move, so they get their own cut-offs over the same phrases (grading's tiers
+# still line up). PROVISIONAL: set by hand from the simulation's spread of
+# edges; neither these cut-offs nor project_total's probabilities have been
+# calibrated against graded totals yet (scripts/calibrate_confidence.py only
+# fits the points map).
+TOTAL_EDGE_CONFIDENCE_MAP = [
+    (edge, phrases) for edge, (_, phrases) in zip((0.10, 0.20, 0.30, 0.51), TOTAL_CONFIDENCE_MAP)
+]
+
 SPREADS_CONFIDENCE_MAP = [
     (3.0, ["Not worth touching", "Avoid", "Stay away from", "Don’t bother with"]),
     (6.0, ["Consider taking", "Worth a look at", "Could back", "I don’t mind"]),
@@ -89,16 +193,52 @@ SPREADS_CONFIDENCE_MAP = [
     (999, ["Hammer", "Slam", "Unload on", "Ride or die with"]),
 ]
 
-def confidence_to_label(conf, alert_type):
+# Calibrated overrides (written by scripts/calibrate_confidence.py, adopted by
+# renaming confidence_weights.proposed.json → confidence_weights.json)
+CONFIDENCE_WEIGHTS_FILE = "state/confidence_weights.json"
+
+def _load_calibrated_weights(path=CONFIDENCE_WEIGHTS_FILE):
+    global CONFIDENCE_WEIGHTS, PACE_TRIGGER, POINTS_CONFIDENCE_MAP
+
+    if not os.path.exists(path):
+        return
+
+    try:
+        data = codec.read(path)
+    except Exception as e:
+        print(f"⚠️ Failed to load calibrated weights: {e}")
+        return
+
+    if set(data.get("weights", {})) == set(CONFIDENCE_WEIGHTS):
+        CONFIDENCE_WEIGHTS = data["weights"]
+    if data.get("pace_trigger"):
+        PACE_TRIGGER = data["pace_trigger"]
+
+    cuts = data.get("points_thresholds") or []
+    if len(cuts) == len(POINTS_CONFIDENCE_MAP) - 1:
+        POINTS_CONFIDENCE_MAP = [
+            (cut, phrases) for cut, (_, phrases) in zip(cuts + [1.01], POINTS_CONFIDENCE_MAP)
+        ]
+
+
+_load_calibrated_weights()
+
+def confidence_map(alert_type):
     if alert_type == "TOTAL":
-        map = TOTAL_CONFIDENCE_MAP
-    elif alert_type == "SPREAD":
-        map = SPREADS_CONFIDENCE_MAP
-    else:
-        map = POINTS_CONFIDENCE_MAP
+        return TOTAL_CONFIDENCE_MAP
+    if alert_type == "TOTAL_EDGE":
+        return TOTAL_EDGE_CONFIDENCE_MAP
+    if alert_type == "SPREAD":
+        return SPREADS_CONFIDENCE_MAP
+    return POINTS_CONFIDENCE_MAP
 
-    for threshold, label in map:
+def confidence_to_label(conf, alert_type):
+    for threshold, label in confidence_map(alert_type):
         if conf <= threshold:
             return random.choice(label)
 
-    return "🟦 UNKNOWN"
\ No newline at end of file
+    return "🟦 UNKNOWN"
+
+def tier_to_label(tier, alert_type):
+    """Phrase for a tier precomputed from the same map (app/trigger_plans.py)."""
+    return random.choice(confidence_map(alert_type)[tier][1])
\ No newline at end of file
@@ -1,4 +1,16 @@
-import requests
+import hashlib
+
+from app import http_client
+
+
+def webhook_upstream(webhook: str) -> str:
+    """
+    Circuit-breaker name for one webhook. Each subscriber's channel gets its own
+    breaker, so a deleted or rate-limited webhook doesn't block everyone else.
+    (sha1, not hash(): the name is persisted and must match across processes.)
+    """
+    return "discord:" + hashlib.sha1(webhook.encode()).hexdigest()[:10]
+
 
 def send_discord_alert(message, webhook, title):
     """Send a message to your Discord channel via webhook."""
@@ -12,8 +24,7 @@ def send_discord_alert(message, webhook, title):
         ]
     }
     try:
-        r = requests.post(webhook, json=payload, timeout=5)
-        r.raise_for_status()
+        http_client.post_json(webhook_upstream(webhook), webhook, payload, timeout=5)
         print("✅ Discord alert sent.")
     except Exception as e:
         print(f"⚠️ Failed to send Discord alert: {e}")
@@ -0,0 +1,476 @@
+from __future__ import annotations
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app import codec, http_client, odds_api, resilience
+from app.clock import slate_date, use_clock, wall_clock
+from app.constants import MAX_CONCURRENT_GAMES, PBP_CURSOR_TTL
+from app.discord_alert import send_discord_alert
+from app.espn_api import get_top_scorers, normalize_name
+from app.join_table import JoinTable
+from app.leagues import League, NBA
+from app.leases import LeaseStore
+from app.live_tracker import track
+from app.odds_api import (
+    OddsState,
+    degraded_markets,
+    get_player_points_lines,
+    get_pregame_events,
+    prefetch_halftime_lines,
+    record_all_pregame_lines,
+    record_scoreboard_lines,
+    refresh_pregame_lines,
+    use_join_table,
+)
+from app.pbp import prune_cursors
+from app.player_alerts import analyze_game_players
+from app.profiling import Profiler
+from app.providers import fetch_boxscore_players, get_today_games, iter_halftimes
+from app.records import Game
+from app.season_store import SeasonStore
+from app.spread_alerts import analyze_spread_movement
+from app.subscriptions import Router
+from app.team_index import TeamIndex
+from app.total_alerts import analyze_total_movement
+from app.trigger_plans import compile_plans, load_plans, save_plans
+
+# Alert engine
+#
+#   engine = AlertEngine([NBA, WNBA])
+#   engine.record_pregame()      # afternoon: lines, join table, rosters, trigger plans
+#   engine.tick()                # every few minutes: post new halftimes
+#
+# Everything the pipeline touches from outside comes in through the
+# constructor, so a service can keep several engines warm side by side and a
+# test can drive one with fakes:
+#
+#   http    client for every upstream call (see http_client.use_client);
+#           None = app.http_client's own rate-limited, circuit-broken layer
+#   state   where posted halftimes are remembered (ProcessedStore)
+#   clock   () -> aware datetime; drives the odds caches and every date the
+#           engine keys state by (app/clock.py): logs, join tables, live files
+#   sink    send(message, webhook, title); defaults to Discord
+#   claims  exactly-once halftime claims shared with halftime workers (LeaseStore)
+#
+# Odds caches live in the engine's own OddsState and each engine has its own
+# performance loggers. Not isolated: the per-upstream rate limits, circuit
+# breakers, odds quota and halftime leases are process-wide (or cross-process)
+# on purpose and run on wall time. scripts/check_halftimes_once.py,
+# scripts/pregame_setup.py and scripts/halftime_worker.py are thin wrappers.
+
+PROCESSED_FILE = "state/processed_games.json"
+FEATURES_DIR = "logs/features"       # halftime feature rows for scripts/calibrate_confidence.py
+
+
+class ProcessedStore:
+    """ESPN event IDs whose halftime has been posted today."""
+
+    def __init__(self, path: str = PROCESSED_FILE):
+        self.path = path
+
+    def load(self) -> Set[str]:
+        try:
+            return set(codec.read(self.path, {}).get("ids", []))
+        except Exception:
+            return set()
+
+    def save(self, ids: Iterable[str]):
+        codec.write(self.path, {"ids": list(ids)})
+
+    def reset(self):
+        self.save([])
+
+
+class DailyLogHandler(logging.Handler):
+    """Appends to <directory>/<date>.log, the date re-read from `day` for every record."""
+
+    def __init__(self, directory: str, day: Callable[[], date]):
+        super().__init__()
+        self.directory = directory
+        self.day = day
+        self._day: Optional[date] = None
+        self._file: Optional[logging.FileHandler] = None
+
+    def emit(self, record):
+        today = self.day()
+        with self.lock:
+            if today != self._day:
+                if self._file is not None:
+                    self._file.close()
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = logging.FileHandler(os.path.join(self.directory, f"{today.isoformat()}.log"), encoding="utf-8")
+                self._file.setFormatter(self.formatter)
+                self._day = today
+            self._file.emit(record)
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+
+def league_logger(league: League, clock: Callable[[], datetime]) -> logging.Logger:
+    """
+    Performance log per league (NBA keeps logs/performance_logs/<date>.log). Not
+    registered with logging.getLogger: each engine owns its loggers, and a warm
+    engine rolls over to the next day's file by its own clock.
+    """
+    logger = logging.Logger(f"alerts.{league.key}", logging.INFO)
+    handler = DailyLogHandler(league.log_dir, lambda: slate_date(clock()))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+def load_top_scorers_by_name(league: League = NBA):
+    path = league.top_scorers_path
+    if not os.path.exists(path):
+        if league is NBA:
+            raise FileNotFoundError("❌ Missing state/top_scorers.json. Run pregame_setup first.")
+        print(f"⚠️ No {path}; {league.label} player alerts disabled.")
+        return {}
+
+    data = codec.read(path)
+
+    out = {}
+    for info in data.get("players", []):
+        norm = normalize_name(info["name"])
+        out[norm] = {
+            "name": info["name"],
+            "ppg": info["ppg"],
+            "ppg_weight": info["ppg_weight"]
+        }
+
+    return out
+
+def format_pregame_lines(pregame):
+    # ABBR keys only; ESPN's scoreboard line where the Odds API had none
+    free = pregame.get("free", {})
+    spreads = {**free.get("spreads", {}), **pregame["spreads"]}
+    totals  = {**free.get("totals", {}), **pregame["totals"]}
+
+    lines = []
+
+    for abbr in sorted(spreads.keys() | totals.keys()):
+        if "@" not in abbr:
+            continue
+
+        spread = spreads.get(abbr)
+        total  = totals.get(abbr)
+
+        parts = []
+        if spread is not None:
+            # home team = right side of "A @ B"
+            home = abbr.split(" @ ")[1]
+            parts.append(f"{home} {spread:+.1f}")
+        if total is not None:
+            parts.append(f"Total {total:.1f}")
+
+        lines.append(f"{abbr}\n" + " | ".join(parts))
+
+    return lines
+
+
+class AlertEngine:
+    def __init__(self, leagues: Iterable[League] = (NBA,), http=None, state: Optional[ProcessedStore] = None,
+                 clock: Optional[Callable[[], datetime]] = None,
+                 sink: Callable[[str, str, str], None] = send_discord_alert,
+                 claims: Optional[LeaseStore] = None, router: Optional[Router] = None,
+                 prof: Optional[Profiler] = None, max_workers: int = MAX_CONCURRENT_GAMES):
+        self.leagues = list(leagues)
+        self.http = http
+        self.state = state or ProcessedStore()
+        self.clock = clock or wall_clock
+        self.sink = sink
+        self.odds = OddsState(self.clock)
+        self.prof = prof or Profiler("engine")
+        self._claims = claims
+        self._router = router
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="engine")
+        self._loggers: Dict[str, logging.Logger] = {}
+        self._loggers_lock = threading.Lock()
+
+    @property
+    def claims(self) -> LeaseStore:
+        if self._claims is None:
+            self._claims = LeaseStore()
+        return self._claims
+
+    @property
+    def router(self) -> Router:
+        # Re-read subscriptions on every use unless one was injected
+        return self._router or Router.from_config(send=self.sink)
+
+    @contextmanager
+    def context(self):
+        """Make this engine's HTTP client and odds state current."""
+        with http_client.use_client(self.http), odds_api.use_state(self.odds), use_clock(self.clock):
+            yield self
+
+    def logger(self, league: League) -> logging.Logger:
+        with self._loggers_lock:
+            logger = self._loggers.get(league.key)
+            if logger is None:
+                logger = self._loggers[league.key] = league_logger(league, self.clock)
+            return logger
+
+    def _submit(self, fn, *args):
+        return self._pool.submit(contextvars.copy_context().run, self.prof.wrap(fn), *args)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for logger in self._loggers.values():
+            for handler in logger.handlers:
+                handler.close()
+
+    # --- Pregame ---
+
+    def record_pregame(self):
+        """New day: forget posted halftimes, record pregame lines, join providers' IDs, refresh rosters, compile trigger plans."""
+        with self.context():
+            self.state.reset()
+            print("🔄 Reset processed_games.json for a new day.")
+            if prune_cursors(time.time() - PBP_CURSOR_TTL):
+                print("🧹 Pruned play-by-play cursors of finished games.")
+            router = self.router
+            for league in self.leagues:
+                self._setup_league(league, router)
+
+    def _setup_league(self, league: League, router: Router):
+        prof = self.prof
+        title = "🚀 Pregame Lines" if league is NBA else f"🚀 {league.label} Pregame Lines"
+
+        # Also teaches dynamic leagues tonight's teams before odds names are matched,
+        # and carries ESPN's free lines
+        with prof.stage(f"{league.key}.scoreboard"):
+            games = get_today_games(league)
+
+        with prof.stage(f"{league.key}.top_scorers"):
+            top_scorers = get_top_scorers(league=league)
+
+        with prof.stage(f"{league.key}.odds"):
+            pregame = record_all_pregame_lines(league, games)
+            lines = format_pregame_lines(pregame)
+
+        # The one cross-provider name match of the night; everything after joins by ID
+        with prof.stage(f"{league.key}.join"):
+            join = JoinTable(league, slate_date(self.clock()))
+            joined = join.build(games, get_pregame_events(league))
+            join.save()
+            use_join_table(join)
+            print(f"🔗 Joined {len(join.games)} {league.label} games ({joined} with Odds API event IDs).")
+
+        with prof.stage(f"{league.key}.rosters"):
+            index = TeamIndex(league)
+            refreshed = index.refresh(abbr for g in games for abbr in (g.away_abbr, g.home_abbr))
+            index.save()
+            print(f"👥 Refreshed {refreshed} {league.label} rosters.")
+
+        with prof.stage(f"{league.key}.trigger_plans"):
+            triggers = router.loosest(league)
+            store = SeasonStore.open() if league is NBA else None
+            plans = compile_plans(games, top_scorers, pregame, triggers, index, league, store)
+            save_plans(plans, triggers, league)
+            tracked = sum(len(p.players) for p in plans.values())
+            print(f"🗺️ Compiled {len(plans)} {league.label} trigger plans ({tracked} tracked scorers on tonight's rosters).")
+
+        with prof.stage(f"{league.key}.broadcast"):
+            if lines:
+                router.broadcast(league, "PREGAME", title, "\n\n".join(lines))
+            else:
+                router.broadcast(league, "PREGAME", title, "⚠️ No pregame lines found.")
+
+    # --- Halftimes ---
+
+    def tick(self) -> List[str]:
+        """One halftime check across the engine's leagues; returns the event IDs posted."""
+        prof = self.prof
+        processed = self.state.load()
+        new_ids: List[str] = []
+
+        with self.context():
+            print(f"[{self.clock().astimezone():%H:%M:%S}] Checking halftimes ({', '.join(lg.label for lg in self.leagues)})...")
+
+            # A warm engine outlives a slate: pick up new pregame/closing lines written elsewhere
+            for league in self.leagues:
+                refresh_pregame_lines(league)
+
+            # Tonight's join tables, read once for the whole tick
+            joins = {lg.key: JoinTable(lg, slate_date(self.clock())) for lg in self.leagues}
+
+            # Scoreboards for every league in parallel
+            with prof.stage("scoreboards"):
+                slates = [f.result() for f in [self._submit(iter_halftimes, lg, joins[lg.key]) for lg in self.leagues]]
+
+            # Halftime workers may be running too: only the process that wins the claim posts
+            jobs = [
+                (g, league)
+                for league, halftimes in zip(self.leagues, slates)
+                for g in halftimes
+                if g.game_id not in processed and self.claims.claim_halftime(g.game_id)
+            ]
+
+            if not any(slates):
+                print("❌ No halftimes right now.")
+            elif not jobs:
+                print("⚙️ All halftimes already processed.")
+            else:
+                new_ids = self.process_halftimes(jobs, joins)
+                print(f"✅ Processed {len(new_ids)} new halftimes.")
+
+        with prof.stage("save"):
+            self.state.save(processed | set(new_ids))
+            resilience.save()
+
+        return new_ids
+
+    def process_halftime(self, game: Game, league: League = NBA) -> bool:
+        """Claim and post one game's halftime (e.g. from a pushed event); False if already handled."""
+        with self.context():
+            if game.game_id in self.state.load() or not self.claims.claim_halftime(game.game_id):
+                return False
+            done = self.process_halftimes([(game, league)])
+
+        if done:
+            self.state.save(self.state.load() | set(done))
+        return bool(done)
+
+    def process_halftimes(self, jobs: List[Tuple[Game, League]],
+                          joins: Optional[Dict[str, JoinTable]] = None) -> List[str]:
+        """
+        Analyze and post claimed (game, league) halftimes; returns the processed event IDs.
+        joins: the tick's join tables by league key, if the caller already read them.
+        """
+        prof = self.prof
+        feature_rows = []
+        joins = joins or {}
+        with self.context():
+            with prof.stage("setup"):
+                router = self.router
+                context = {}
+                for league in {lg for _, lg in jobs}:
+                    refresh_pregame_lines(league)
+                    store = SeasonStore.open() if league is NBA else None
+                    context[league.key] = (
+                        load_top_scorers_by_name(league), store,
+                        load_plans(league, router.loosest(league)), TeamIndex(league),
+                        joins.get(league.key) or JoinTable(league, slate_date(self.clock())),
+                    )
+                    self._prefetch_lines(league, router, [g for g, lg in jobs if lg is league])
+
+            done = []
+            with prof.stage("games"):
+                futures = [
+                    self._submit(self._process_game, g, league, router, *context[league.key], feature_rows)
+                    for g, league in jobs
+                ]
+
+                for (g, _), fut in zip(jobs, futures):
+                    try:
+                        done.append(fut.result())
+                    except Exception as e:
+                        # _process_game only raises before anything was posted
+                        print(f"⚠️ Halftime processing failed: {e}")
+                        self.claims.unclaim_halftime(g.game_id)
+
+        if feature_rows:
+            codec.append_lines(f"{FEATURES_DIR}/{slate_date(self.clock()).isoformat()}.jsonl", feature_rows)
+        return done
+
+    def _prefetch_lines(self, league: League, router: Router, games: List[Game]):
+        """One odds request for every game of this league at halftime this tick that needs one."""
+        record_scoreboard_lines(games, league)
+        keys = [g.key for g in games if g.key is not None]
+        markets = tuple(
+            market for market, kind in (("spreads", "SPREAD"), ("totals", "TOTAL"))
+            if any(router.wants(league, kind, key) for key in keys)
+        )
+        prefetch_halftime_lines(keys, league, markets, router.loosest(league))
+
+    def _process_game(self, g, league, router, top_scorers, store, plans, index, join, feature_rows):
+        matchup_full = g.matchup             # ESPN abbreviations
+        event_id = g.game_id
+        home_score = g.home_score
+        away_score = g.away_score
+
+        print(f"⏱️ {league.label} halftime detected: {matchup_full} ({away_score}-{home_score})")
+
+        # Resolve matchup through the team registry (UTAH -> UTA, PHO -> PHX, etc.)
+        key = g.key
+        if key is None:
+            print(f"⚠️ Unmapped team alias in {matchup_full}; skipping line checks.")
+            abbr_matchup = matchup_full
+        else:
+            abbr_matchup = league.teams.matchup_str(key)
+
+        # --- Run analyses at the loosest thresholds any subscriber wants ---
+        triggers = router.loosest(league)
+        plan = plans.get(key) if key else None
+
+        # Neither roster has a tracked scorer: skip the ESPN summary, odds only
+        scorers = bool(top_scorers) and index.has_tracked(key, top_scorers)
+        if top_scorers and not scorers:
+            print(f"⏭️ {matchup_full}: no tracked scorers on either roster; skipping the boxscore.")
+
+        want_points = scorers and router.wants(league, "POINTS", key)
+        players = fetch_boxscore_players(event_id, league, join) if want_points else None
+
+        player_alerts = analyze_game_players(
+            event_id,
+            abbr_matchup,
+            top_scorers,
+            home_score,
+            away_score,
+            store,
+            feature_rows,
+            league,
+            triggers["pace"],
+            (lambda: get_player_points_lines(key, league)) if key else None,
+            plan.players if plan else None,
+            players,
+        ) if want_points else []
+
+        spread_alerts = analyze_spread_movement(
+            key, league, triggers["spread"], plan.spread if plan else None,
+        ) if key and router.wants(league, "SPREAD", key) else []
+        total_alerts = analyze_total_movement(
+            key, league, triggers["total"], home_score, away_score, plan.total if plan else None,
+        ) if key and router.wants(league, "TOTAL", key) else []
+
+        all_alerts = player_alerts + spread_alerts + total_alerts
+        title = f"📊 {matchup_full} Halftime" if league is NBA else f"📊 {league.label} {matchup_full} Halftime"
+
+        # Degraded-mode flags: say so explicitly instead of silently dropping sections
+        notes = [f"⚠️ Degraded: {market} odds {reason}" for market, reason in degraded_markets(league).items()]
+        if want_points and not players:
+            notes.append("⚠️ Degraded: player stats unavailable from every provider")
+
+        routed = router.route(league, key, all_alerts)
+        router.deliver(league, routed, title, empty_message="❌ Nothing notable.", notes=notes)
+
+        # Posted: a failure from here on must not hand the claim back (process_halftimes
+        # unclaims on error), or the next tick would post the same halftime again
+        try:
+            self._log_sent(g, league, all_alerts, routed, notes)
+        except Exception as e:
+            print(f"⚠️ {matchup_full} was posted, but logging it failed: {e}")
+
+        return event_id
+
+    def _log_sent(self, g: Game, league: League, all_alerts, routed, notes: List[str]):
+        """Log every alert that reached at least one subscriber."""
+        sent_ids = {id(a) for alerts in routed.values() for a in alerts}
+        sent = [a for a in all_alerts if id(a) in sent_ids]
+        if sent:
+            alert_text = "\n\n".join([a.text for a in sent] + notes)
+            self.logger(league).info(f"Halftime Alerts for {g.matchup} [{g.game_id}]:\n{alert_text}\n")
+            track(g.game_id, g.matchup, alert_text, league)      # graded live by scripts/track_live.py
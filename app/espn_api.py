@@ -1,19 +1,17 @@
 from __future__ import annotations
-import json
 import os
-import requests
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
-from app.constants import EXPECTED_LEAGUE_LEADER_PPG, TOP_SCORER_LIMIT, SEASON
-
-ESPN_SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-SUMMARY_URL_TMPL = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary?event={event_id}"
-TOP_SCORERS_PATH = "state/top_scorers.json"
+from app.constants import TOP_SCORER_LIMIT
+from app.leagues import League, NBA
+from app.records import Game, PlayerLine, parse_seconds, parse_made_attempted
+from app import clock, codec, http_client
 
 # Date window helpers (17:00–05:00 UTC)
 def _utc_now() -> datetime:
-    return datetime.now(timezone.utc)
+    # The current engine's clock (app/clock.py), so an injected clock picks the slate's ESPN dates too
+    return clock.now().astimezone(timezone.utc)
 
 def _espn_dates_for_window(now_utc: Optional[datetime] = None) -> List[str]:
     """
@@ -38,18 +36,19 @@ def _espn_dates_for_window(now_utc: Optional[datetime] = None) -> List[str]:
     return [today]
 
 # Fetch scoreboard payload
-def _fetch_scoreboard(date_str: str) -> Dict[str, Any]:
-    r = requests.get(ESPN_SCOREBOARD_URL, params={"dates": date_str}, timeout=10)
-    r.raise_for_status()
-    return r.json()
+def _fetch_scoreboard(date_str: str, league: League = NBA) -> Dict[str, Any]:
+    params = {"dates": date_str, **league.scoreboard_params}
+    return http_client.get_json("espn", league.scoreboard_url, params=params, timeout=10)
 
-def _iter_events_for_window() -> List[Dict[str, Any]]:
+def _iter_events_for_window(league: League = NBA, strict: bool = False) -> List[Dict[str, Any]]:
     seen = set()
     out = []
     for ds in _espn_dates_for_window():
         try:
-            data = _fetch_scoreboard(ds)
+            data = _fetch_scoreboard(ds, league)
         except Exception as e:
+            if strict:
+                raise            # a provider pool would rather fail over than see half a slate
             print(f"⚠️ ESPN fetch error for {ds}: {e}")
             continue
 
@@ -61,40 +60,7 @@ def _iter_events_for_window() -> List[Dict[str, Any]]:
 
     return out
 
-# Normalize event → matchup, scores, IDs
-def _to_matchup_abbr(ev: Dict[str, Any]) -> Optional[str]:
-    comps = ev.get("competitions") or []
-    if not comps:
-        return None
-    
-    home = away = None
-    for c in comps[0].get("competitors") or []:
-        abbr = (c.get("team") or {}).get("abbreviation")
-        if c.get("homeAway") == "home":
-            home = abbr
-        elif c.get("homeAway") == "away":
-            away = abbr
-
-    return f"{away} @ {home}" if home and away else None
-
-
-def _scores(ev: Dict[str, Any]):
-    comps = ev.get("competitions") or []
-    if not comps:
-        return None, None
-
-    home_score = away_score = None
-    for c in comps[0].get("competitors") or []:
-        score_str = c.get("score")
-        score = int(score_str) if score_str and score_str.isdigit() else None
-        if c.get("homeAway") == "home":
-            home_score = score
-        else:
-            away_score = score
-
-    return home_score, away_score
-
-
+# Normalize event → Game record
 def _status_fields(ev: Dict[str, Any]):
     """Safely extract game status info from ESPN event JSON."""
     status = ev.get("status", {})
@@ -112,109 +78,151 @@ def _status_fields(ev: Dict[str, Any]):
         "clock": status.get("displayClock"),
     }
 
-# Public: normalized games
-def get_today_games() -> List[Dict[str, Any]]:
-    games = []
-    for ev in _iter_events_for_window():
-        matchup = _to_matchup_abbr(ev)
-        if not matchup:
-            continue
-
-        home_abbr = matchup.split(" @ ")[1]
-        away_abbr = matchup.split(" @ ")[0]
-
-        comps = ev.get("competitions") or []
-        nba_game_id = comps[0].get("id") if comps else None
-
-        home_score, away_score = _scores(ev)
-        st = _status_fields(ev)
-
-        games.append({
-            "game_id": ev.get("id"),        # ESPN ID
-            "nba_game_id": nba_game_id,      # NBA API boxscore ID
-            "matchup": matchup,
-            "status_name": st["status_name"],
-            "status_detail": st["status_detail"],
-            "period": st["period"],
-            "clock": st["clock"],
-            "home_abbr": home_abbr,
-            "away_abbr": away_abbr,
-            "home_score": home_score,
-            "away_score": away_score,
-        })
-    return games
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
-def get_yesterday_games() -> list[dict]:
+def _scoreboard_odds(comp: Dict[str, Any], home_abbr: Optional[str], away_abbr: Optional[str]):
     """
-    Fetch all games from yesterday's calendar date (UTC-based) for post-game summaries.
-    Includes abbreviations and scores for final result reporting.
+    (home spread, over/under) from a competition's embedded odds, e.g.
+        {"details": "BOS -7.5", "spread": -7.5, "overUnder": 229.5}
+    "details" names the favorite, so it fixes the sign; "spread" is the fallback.
     """
-    from datetime import datetime, timedelta
+    odds = (comp.get("odds") or [{}])[0] or {}
+    total = _to_float(odds.get("overUnder"))
 
-    target_date = (datetime.utcnow() - timedelta(days=1)).strftime("%Y%m%d")
-    print(f"📅 Fetching ESPN scoreboard for {target_date} (yesterday UTC)")
+    team, _, line = (odds.get("details") or "").rpartition(" ")
+    spread = _to_float(line)
+    if (odds.get("details") or "").upper() == "EVEN":
+        spread = 0.0
+    elif spread is not None and team == away_abbr:
+        spread = -spread
+    elif spread is None or team != home_abbr:
+        spread = _to_float(odds.get("spread"))
 
+    return spread, total
+
+def _to_game(ev: Dict[str, Any], league: League = NBA) -> Optional[Game]:
+    comps = ev.get("competitions") or []
+    if not comps:
+        return None
+
+    home_abbr = away_abbr = None
+    home_score = away_score = None
+
+    for c in comps[0].get("competitors") or []:
+        team = c.get("team") or {}
+        abbr = team.get("abbreviation")
+        league.teams.learn(abbr, team.get("displayName"))
+        score_str = c.get("score")
+        score = int(score_str) if score_str and score_str.isdigit() else None
+
+        if c.get("homeAway") == "home":
+            home_abbr, home_score = abbr, score
+        elif c.get("homeAway") == "away":
+            away_abbr, away_score = abbr, score
+
+    st = _status_fields(ev)
+    spread, total = _scoreboard_odds(comps[0], home_abbr, away_abbr)
+
+    return Game(
+        game_id=ev.get("id"),                # ESPN ID
+        nba_game_id=comps[0].get("id"),      # NBA API boxscore ID
+        matchup=f"{away_abbr} @ {home_abbr}" if home_abbr and away_abbr else None,
+        key=league.teams.matchup_key(away_abbr, home_abbr),  # (away_id, home_id) or None
+        away_abbr=away_abbr,
+        home_abbr=home_abbr,
+        away_score=away_score,
+        home_score=home_score,
+        status_name=st["status_name"] or "",
+        status_detail=st["status_detail"] or "",
+        period=st["period"],
+        clock=st["clock"],
+        spread=spread,
+        total=total,
+    )
+
+# Public: normalized games
+def get_today_games(league: League = NBA, strict: bool = False) -> List[Game]:
+    games = []
+    for ev in _iter_events_for_window(league, strict):
+        game = _to_game(ev, league)
+        if game and game.matchup:
+            games.append(game)
+    return games
+
+def get_games_for_date(date_str: str, league: League = NBA) -> List[Game]:
+    """Fetch every game on an ESPN calendar date (YYYYMMDD)."""
     try:
-        data = _fetch_scoreboard(target_date)
+        data = _fetch_scoreboard(date_str, league)
     except Exception as e:
-        print(f"⚠️ ESPN fetch error for {target_date}: {e}")
+        print(f"⚠️ ESPN fetch error for {date_str}: {e}")
         return []
 
     games = []
     for ev in data.get("events", []):
-        comps = ev.get("competitions") or []
-        if not comps:
-            continue
-
-        # extract team abbreviations + scores
-        home_abbr = away_abbr = None
-        home_score = away_score = None
-
-        competitors = comps[0].get("competitors", [])
-        for c in competitors:
-            abbr = (c.get("team") or {}).get("abbreviation")
-            score_str = c.get("score")
-            score = int(score_str) if score_str and score_str.isdigit() else None
-
-            if c.get("homeAway") == "home":
-                home_abbr, home_score = abbr, score
-            elif c.get("homeAway") == "away":
-                away_abbr, away_score = abbr, score
-
-        # extract status fields
-        st = _status_fields(ev)
-        status_name = st.get("status_name") or ""
-        status_detail = st.get("status_detail") or ""
-
-        games.append({
-            "game_id": ev.get("id"),
-            "matchup": f"{away_abbr} @ {home_abbr}" if home_abbr and away_abbr else None,
-            "home_abbr": home_abbr,
-            "away_abbr": away_abbr,
-            "home_score": home_score,
-            "away_score": away_score,
-            "status_name": status_name,
-            "status_detail": status_detail,
-        })
+        game = _to_game(ev, league)
+        if game:
+            games.append(game)
 
     return games
 
-def iter_halftimes():
-    return [
-        g for g in get_today_games()
-        if g["status_detail"] and "Halftime" in g["status_detail"]
-    ]
+def get_yesterday_games(league: League = NBA) -> List[Game]:
+    """
+    Fetch all games from yesterday's calendar date (UTC-based) for post-game summaries.
+    Includes abbreviations and scores for final result reporting.
+    """
+    target_date = (_utc_now() - timedelta(days=1)).strftime("%Y%m%d")
+    print(f"📅 Fetching ESPN scoreboard for {target_date} (yesterday UTC)")
+    return get_games_for_date(target_date, league)
+
+def iter_halftimes(league: League = NBA) -> List[Game]:
+    return [g for g in get_today_games(league) if g.is_halftime]
 
 # ESPN Player Boxscore
-def fetch_boxscore_players(event_id: str):
-    url = SUMMARY_URL_TMPL.format(event_id=event_id)
+def fetch_boxscore_players(event_id: str, league: League = NBA) -> List[PlayerLine]:
+    url = league.summary_url(event_id)
 
     try:
-        data = requests.get(url, timeout=10).json()
+        # Latency-critical: hedge with a duplicate request past the p95 budget
+        data = http_client.get_json("espn", url, timeout=10, hedge=True)
     except Exception as e:
         print(f"⚠️ ERROR loading ESPN summary {event_id}: {e}")
         return []
 
+    return parse_boxscore_players(data)
+
+def fetch_event_final(event_id: str, league: League = NBA) -> Optional[Dict[str, Any]]:
+    """Final score and player points for one event from its summary; None while it's still live."""
+    try:
+        data = http_client.get_json("espn", league.summary_url(event_id), timeout=10)
+    except Exception as e:
+        print(f"⚠️ ERROR loading ESPN summary {event_id}: {e}")
+        return None
+
+    comps = (data.get("header") or {}).get("competitions") or [{}]
+    stype = (comps[0].get("status") or {}).get("type") or {}
+    if not (stype.get("completed") or "final" in (stype.get("name") or "").lower()):
+        return None
+
+    scores = {
+        c.get("homeAway"): int(c["score"])
+        for c in comps[0].get("competitors") or []
+        if str(c.get("score", "")).isdigit()
+    }
+    if "home" not in scores or "away" not in scores:
+        return None
+
+    return {
+        "away": scores["away"],
+        "home": scores["home"],
+        "game_id": event_id,
+        "points": {p.norm: p.points for p in parse_boxscore_players(data)},
+    }
+
+def parse_boxscore_players(data: Dict[str, Any]) -> List[PlayerLine]:
     out = []
     box = data.get("boxscore", {})
     player_blocks = box.get("players", [])
@@ -241,41 +249,49 @@ def fetch_boxscore_players(event_id: str):
         for player in athletes:
             ath = player.get("athlete") or {}
             stats = player.get("stats") or []
+            n = len(stats)
+
+            name = ath.get("displayName") or ""
 
-            pid = str(ath.get("id"))
-            name = ath.get("displayName")
+            # Parse everything once, here, instead of in the alert loop
+            seconds = parse_seconds(stats[idx_MIN]) if idx_MIN is not None and idx_MIN < n else 0
 
-            # Extract values safely
-            minutes = stats[idx_MIN] if idx_MIN is not None and idx_MIN < len(stats) else "0:00"
-            
             pts = 0
-            if idx_PTS is not None and idx_PTS < len(stats):
+            if idx_PTS is not None and idx_PTS < n:
                 try:
                     pts = int(stats[idx_PTS])
-                except:
+                except (TypeError, ValueError):
                     pts = 0
 
-            # Parse FGA from "M-A"
-            fga = 0
-            if idx_FG is not None and idx_FG < len(stats):
-                fg_str = stats[idx_FG]
-                if isinstance(fg_str, str) and "-" in fg_str:
-                    try:
-                        fga = int(fg_str.split("-")[1])
-                    except:
-                        fga = 0
-
-            out.append({
-                "id": pid,
-                "name": name,
-                "team": team_abbr,
-                "points": pts,
-                "minutes": minutes,
-                "fga": fga,
-            })
+            fgm, fga = parse_made_attempted(stats[idx_FG]) if idx_FG is not None and idx_FG < n else (0, 0)
+
+            out.append(PlayerLine(
+                id=str(ath.get("id")),
+                name=name,
+                norm=normalize_name(name),
+                team=team_abbr,
+                points=pts,
+                seconds=seconds,
+                fgm=fgm,
+                fga=fga,
+            ))
 
     return out
 
+def fetch_team_roster(team_abbr: str, league: League = NBA) -> Optional[List[str]]:
+    """Normalized names on a team's current roster, or None if ESPN couldn't be reached."""
+    try:
+        data = http_client.get_json("espn", league.roster_url(team_abbr), timeout=10)
+    except Exception as e:
+        print(f"⚠️ ERROR loading ESPN roster {team_abbr}: {e}")
+        return None
+
+    # Flat list for the NBA/WNBA; grouped by position for some other sports
+    athletes = []
+    for entry in data.get("athletes") or []:
+        athletes.extend(entry.get("items") or [entry])
+    return [normalize_name(a["displayName"]) for a in athletes if a.get("displayName")]
+
 def normalize_name(name: str) -> str:
     return (
         name.lower()
@@ -286,14 +302,11 @@ def normalize_name(name: str) -> str:
         .strip()
     )
 
-def _load_cached_top_scorers():
+def _load_cached_top_scorers(league: League = NBA):
     """Load top scorers and normalize file format."""
-    if not os.path.exists(TOP_SCORERS_PATH):
-        return None
-
+    path = league.top_scorers_path
     try:
-        with open(TOP_SCORERS_PATH, "r") as f:
-            data = json.load(f)
+        data = codec.read(path)
     except Exception:
         return None
 
@@ -307,14 +320,14 @@ def _load_cached_top_scorers():
 
     return None
 
-def get_top_scorers(limit=TOP_SCORER_LIMIT):
+def get_top_scorers(limit=TOP_SCORER_LIMIT, league: League = NBA):
     """
-    Load top scorers from local JSON (state/top_scorers.json).
+    Load top scorers from local JSON (state/top_scorers.json, or state/<league>/ for other leagues).
     Uses name-normalized keys instead of ESPN/NBA IDs.
     """
-    data = _load_cached_top_scorers()
+    data = _load_cached_top_scorers(league)
     if not data:
-        print("⚠️ No local top_scorers.json found or file is stale.")
+        print(f"⚠️ No local {league.top_scorers_path} found or file is stale.")
         return {}
 
     players = data.get("players", [])
@@ -0,0 +1,461 @@
+from __future__ import annotations
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app import codec
+from app.constants import SPREADS_CONFIDENCE_MAP, TOTAL_CONFIDENCE_MAP, POINTS_CONFIDENCE_MAP
+from app.espn_api import get_games_for_date, fetch_boxscore_players, normalize_name
+from app.join_table import JoinTable
+from app.leagues import League, NBA
+from app.teams import MatchupKey
+
+# Streaming grader for the halftime performance logs
+#
+# One precompiled tokenizer recognizes every line that matters (block header,
+# player alert, spread take, total take, player take) in a single pass, so a
+# log is read line by line and never held in memory. Picks are graded against
+# finals cached in state/finals/<date>.json: a finished day is fetched from
+# ESPN once, then every later evaluation of that day is offline. Games that
+# the live tracker (app/live_tracker.py) already saw go final are read from
+# its state/live/<date>/ files; if those cover every pick, nothing is fetched.
+# Logs, finals and live files are all per league (league.log_dir,
+# league.finals_dir, league.live_dir; NBA keeps the original locations).
+# Team tokens are ESPN abbreviations, which run past four characters (and
+# include "&") for college teams, e.g. "UCONN @ TA&M". Block headers also
+# carry the ESPN event ID ("MIA @ NY [401810077]"), which resolves the matchup
+# key through that night's join table; older headers without one, or events
+# the table doesn't know, fall back to parsing the team names.
+
+TOKEN = re.compile(
+    r"Halftime Alerts for (?P<matchup>\S+ @ \S+)(?: \[(?P<event>\w+)\])?:"
+    r"|^🎯 (?P<name>[A-Za-z .'-]+): (?P<pts>\d+) pts.*?avg (?P<avg>\d+\.\d+)(?:, line (?P<pline>\d+(?:\.\d+)?))?"
+    r"|^Scoey's Take: (?:"
+    r"(?P<tlabel>.*?) ?(?P<dir>Over|Under) (?P<target>\d+(?:\.\d+)?)"
+    r"|(?P<slabel>.+?) (?P<team>[A-Z0-9&]{2,8}) (?P<sline>[+-]?\d+\.\d+)"
+    r"|(?P<plabel>.+?)"
+    r")\s*$"
+)
+
+SPREAD, TOTAL, POINTS = "SPREAD", "TOTAL", "POINTS"
+
+
+def _tiers(conf_map) -> Dict[str, int]:
+    """Phrase → confidence tier (0 = weakest) for one alert type."""
+    return {phrase: i for i, (_, phrases) in enumerate(conf_map) for phrase in phrases}
+
+
+LABEL_TIERS = {
+    SPREAD: _tiers(SPREADS_CONFIDENCE_MAP),
+    TOTAL: _tiers(TOTAL_CONFIDENCE_MAP),
+    POINTS: _tiers(POINTS_CONFIDENCE_MAP),
+}
+
+
+@dataclass(slots=True)
+class Pick:
+    kind: str                        # SPREAD | TOTAL | POINTS
+    matchup: str                     # as logged, e.g. "MIA @ NY"
+    key: Optional[MatchupKey]
+    label: str = ""
+    team: Optional[str] = None       # SPREAD: side taken
+    direction: Optional[str] = None  # TOTAL: "over" / "under"
+    line: Optional[float] = None     # spread line, total target, or player points market line
+    name: Optional[str] = None       # POINTS: player
+    ht_pts: int = 0
+    avg: float = 0.0
+    event_id: Optional[str] = None   # ESPN event ID from the block header, when logged
+
+    @property
+    def tier(self) -> Optional[int]:
+        return LABEL_TIERS[self.kind].get(self.label)
+
+
+@dataclass(slots=True)
+class Finals:
+    scores: Dict[MatchupKey, Dict] = field(default_factory=dict)          # {"away", "home", "game_id"}
+    points: Dict[MatchupKey, Dict[str, int]] = field(default_factory=dict)  # normalized name → final pts
+
+
+def iter_picks(lines: Iterable[str], league: League = NBA, join: Optional[JoinTable] = None) -> Iterator[Pick]:
+    """
+    Tokenize log lines into picks. A player pick is emitted once its take line is seen.
+    join: the log night's join table, to key picks by their logged event ID.
+    """
+    matchup, key, event_id = None, None, None
+    pending: Optional[Pick] = None
+
+    for line in lines:
+        m = TOKEN.search(line)
+        if m is None or (matchup is None and not m["matchup"]):
+            continue
+
+        if m["matchup"]:
+            if pending:
+                yield pending
+                pending = None
+            matchup, event_id = m["matchup"], m["event"]
+            key = (join.key(event_id) if join and event_id else None) or league.teams.parse_matchup(matchup)
+        elif m["name"]:
+            if pending:
+                yield pending
+            pending = Pick(POINTS, matchup, key, name=m["name"], ht_pts=int(m["pts"]), avg=float(m["avg"]),
+                           line=float(m["pline"]) if m["pline"] else None, event_id=event_id)
+        elif m["dir"]:
+            yield Pick(TOTAL, matchup, key, label=m["tlabel"], direction=m["dir"].lower(), line=float(m["target"]),
+                       event_id=event_id)
+        elif m["team"]:
+            yield Pick(SPREAD, matchup, key, label=m["slabel"], team=m["team"], line=float(m["sline"]),
+                       event_id=event_id)
+        elif pending:
+            pending.label = m["plabel"]
+            yield pending
+            pending = None
+
+    if pending:
+        yield pending
+
+
+# ---- Finals cache ----
+def _finals_path(day: date, league: League = NBA) -> str:
+    return os.path.join(league.finals_dir, f"{day.isoformat()}.json")
+
+
+def _save_finals(day: date, finals: Finals, league: League):
+    codec.write(_finals_path(day, league), {
+        "scores": {league.teams.matchup_str(k): v for k, v in finals.scores.items()},
+        "points": {league.teams.matchup_str(k): v for k, v in finals.points.items()},
+    })
+
+
+def finals_complete(day: date, league: League = NBA) -> bool:
+    """True once a day's finals are cached (only written when every game is final or void)."""
+    return os.path.exists(_finals_path(day, league))
+
+
+def _load_cached_finals(day: date, league: League) -> Optional[Finals]:
+    doc = codec.read(_finals_path(day, league))
+    if doc is None:
+        return None
+    parse = league.teams.parse_matchup
+    return Finals(
+        scores={parse(k): v for k, v in doc.get("scores", {}).items()},
+        points={parse(k): v for k, v in doc.get("points", {}).items()},
+    )
+
+
+def live_dir(day: date, league: League = NBA) -> str:
+    """Per-event files written by the live tracker for one log day."""
+    return os.path.join(league.live_dir, day.isoformat())
+
+
+def load_live_finals(day: date, league: League = NBA) -> Optional[Finals]:
+    """Finals (scores and points) of every alerted game the live tracker saw finish."""
+    directory = live_dir(day, league)
+    if not os.path.isdir(directory):
+        return None
+
+    finals = Finals()
+    join = JoinTable(league, day)
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        doc = codec.read(os.path.join(directory, filename), {})
+        final = doc.get("final")
+        # Files are named by ESPN event ID; the logged matchup is the fallback
+        key = join.key(filename.removesuffix(".json")) or league.teams.parse_matchup(doc.get("matchup") or "")
+        if final is None or key is None:
+            continue
+        finals.scores[key] = {"away": final["away"], "home": final["home"], "game_id": final["game_id"]}
+        finals.points[key] = final["points"]
+    return finals
+
+
+def _live_covers(finals: Optional[Finals], need_scores: Set[MatchupKey], need_points: Set[MatchupKey]) -> bool:
+    return finals is not None and need_scores <= finals.scores.keys() and need_points <= finals.points.keys()
+
+
+def finals_settled(day: date, picks: Iterable[Pick], league: League = NBA) -> bool:
+    """True when every pick can be graded for good: full-day finals cached, or all games finished live."""
+    if finals_complete(day, league):
+        return True
+    picks = list(picks)
+    need_scores = {p.key for p in picks if p.key is not None}
+    need_points = {p.key for p in picks if p.kind == POINTS and p.key is not None}
+    return _live_covers(load_live_finals(day, league), need_scores, need_points)
+
+
+def _fetch_finals(day: date, league: League) -> Tuple[Finals, bool]:
+    """
+    Finals for an ESPN calendar day; complete is False while any game is unfinished.
+    Postponed, canceled and suspended games are settled without a final (their
+    picks grade as "No final found"), so they don't keep the day uncached.
+    """
+    games = get_games_for_date(day.strftime("%Y%m%d"), league)
+    finals = Finals()
+    complete = bool(games)
+
+    for g in games:
+        if g.is_void:
+            continue
+        if not g.is_final:
+            complete = False
+            continue
+        if g.key is None:
+            print(f"⚠️ Unmapped team alias in final {g.matchup}")
+            continue
+        finals.scores[g.key] = {"away": g.away_score, "home": g.home_score, "game_id": g.game_id}
+
+    return finals, complete
+
+
+def settle_finals(day: date, picks: Iterable[Pick], league: League = NBA) -> bool:
+    """
+    finals_settled, falling back to one scoreboard fetch (no boxscores) for a day
+    that isn't cached yet; a day found complete is cached, so it's fetched once.
+    """
+    picks = list(picks)
+    if finals_settled(day, picks, league):
+        return True
+    finals, complete = _fetch_finals(day, league)
+    if complete:
+        _save_finals(day, finals, league)     # player points are added by load_finals when graded
+    return complete
+
+
+def load_finals(day: date, need_points: Set[MatchupKey] = frozenset(), league: League = NBA,
+                need_scores: Set[MatchupKey] = frozenset()) -> Finals:
+    """Cached finals for a day, plus final points for every game in need_points."""
+    finals = _load_cached_finals(day, league)
+    complete = finals is not None
+    if finals is None:
+        live = load_live_finals(day, league)
+        if _live_covers(live, need_scores, need_points):
+            print(f"✅ {day}: every alerted game was graded live; nothing to fetch.")
+            return live
+        finals, complete = _fetch_finals(day, league)
+
+    missing = [k for k in need_points if k in finals.scores and k not in finals.points]
+    for key in missing:
+        players = fetch_boxscore_players(finals.scores[key]["game_id"], league)
+        finals.points[key] = {p.norm: p.points for p in players}
+
+    # Only a fully finished day is safe to cache
+    if complete and (missing or not finals_complete(day, league)):
+        _save_finals(day, finals, league)
+
+    return finals
+
+
+# ---- Grading ----
+def evaluate_spread(team, line, key, finals: Finals, league: League = NBA):
+    if key not in finals.scores:
+        return "⚠️ No final found", None
+
+    home_score = finals.scores[key]["home"]
+    away_score = finals.scores[key]["away"]
+    away, home = league.teams.abbr(key[0]), league.teams.abbr(key[1])
+
+    # Determine if pick team was home or away
+    is_home = league.teams.team_id(team) == key[1]
+    team_score = home_score if is_home else away_score
+    opp_score = away_score if is_home else home_score
+
+    # Margin from perspective of the picked team
+    margin = team_score - opp_score
+
+    # Bet wins if team_score + line > opp_score
+    adjusted = team_score + line - opp_score
+
+    if adjusted > 0:
+        covered = True
+        result = "✔️ Covered"
+    elif adjusted == 0:
+        covered = None  # push (unlikely with .5 lines)
+        result = "➖ Push"
+    else:
+        covered = False
+        result = "❌ Missed"
+
+    msg = (
+        f"{result}: Final margin was {margin:+} "
+        f"({away} {away_score} – {home} {home_score})"
+    )
+
+    return msg, covered
+
+
+def evaluate_total(direction, target, key, finals: Finals, league: League = NBA):
+    if key not in finals.scores:
+        return "⚠️ No final found", None
+
+    home_score = finals.scores[key]["home"]
+    away_score = finals.scores[key]["away"]
+    away, home = league.teams.abbr(key[0]), league.teams.abbr(key[1])
+
+    total = home_score + away_score
+
+    if direction.lower() == "under":
+        hit = total < target
+        result = "✔️ Under hit" if hit else "❌ Under missed"
+    else:
+        hit = total > target
+        result = "✔️ Over hit" if hit else "❌ Over missed"
+
+    msg = (
+        f"{result}: Final total was {total} "
+        f"({away} {away_score} – {home} {home_score})"
+    )
+
+    return msg, hit
+
+
+def player_line(avg, line=None):
+    """The line a player points pick is graded against."""
+    # The points market line when the alert carried one; otherwise the old rule:
+    # - if avg < 30: 85% of avg, rounded to a .5 line
+    # - else: flat 25.5 line
+    if line is not None:
+        return line
+    return int(avg * 0.85) - 0.5 if avg < 30 else 25.5
+
+
+def grade_player_points(final_pts, avg, line=None):
+    """Return (line, covered) for a player points pick."""
+    needed = player_line(avg, line)
+    if final_pts == needed:
+        return needed, None              # push on a whole-number market line
+    return needed, final_pts > needed
+
+
+def evaluate_player(player_name, ht_pts, avg, key, finals: Finals, line=None):
+    if key not in finals.points:
+        return "⚠️ No boxscore found", None
+
+    lookup = finals.points[key]
+    norm = normalize_name(player_name)
+
+    if norm not in lookup:
+        return f"⚠️ Final stats not found for {player_name}", None
+
+    final_pts = lookup[norm]
+    needed, covered = grade_player_points(final_pts, avg, line)
+    result = "➖ Push" if covered is None else "✔️ Covered" if covered else "❌ Missed"
+
+    msg = f"Over {needed} {result}: Final pts {final_pts}"
+
+    return msg, covered
+
+
+def grade_pick(pick: Pick, finals: Finals, league: League = NBA) -> Tuple[str, Optional[bool]]:
+    if pick.kind == SPREAD:
+        return evaluate_spread(pick.team, pick.line, pick.key, finals, league)
+    if pick.kind == TOTAL:
+        return evaluate_total(pick.direction, pick.line, pick.key, finals, league)
+    return evaluate_player(pick.name, pick.ht_pts, pick.avg, pick.key, finals, pick.line)
+
+
+def describe(pick: Pick, msg: str) -> str:
+    if pick.kind == SPREAD:
+        return f"- **Spread Pick:** {pick.team} {pick.line:+} → {msg}"
+    if pick.kind == TOTAL:
+        return f"- **Total Pick:** {pick.direction.title()} {pick.line} → {msg}"
+    return f"- **Player:** {pick.name} → {msg}"
+
+
+@dataclass(slots=True)
+class Record:
+    hits: Dict[str, int] = field(default_factory=lambda: {SPREAD: 0, TOTAL: 0, POINTS: 0})
+    misses: Dict[str, int] = field(default_factory=lambda: {SPREAD: 0, TOTAL: 0, POINTS: 0})
+
+    def add(self, kind: str, hit: Optional[bool]):
+        if hit is True:
+            self.hits[kind] += 1
+        elif hit is False:
+            self.misses[kind] += 1
+
+    def merge(self, other: "Record"):
+        for kind in self.hits:
+            self.hits[kind] += other.hits[kind]
+            self.misses[kind] += other.misses[kind]
+
+    @property
+    def won(self) -> int:
+        return sum(self.hits.values())
+
+    @property
+    def lost(self) -> int:
+        return sum(self.misses.values())
+
+    def overall(self) -> str:
+        n = self.won + self.lost
+        winrate = (self.won / n * 100) if n > 0 else 0.0
+        return f"{self.won}–{self.lost} ({winrate:.1f}%)"
+
+    def summary(self, heading: str) -> List[str]:
+        return [
+            f"\n\n🏁 **{heading}**",
+            f"**Overall Record:** {self.overall()}",
+            "",
+            f"📊 **Spreads:** {self.hits[SPREAD]}–{self.misses[SPREAD]}",
+            f"📈 **Totals:** {self.hits[TOTAL]}–{self.misses[TOTAL]}",
+            f"🎯 **Player Props:** {self.hits[POINTS]}–{self.misses[POINTS]}",
+        ]
+
+
+def grade_picks(picks: List[Pick], finals: Finals, league: League = NBA) -> List[Tuple[Pick, str, Optional[bool]]]:
+    return [(pick, *grade_pick(pick, finals, league)) for pick in picks]
+
+
+def format_day(day_label: str, graded) -> Tuple[List[str], Record]:
+    """Per-matchup report lines for one day of graded picks, plus that day's record."""
+    output = [f"📊 **Alert Evaluation for {day_label}**"]
+    record = Record()
+    matchup = None
+
+    for pick, msg, hit in graded:
+        if pick.matchup != matchup:
+            matchup = pick.matchup
+            output.append(f"\n### 🏀 {matchup}")
+        output.append(describe(pick, msg))
+        record.add(pick.kind, hit)
+
+    return output, record
+
+
+def log_path(day: date, league: League = NBA) -> str:
+    return os.path.join(league.log_dir, f"{day.isoformat()}.log")
+
+
+def read_picks(day: date, league: League = NBA) -> Optional[List[Pick]]:
+    """Stream one day's log into picks (None if there is no log for that day)."""
+    path = log_path(day, league)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return list(iter_picks(f, league, JoinTable(league, day)))
+
+
+def grade_day(day: date, league: League = NBA):
+    """Graded picks for one day, or None if there is no log."""
+    picks = read_picks(day, league)
+    if picks is None:
+        return None
+    return grade_day_picks(day, picks, league)
+
+
+def grade_day_picks(day: date, picks: List[Pick], league: League = NBA):
+    """Grade one day's already-read picks."""
+    need_points = {p.key for p in picks if p.kind == POINTS and p.key is not None}
+    need_scores = {p.key for p in picks if p.key is not None}
+    finals = load_finals(day, need_points, league, need_scores) if picks else Finals()
+    return grade_picks(picks, finals, league)
+
+
+def iter_days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import requests
+
+from app.constants import RATE_LIMITS
+from app import codec, resilience
+from app.resilience import UpstreamUnavailable
+
+# Shared HTTP layer
+# Every outbound call names its upstream ("espn", "odds", "discord"), waits on
+# that upstream's token bucket (so concurrent leagues/games share one budget),
+# and goes through its circuit breaker. A name can be qualified as
+# "upstream:instance" (one Discord webhook): the instance gets its own breaker
+# but still draws on the upstream's token bucket.
+#
+# An embedding process can swap the whole layer for its own client (anything
+# with get / get_json / post_json of these signatures) with use_client(); it
+# applies to the current context only, so engines side by side keep their own.
+# Work handed to a thread pool needs contextvars.copy_context().run.
+
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {name: RateLimiter(rate, burst) for name, (rate, burst) in RATE_LIMITS.items()}
+
+
+def _limiter(upstream: str) -> Optional[RateLimiter]:
+    return _limiters.get(upstream.partition(":")[0])
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+# Recorded fixtures: replay a night's HTTP traffic offline (profiling, benchmarks)
+_fixtures = {"dir": None, "record": False}
+_SECRET_PARAMS = {"apiKey"}
+
+
+def use_fixtures(directory: str, record: bool = False):
+    """Replay responses from `directory`, or record live responses into it."""
+    os.makedirs(directory, exist_ok=True)
+    _fixtures["dir"] = directory
+    _fixtures["record"] = record
+    print(f"📼 {'Recording' if record else 'Replaying'} HTTP fixtures in {directory}")
+
+
+def _fixture_path(upstream: str, method: str, url: str, params) -> str:
+    clean = sorted((k, str(v)) for k, v in (params or {}).items() if k not in _SECRET_PARAMS)
+    # stdlib json on purpose: fixture names must not depend on the codec backend
+    digest = hashlib.sha1(json.dumps([method, url, clean]).encode()).hexdigest()[:16]
+    return os.path.join(_fixtures["dir"], f"{upstream}-{digest}.json")
+
+
+class _FixtureResponse:
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        self.content = body
+        self.headers = headers
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return codec.loads(self.content)
+
+
+def _replay(path: str) -> _FixtureResponse:
+    doc = codec.read(path)
+    if doc is None:
+        raise UpstreamUnavailable(f"no recorded fixture {path}")
+    return _FixtureResponse(codec.dumps(doc["body"]), doc.get("headers", {}))
+
+
+def _record(path: str, r):
+    codec.write(path, {"headers": dict(r.headers), "body": codec.loads(r.content)})
+
+
+def _upstream_fault(e: Exception) -> bool:
+    """5xx, timeouts and connection errors trip breakers; 4xx and bad requests don't."""
+    if isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    return isinstance(e, (requests.Timeout, requests.ConnectionError))
+
+
+def _send(upstream: str, method: str, url: str, timeout: float, **kwargs):
+    if _fixtures["dir"] and not _fixtures["record"]:
+        if method != "GET":
+            return _FixtureResponse(b"{}", {})   # don't post to Discord from a replay
+        return _replay(_fixture_path(upstream, method, url, kwargs.get("params")))
+
+    if not resilience.allow(upstream):
+        raise UpstreamUnavailable(f"{upstream} circuit open")
+
+    limiter = _limiter(upstream)
+    if limiter:
+        limiter.acquire()
+
+    start = time.monotonic()
+    try:
+        r = _session.request(method, url, timeout=timeout, **kwargs)
+        r.raise_for_status()
+    except Exception as e:
+        if _upstream_fault(e):
+            resilience.record_failure(upstream)
+        else:
+            resilience.release(upstream)
+        raise
+    resilience.record_success(upstream, time.monotonic() - start)
+
+    if _fixtures["dir"] and method == "GET":
+        _record(_fixture_path(upstream, method, url, kwargs.get("params")), r)
+    return r
+
+
+_client: ContextVar = ContextVar("http_client", default=None)
+
+
+@contextmanager
+def use_client(client):
+    """Route get / get_json / post_json through `client` within this context (None = this module)."""
+    token = _client.set(client)
+    try:
+        yield client
+    finally:
+        _client.reset(token)
+
+
+def get(upstream: str, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10):
+    client = _client.get()
+    if client is not None:
+        return client.get(upstream, url, params=params, timeout=timeout)
+    return _send(upstream, "GET", url, timeout, params=params)
+
+
+def get_json(upstream: str, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10,
+             hedge: bool = False):
+    """
+    GET and decode JSON. With hedge=True, a duplicate request is fired once the
+    first has outlived the upstream's p95 latency; whichever answers first wins.
+    """
+    client = _client.get()
+    if client is not None:
+        return client.get_json(upstream, url, params=params, timeout=timeout, hedge=hedge)
+    if not hedge:
+        return codec.loads(get(upstream, url, params=params, timeout=timeout).content)
+
+    first = _hedge_pool.submit(get, upstream, url, params, timeout)
+    done, _ = wait([first], timeout=resilience.latency_budget(upstream))
+    if done:
+        return codec.loads(first.result().content)
+
+    print(f"🐢 {upstream} slower than p95; hedging {url}")
+    second = _hedge_pool.submit(get, upstream, url, params, timeout)
+
+    error = None
+    for fut in as_completed([first, second]):
+        try:
+            return codec.loads(fut.result().content)
+        except Exception as e:
+            error = e
+    raise error
+
+
+def post_json(upstream: str, url: str, payload: Dict[str, Any], timeout: float = 10):
+    client = _client.get()
+    if client is not None:
+        return client.post_json(upstream, url, payload, timeout=timeout)
+    return _send(upstream, "POST", url, timeout, data=codec.dumps(payload),
+                 headers={"Content-Type": "application/json"})
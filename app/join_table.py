@@ -0,0 +1,95 @@
+from __future__ import annotations
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from app import clock, codec
+from app.leagues import League, NBA
+from app.records import Game
+from app.teams import MatchupKey
+
+# Nightly cross-provider join table (state/join/<date>.json, state/<league>/join/ for other leagues)
+#
+#   {"date": "2026-10-19",
+#    "games": {"401810123": {"matchup": "MIA @ BOS", "odds_id": "e912…", "commence": "2026-10-19T23:30:00+00:00"}}}
+#
+# Keyed by ESPN event ID, the ID every other file uses. Built once per night
+# by record_pregame from tonight's ESPN scoreboard and the Odds API events in
+# the pregame file; that join is the one place team names are matched across
+# providers. After it, an Odds API payload, a live-tracker file or a game
+# from another stats feed resolves by ID:
+#
+#   espn_id(key)        matchup key → ESPN event ID
+#   key(espn_id)        ESPN event ID → matchup key
+#   odds_id(key)        matchup key → Odds API event ID
+#   key_for_odds(id)    Odds API event ID → matchup key
+#
+# Scoreboards later in the night add() games the pregame run didn't see.
+# The date is the slate date (app/clock.py: local date, rolling over a few hours
+# after midnight), the same one the logs, live tracker and grader use.
+
+
+class JoinTable:
+    def __init__(self, league: League = NBA, day: Optional[date] = None, path: Optional[str] = None):
+        self.league = league
+        self.day = day or clock.slate_date()
+        self.path = path or league.join_table_path(self.day)
+        self.games: Dict[str, Dict] = codec.read(self.path, {}).get("games", {})
+        self._dirty = False
+        self._index()
+
+    def _index(self):
+        parse = self.league.teams.parse_matchup
+        self._key = {eid: parse(row["matchup"]) for eid, row in self.games.items()}
+        self._espn = {key: eid for eid, key in self._key.items() if key is not None}
+        self._odds = {row["odds_id"]: self._key[eid] for eid, row in self.games.items() if row.get("odds_id")}
+
+    def save(self):
+        if self._dirty:
+            codec.write(self.path, {"date": self.day.isoformat(), "games": self.games})
+            self._dirty = False
+
+    # --- Building ---
+
+    def build(self, games: Iterable[Game], events: Dict[MatchupKey, Dict]) -> int:
+        """
+        Join tonight's ESPN games to Odds API events ({matchup key: {"id", "commence"}},
+        as in the pregame file). Returns how many games got an Odds API ID.
+        """
+        joined = 0
+        for g in games:
+            if g.key is None or not g.game_id:
+                continue
+            ev = events.get(g.key) or {}
+            row = {"matchup": self.league.teams.matchup_str(g.key), "odds_id": ev.get("id"), "commence": ev.get("commence")}
+            joined += row["odds_id"] is not None
+            if self.games.get(g.game_id) != row:
+                self.games[g.game_id] = row
+                self._dirty = True
+        self._index()
+        return joined
+
+    def add(self, games: Iterable[Game]) -> bool:
+        """Add ESPN games missing from the table (no Odds API ID yet); True if any were new."""
+        new = [g for g in games if g.key is not None and g.game_id and g.game_id not in self.games]
+        if not new:
+            return False
+        for g in new:
+            self.games[g.game_id] = {"matchup": self.league.teams.matchup_str(g.key), "odds_id": None, "commence": None}
+        self._dirty = True
+        self._index()
+        return True
+
+    # --- Lookups ---
+
+    def espn_id(self, key: Optional[MatchupKey]) -> Optional[str]:
+        return self._espn.get(key)
+
+    def key(self, espn_id: str) -> Optional[MatchupKey]:
+        return self._key.get(espn_id)
+
+    def odds_id(self, key: Optional[MatchupKey]) -> Optional[str]:
+        eid = self._espn.get(key)
+        return self.games[eid].get("odds_id") if eid else None
+
+    def key_for_odds(self, odds_id: Optional[str]) -> Optional[MatchupKey]:
+        return self._odds.get(odds_id)
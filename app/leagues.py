@@ -0,0 +1,172 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Optional
+
+from app.constants import (
+    SEASON,
+    SPREAD_MOVE_TRIGGER,
+    TOTAL_MOVE_TRIGGER,
+    PACE_TRIGGER,
+    EXPECTED_HALF_MINUTES,
+    EXPECTED_HALF_FGA,
+    EXPECTED_LEAGUE_LEADER_PPG,
+)
+from app.keys import ODDS_URL
+from app.teams import TeamRegistry, NBA_TEAMS, WNBA_TEAMS
+
+ESPN_BASE_URL = "https://site.api.espn.com/apis/site/v2/sports"
+ESPN_CORE_URL = "https://sports.core.api.espn.com/v2/sports"
+ODDS_BASE_URL = "https://api.the-odds-api.com/v4/sports"
+
+# One League per supported competition. Everything that used to be hard-wired
+# to the NBA (ESPN path, Odds API sport, team registry, trigger thresholds,
+# state file locations) hangs off this object.
+
+
+@dataclass(frozen=True, eq=False)
+class League:
+    key: str                        # "nba", "wnba", "ncaab"
+    espn_path: str                  # ESPN site API path, e.g. "basketball/nba"
+    odds_sport: str                 # Odds API sport key
+    season: str
+    teams: TeamRegistry
+    scoreboard_params: Dict[str, str] = field(default_factory=dict)
+
+    # Game clock
+    period_seconds: int = 720       # 12-minute quarters
+    regulation_periods: int = 4
+    overtime_seconds: int = 300
+
+    # Trigger thresholds
+    spread_trigger: float = SPREAD_MOVE_TRIGGER
+    total_trigger: float = TOTAL_MOVE_TRIGGER
+    pace_trigger: float = PACE_TRIGGER
+
+    # Expected baselines
+    half_minutes: float = EXPECTED_HALF_MINUTES
+    half_fga: float = EXPECTED_HALF_FGA
+    leader_ppg: float = EXPECTED_LEAGUE_LEADER_PPG
+
+    @property
+    def label(self) -> str:
+        return self.key.upper()
+
+    @property
+    def scoreboard_url(self) -> str:
+        return f"{ESPN_BASE_URL}/{self.espn_path}/scoreboard"
+
+    def summary_url(self, event_id: str) -> str:
+        return f"{ESPN_BASE_URL}/{self.espn_path}/summary?event={event_id}"
+
+    def roster_url(self, team_abbr: str) -> str:
+        return f"{ESPN_BASE_URL}/{self.espn_path}/teams/{team_abbr.lower()}/roster"
+
+    def plays_url(self, event_id: str) -> str:
+        """ESPN core API play-by-play (paginated, oldest play first)."""
+        sport, slug = self.espn_path.split("/", 1)
+        return f"{ESPN_CORE_URL}/{sport}/leagues/{slug}/events/{event_id}/competitions/{event_id}/plays"
+
+    def period_length(self, period: int) -> int:
+        return self.period_seconds if period <= self.regulation_periods else self.overtime_seconds
+
+    @property
+    def odds_url(self) -> str:
+        if self.key == "nba" and ODDS_URL:
+            return ODDS_URL
+        return f"{ODDS_BASE_URL}/{self.odds_sport}/odds"
+
+    def event_odds_url(self, event_id: str) -> str:
+        return f"{ODDS_BASE_URL}/{self.odds_sport}/events/{event_id}/odds"
+
+    def _state_path(self, name: str) -> str:
+        # NBA keeps the original file names
+        return f"state/{name}" if self.key == "nba" else f"state/{self.key}/{name}"
+
+    @property
+    def pregame_path(self) -> str:
+        return self._state_path("pregame_lines.json")
+
+    @property
+    def top_scorers_path(self) -> str:
+        return self._state_path("top_scorers.json")
+
+    @property
+    def trigger_plans_path(self) -> str:
+        return self._state_path("trigger_plans.json")
+
+    @property
+    def team_index_path(self) -> str:
+        return self._state_path("team_index.json")
+
+    @property
+    def finals_dir(self) -> str:
+        return self._state_path("finals")
+
+    @property
+    def live_dir(self) -> str:
+        return self._state_path("live")
+
+    def join_table_path(self, day: date) -> str:
+        return self._state_path(f"join/{day.isoformat()}.json")
+
+    @property
+    def log_dir(self) -> str:
+        base = "logs/performance_logs"
+        return base if self.key == "nba" else f"{base}/{self.key}"
+
+
+NBA = League(
+    key="nba",
+    espn_path="basketball/nba",
+    odds_sport="basketball_nba",
+    season=SEASON,
+    teams=NBA_TEAMS,
+)
+
+WNBA = League(
+    key="wnba",
+    espn_path="basketball/wnba",
+    odds_sport="basketball_wnba",
+    season=SEASON,
+    teams=WNBA_TEAMS,
+    spread_trigger=2.5,
+    period_seconds=600,           # 10-minute quarters
+    half_minutes=16.0,            # 40-minute games
+    half_fga=8.0,
+    leader_ppg=24.0,
+)
+
+NCAAB = League(
+    key="ncaab",
+    espn_path="basketball/mens-college-basketball",
+    odds_sport="basketball_ncaab",
+    season=SEASON,
+    teams=TeamRegistry({}, {}, dynamic=True),
+    scoreboard_params={"groups": "50", "limit": "400"},   # all of Division I
+    spread_trigger=4.0,
+    total_trigger=0.06,
+    period_seconds=1200,
+    regulation_periods=2,
+    half_minutes=16.0,            # two 20-minute halves
+    half_fga=7.0,
+    leader_ppg=22.0,
+)
+
+LEAGUES = {lg.key: lg for lg in (NBA, WNBA, NCAAB)}
+
+
+def get_league(key: Optional[str]) -> League:
+    if not key:
+        return NBA
+    try:
+        return LEAGUES[key.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown league '{key}'. Choose from: {', '.join(LEAGUES)}")
+
+
+def parse_leagues(arg: Optional[str]):
+    """Parse a comma-separated --leagues argument."""
+    if not arg:
+        return [NBA]
+    return [get_league(k.strip()) for k in arg.split(",") if k.strip()]
@@ -0,0 +1,176 @@
+import os
+import socket
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+from app.constants import LEASE_TTL
+
+# Game leases shared by halftime worker processes (state/leases.db)
+#
+# Every live game is leased to exactly one worker for LEASE_TTL seconds. A
+# worker renews its leases on each heartbeat; if it dies or gets stuck on an
+# upstream call, the leases lapse and the next worker to heartbeat picks the
+# games up. Each worker only takes its fair share (games / live workers), so
+# a slate spreads across processes instead of piling onto whoever polled first.
+#
+# The halftime hand-off is separate from the lease: claim_halftime() inserts
+# the game into `halftimes` and only the insert that succeeds may post, so a
+# game is alerted once even if its lease moved mid-half or a cron tick and a
+# worker see the same halftime.
+#
+# All writes run in BEGIN IMMEDIATE transactions, so concurrent workers are
+# serialised by SQLite rather than racing on a JSON file.
+
+LEASE_DB = "state/leases.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker     TEXT PRIMARY KEY,
+    heartbeat  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    game_id    TEXT PRIMARY KEY,
+    league     TEXT NOT NULL,
+    worker     TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS halftimes (
+    game_id    TEXT PRIMARY KEY,
+    worker     TEXT NOT NULL,
+    claimed_at REAL NOT NULL
+);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseStore:
+    def __init__(self, path: str = LEASE_DB, worker: Optional[str] = None, ttl: float = LEASE_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.worker = worker or default_worker_id()
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _write(self, fn):
+        """Run fn(cursor) in one BEGIN IMMEDIATE transaction."""
+        cur = self._db.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(cur)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        return result
+
+    # --- Workers ---
+
+    def heartbeat(self, now: Optional[float] = None):
+        """Mark this worker alive and renew every lease it still holds."""
+        now = now or time.time()
+
+        def beat(cur):
+            cur.execute(
+                "INSERT INTO workers (worker, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT(worker) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (self.worker, now),
+            )
+            cur.execute(
+                "UPDATE leases SET expires_at = ? WHERE worker = ? AND expires_at > ?",
+                (now + self.ttl, self.worker, now),
+            )
+
+        self._write(beat)
+
+    def live_workers(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        row = self._db.execute("SELECT COUNT(*) FROM workers WHERE heartbeat > ?", (now - self.ttl,)).fetchone()
+        return max(1, row[0])
+
+    def leave(self):
+        """Clean shutdown: hand every lease back immediately."""
+        def drop(cur):
+            cur.execute("DELETE FROM leases WHERE worker = ?", (self.worker,))
+            cur.execute("DELETE FROM workers WHERE worker = ?", (self.worker,))
+
+        self._write(drop)
+
+    # --- Leases ---
+
+    def acquire(self, games: Iterable[str], league: str, now: Optional[float] = None) -> List[str]:
+        """Lease free or expired games up to this worker's fair share; returns the games held."""
+        now = now or time.time()
+        games = list(dict.fromkeys(games))
+
+        def take(cur):
+            cur.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            cur.execute("DELETE FROM workers WHERE heartbeat <= ?", (now - self.ttl,))
+            cur.execute("SELECT COUNT(*) FROM workers")
+            share = -(-len(games) // max(1, cur.fetchone()[0]))
+
+            held = {
+                row[0] for row in cur.execute(
+                    "SELECT game_id FROM leases WHERE worker = ? AND league = ?", (self.worker, league)
+                )
+            }
+            taken = {row[0] for row in cur.execute("SELECT game_id FROM leases")}
+            done = {row[0] for row in cur.execute("SELECT game_id FROM halftimes")}
+
+            for game_id in games:
+                if len(held) >= share:
+                    break
+                if game_id in taken or game_id in done:
+                    continue
+                cur.execute(
+                    "INSERT INTO leases (game_id, league, worker, expires_at) VALUES (?, ?, ?, ?)",
+                    (game_id, league, self.worker, now + self.ttl),
+                )
+                held.add(game_id)
+
+            return [g for g in games if g in held]
+
+        return self._write(take)
+
+    def release(self, game_id: str):
+        self._write(lambda cur: cur.execute(
+            "DELETE FROM leases WHERE game_id = ? AND worker = ?", (game_id, self.worker)
+        ))
+
+    # --- Halftime hand-off ---
+
+    def claim_halftime(self, game_id: str, now: Optional[float] = None) -> bool:
+        """True for exactly one caller per game; that caller alone may post the alerts."""
+        now = now or time.time()
+
+        def claim(cur):
+            cur.execute(
+                "INSERT OR IGNORE INTO halftimes (game_id, worker, claimed_at) VALUES (?, ?, ?)",
+                (game_id, self.worker, now),
+            )
+            won = cur.rowcount == 1
+            if won:
+                cur.execute("DELETE FROM leases WHERE game_id = ?", (game_id,))
+            return won
+
+        return self._write(claim)
+
+    def unclaim_halftime(self, game_id: str):
+        """Processing failed before anything was posted: let the next tick retry."""
+        self._write(lambda cur: cur.execute(
+            "DELETE FROM halftimes WHERE game_id = ? AND worker = ?", (game_id, self.worker)
+        ))
+
+    def prune(self, older_than: float):
+        """Forget halftime claims from previous slates."""
+        self._write(lambda cur: cur.execute("DELETE FROM halftimes WHERE claimed_at < ?", (older_than,)))
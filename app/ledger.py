@@ -0,0 +1,152 @@
+from __future__ import annotations
+import os
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app import codec
+from app.grading import SPREAD, grade_day_picks, read_picks, settle_finals
+from app.leagues import League, NBA
+
+# Rolling performance ledger
+#
+# state/ledger.json keeps pre-aggregated [won, lost] counters per league and
+# graded day:
+#
+#   {"leagues": {"nba": {"2025-11-14": {"type":  {"SPREAD": [5, 2], ...},
+#                                       "label": {"SPREAD/high": [2, 1], ...},
+#                                       "team":  {"MIL": [1, 0], ...}}}}}
+#
+# (A ledger written before it was per league, {"days": {...}}, loads as NBA.)
+# Every graded pick is also appended to state/ledger_picks.jsonl for drill-down.
+# A day is added once, after its finals are complete, so "last 30 days by label"
+# just sums 30 small dicts: no log is re-parsed and nothing is re-fetched.
+# Settlement is checked before grading, so a day still waiting on a game costs
+# one scoreboard fetch per run, not a full grade. The counters are saved before
+# that day's rows are appended, so a crash in between can lose drill-down rows
+# but never duplicate them.
+#
+# Teams: a spread pick counts for the side taken; total and player picks count
+# for both teams in the matchup.
+
+LEDGER_FILE = "state/ledger.json"
+PICKS_FILE = "state/ledger_picks.jsonl"
+DIMENSIONS = ("type", "label", "team")
+TIER_NAMES = ("low", "medium", "high", "max")
+
+
+def _tier_name(pick) -> str:
+    return TIER_NAMES[pick.tier] if pick.tier is not None else "unknown"
+
+
+def _teams(pick, league: League) -> List[str]:
+    if pick.kind == SPREAD and pick.team:
+        tid = league.teams.team_id(pick.team)
+        return [league.teams.abbr(tid) if tid is not None else pick.team]
+    if pick.key is None:
+        return []
+    return [league.teams.abbr(pick.key[0]), league.teams.abbr(pick.key[1])]
+
+
+class Ledger:
+    def __init__(self, path: str = LEDGER_FILE, picks_path: str = PICKS_FILE):
+        self.path = path
+        self.picks_path = picks_path
+        doc = codec.read(path, {})
+        # league key → day → dimension → value → [won, lost]
+        self.leagues: Dict[str, Dict[str, Dict[str, Dict[str, List[int]]]]] = doc.get("leagues") or {}
+        if "days" in doc:
+            self.leagues.setdefault(NBA.key, {}).update(doc["days"])
+        self._rows: List[Dict] = []           # picks rows waiting for save()
+
+    def days(self, league: League = NBA) -> Dict[str, Dict[str, Dict[str, List[int]]]]:
+        return self.leagues.setdefault(league.key, {})
+
+    def has_day(self, day: date, league: League = NBA) -> bool:
+        return day.isoformat() in self.leagues.get(league.key, {})
+
+    def add_day(self, day: date, graded, league: League = NBA):
+        """Fold one day of (pick, msg, hit) into the counters; its picks rows are written by save()."""
+        counters = {dim: defaultdict(lambda: [0, 0]) for dim in DIMENSIONS}
+        rows = []
+
+        for pick, _, hit in graded:
+            if hit is None:
+                continue
+            slot = 0 if hit else 1
+            tier = _tier_name(pick)
+            teams = _teams(pick, league)
+
+            counters["type"][pick.kind][slot] += 1
+            counters["label"][f"{pick.kind}/{tier}"][slot] += 1
+            for abbr in teams:
+                counters["team"][abbr][slot] += 1
+
+            rows.append({
+                "league": league.key, "date": day.isoformat(), "kind": pick.kind, "matchup": pick.matchup,
+                "label": pick.label, "tier": tier, "teams": teams, "team": pick.team,
+                "direction": pick.direction, "line": pick.line, "name": pick.name, "hit": hit,
+            })
+
+        self.days(league)[day.isoformat()] = {dim: dict(c) for dim, c in counters.items()}
+        self._rows.extend(rows)
+
+    def save(self):
+        codec.write(self.path, {"leagues": {
+            key: dict(sorted(days.items())) for key, days in sorted(self.leagues.items()) if days
+        }})
+        if self._rows:
+            codec.append_lines(self.picks_path, self._rows)
+            self._rows = []
+
+    def record(self, start: date, end: date, by: str = "type",
+               leagues: Optional[Iterable[League]] = None) -> Dict[str, Tuple[int, int]]:
+        """{value: (won, lost)} summed over the ledgered days in [start, end] (every league by default)."""
+        lo, hi = start.isoformat(), end.isoformat()
+        keys = [lg.key for lg in leagues] if leagues is not None else list(self.leagues)
+        totals = defaultdict(lambda: [0, 0])
+        for key in keys:
+            for day, counters in self.leagues.get(key, {}).items():
+                if lo <= day <= hi:
+                    for value, (won, lost) in counters.get(by, {}).items():
+                        totals[value][0] += won
+                        totals[value][1] += lost
+        return {value: (won, lost) for value, (won, lost) in totals.items()}
+
+    def update(self, through: date, league: League = NBA) -> List[date]:
+        """Grade and add every finished day that has a log but isn't ledgered yet."""
+        added = []
+        if not os.path.isdir(league.log_dir):
+            return added
+
+        for filename in sorted(os.listdir(league.log_dir)):
+            try:
+                day = date.fromisoformat(filename.removesuffix(".log"))
+            except ValueError:
+                continue
+            if day > through or self.has_day(day, league):
+                continue
+
+            picks = read_picks(day, league)
+            if picks is None:
+                continue
+            if picks and not settle_finals(day, picks, league):
+                print(f"⏳ {day}: finals incomplete; not ledgered yet.")
+                continue
+
+            self.add_day(day, grade_day_picks(day, picks, league), league)
+            added.append(day)
+
+        if added:
+            self.save()
+            print(f"📒 {league.label} ledger updated with {len(added)} day(s).")
+        return added
+
+
+def format_record(rows: Dict[str, Tuple[int, int]], heading: str, limit: Optional[int] = None) -> List[str]:
+    lines = [f"📒 **{heading}**"]
+    ranked = sorted(rows.items(), key=lambda kv: (-(kv[1][0] + kv[1][1]), kv[0]))
+    for value, (won, lost) in ranked[:limit]:
+        n = won + lost
+        lines.append(f"**{value}:** {won}–{lost} ({won / n * 100 if n else 0:.1f}%)")
+    return lines
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import os
+from dataclasses import fields
+from datetime import date
+from typing import Dict, List, Optional
+
+from app import clock, codec
+from app.espn_api import fetch_event_final, get_games_for_date
+from app.grading import Finals, Pick, Record, describe, grade_pick, iter_picks, live_dir
+from app.join_table import JoinTable
+from app.leagues import League, NBA
+
+# Live second-half grading
+#
+# When a halftime block is posted, track() runs its text through the same
+# tokenizer the next-day grader uses and saves the picks to
+# state/live/<date>/<event_id>.json (one file per event, so parallel halftime
+# workers never write the same file). Each poll() reads one scoreboard for the
+# slate date to see which tracked games are final, then fetches the summary of
+# each newly final game once, stores its score and player points and grades
+# its picks. The next-day grader reads the same files and skips ESPN entirely
+# when they cover every pick.
+
+PICK_FIELDS = [f.name for f in fields(Pick) if f.name != "key"]
+
+
+def _event_path(day: date, event_id: str, league: League) -> str:
+    return os.path.join(live_dir(day, league), f"{event_id}.json")
+
+
+def track(event_id: str, matchup: str, alert_text: str, league: League = NBA, day: Optional[date] = None) -> int:
+    """Save the picks in a posted halftime block; returns how many are being tracked."""
+    day = day or clock.slate_date()
+    lines = [f"Halftime Alerts for {matchup} [{event_id}]:", *alert_text.splitlines()]
+    picks = list(iter_picks(lines, league))
+    if not picks:
+        return 0
+
+    codec.write(_event_path(day, event_id, league), {
+        "matchup": matchup,
+        "picks": [{name: getattr(p, name) for name in PICK_FIELDS} for p in picks],
+        "final": None,
+        "graded": None,
+    })
+    return len(picks)
+
+
+def _events(day: date, league: League) -> Dict[str, dict]:
+    directory = live_dir(day, league)
+    if not os.path.isdir(directory):
+        return {}
+    return {
+        filename.removesuffix(".json"): codec.read(os.path.join(directory, filename), {})
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith(".json")
+    }
+
+
+def _picks(doc: dict, league: League, key=None) -> List[Pick]:
+    key = key or league.teams.parse_matchup(doc["matchup"])
+    return [Pick(key=key, **row) for row in doc["picks"]]
+
+
+def pending(day: date, league: League = NBA) -> List[str]:
+    """Tracked events that haven't gone final yet."""
+    return [event_id for event_id, doc in _events(day, league).items() if doc.get("final") is None]
+
+
+def poll(day: date, league: League = NBA) -> List[dict]:
+    """One scoreboard request, then one summary per newly final tracked event; grades and returns those."""
+    waiting = {event_id: doc for event_id, doc in _events(day, league).items() if doc.get("final") is None}
+    if not waiting:
+        return []
+
+    scoreboard = {g.game_id: g for g in get_games_for_date(day.strftime("%Y%m%d"), league)}
+    join = JoinTable(league, day)
+    finished = []
+    for event_id, doc in waiting.items():
+        game = scoreboard.get(event_id)
+        # Missing from the scoreboard (fetch failed, or listed under another date): ask its summary
+        if game is not None and not game.is_final:
+            continue
+
+        final = fetch_event_final(event_id, league)
+        if final is None:
+            continue
+
+        picks = _picks(doc, league, join.key(event_id))
+        key = picks[0].key
+        finals = Finals()
+        if key is not None:
+            finals.scores[key] = {"away": final["away"], "home": final["home"], "game_id": event_id}
+            finals.points[key] = final["points"]
+
+        doc["final"] = final
+        doc["graded"] = [list(grade_pick(p, finals, league)) for p in picks]
+        codec.write(_event_path(day, event_id, league), doc)
+        finished.append(doc)
+
+    return finished
+
+
+def night_record(day: date, league: League = NBA) -> Record:
+    """Running record over every tracked game that has gone final."""
+    record = Record()
+    for doc in _events(day, league).values():
+        for row, (_, hit) in zip(doc["picks"], doc.get("graded") or []):
+            record.add(row["kind"], hit)
+    return record
+
+
+def format_update(finished: List[dict], day: date, league: League = NBA) -> str:
+    """Grades for the games that just finished plus the night's running record."""
+    lines = []
+    for doc in finished:
+        lines.append(f"### 🏀 {doc['matchup']} (Final {doc['final']['away']}–{doc['final']['home']})")
+        for pick, (msg, _) in zip(_picks(doc, league), doc["graded"]):
+            lines.append(describe(pick, msg))
+        lines.append("")
+
+    still_live = len(pending(day, league))
+    lines.append(f"📈 **Tonight so far:** {night_record(day, league).overall()}")
+    if still_live:
+        lines.append(f"⏳ {still_live} alerted game(s) still in progress")
+    return "\n".join(lines)
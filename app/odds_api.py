@@ -1,238 +1,623 @@
+import threading
 import time
-import requests
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from app.keys import ODDS_API_KEY, ODDS_URL
-from app.constants import TEAM_MAP
-import json
+from typing import Callable, Optional
+from app.constants import (
+    FREE_LINE_SPREAD_MARGIN,
+    FREE_LINE_TOTAL_MARGIN,
+    HALFTIME_AFTER_TIP,
+    ODDS_REGIONS,
+    PROPS_CACHE_TTL,
+)
+from app.keys import ODDS_API_KEY
+from app.leagues import League, NBA
+from app.records import OddsLine
+from app.espn_api import normalize_name
+from app.join_table import JoinTable
+from app import codec, http_client, odds_quota
+from app.clock import slate_date
 import os
 
-PREGAME_FILE = "state/pregame_lines.json"
 CACHE_TTL = 300  # seconds
 
-_cache = {}  # key: market_type -> {"timestamp": float, "data": list}
-_pregame_spreads = {}
-_pregame_totals = {}
-_processed_games = set()
+# Everything this module remembers between calls lives in an OddsState: one
+# per AlertEngine (app/engine.py), or the process-wide default for the
+# scripts. use_state() selects it for the current context.
+
+class OddsState:
+    def __init__(self, clock: Optional[Callable[[], datetime]] = None):
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.now_ts = (lambda: clock().timestamp()) if clock else time.time   # hot path: cache freshness
+        self.cache = {}  # key: (league, market_type) -> {"timestamp": float, "data": list, "lines": {key: OddsLine}}
+        self.fetch_locks = {}  # key: (league, market_type) -> Lock, so concurrent games share one request
+        self.fetch_locks_guard = threading.Lock()
+        self.pregame = {}  # key: league -> {"spreads": {key: float}, "totals": {key: float}, "events": {key: {...}}, "closing": set, "stamp": (mtime, date)}
+        self.degraded = {}  # key: (league, market_type) -> reason, while that market is stale/unavailable
+        self.event_lines = {}  # key: (league, matchup key) -> (timestamp, OddsLine) from targeted halftime fetches
+        self.props = {}  # key: (league, Odds API event ID) -> (timestamp, {normalized name: points line})
+        self.free_lines = {}  # key: (league, matchup key) -> (timestamp, OddsLine) from ESPN scoreboard odds
+        self.free_settled = {}  # key: (league, matchup key) -> timestamp the free line settled it (no paid fetch)
+        self.joins = {}  # key: (league, date) -> tonight's JoinTable
+
+_default_state = OddsState()
+_state: ContextVar[OddsState] = ContextVar("odds_state", default=_default_state)
+
+@contextmanager
+def use_state(state: OddsState):
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+def _st() -> OddsState:
+    return _state.get()
+
+def _utcnow() -> datetime:
+    return _st().clock()
+
+def _now_ts() -> float:
+    return _st().now_ts()
+
+def _join(league: League) -> JoinTable:
+    day = slate_date(_utcnow())
+    table = _st().joins.get((league.key, day))
+    if table is None:
+        table = _st().joins[(league.key, day)] = JoinTable(league, day)
+    return table
+
+def use_join_table(table: JoinTable):
+    """Make a freshly built join table the current one for its league and night."""
+    _st().joins[(table.league.key, table.day)] = table
 
-REV_TEAM_MAP = {v: k for k, v in TEAM_MAP.items()}
+def _odds_event_id(key, league: League):
+    return get_pregame_events(league).get(key, {}).get("id") or _join(league).odds_id(key)
 
-def normalize_team_abbr(abbr: str) -> str:
+def normalize_team_abbr(abbr: str, league: League = NBA) -> str:
     """
-    Normalize ESPN-provided abbreviations to the ones used in TEAM_MAP.
+    Normalize ESPN-provided abbreviations to the ones used in the league's team map.
+    Unknown aliases are returned upper-cased and unchanged.
     """
-    abbr = abbr.upper()
+    tid = league.teams.team_id(abbr)
+    return league.teams.abbr(tid) if tid is not None else abbr.upper()
+
+def _keyed(lines, league):
+    """Convert persisted {"AWAY @ HOME": value} lines into matchup-key dicts."""
+    out = {}
+    for matchup, value in lines.items():
+        key = league.teams.parse_matchup(matchup)
+        if key is None:
+            print(f"⚠️ Unmapped team in pregame line: {matchup}")
+            continue
+        out[key] = value
+    return out
 
-    fixes = {
-        "UTAH": "UTA",
-        "PHO": "PHX",
-        "GS": "GSW",
-        "SA": "SAS",
-        "NO": "NOP",
-        "NY": "NYK",
-        "INDY": "IND",
-        "WSH": "WAS",
-        "CHAR": "CHA",
-        "OKC": "OKC",  # passthrough examples
+def _pregame_stamp(league: League):
+    """(file mtime, slate date): the in-memory pregame lines are only good while both match."""
+    try:
+        mtime = os.stat(league.pregame_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    return mtime, slate_date(_utcnow())
+
+def _load_pregame_cache(league: League = NBA):
+    entry = _st().pregame[league.key] = {
+        "spreads": {}, "totals": {}, "events": {}, "closing": set(), "closing_missed": set(),
+        "free": {"spreads": {}, "totals": {}}, "stamp": _pregame_stamp(league),
     }
+    path = league.pregame_path
 
-    return fixes.get(abbr, abbr)
-
-def _load_pregame_cache():
-    global _pregame_spreads, _pregame_totals
-    _pregame_spreads, _pregame_totals = {}, {}
-
-    if not os.path.exists(PREGAME_FILE):
-        print("⚠️ No pregame_lines.json found yet.")
-        return
+    if not os.path.exists(path):
+        print(f"⚠️ No {path} found yet.")
+        return entry
 
     try:
-        with open(PREGAME_FILE, "r") as f:
-            data = json.load(f)
+        data = codec.read(path)
 
-        _pregame_spreads = data.get("spreads", {})
-        _pregame_totals = data.get("totals", {})
+        entry["spreads"] = _keyed(data.get("spreads", {}), league)
+        entry["totals"] = _keyed(data.get("totals", {}), league)
+        entry["events"] = _keyed(data.get("events", {}), league)
+        entry["closing"] = set(_keyed({m: True for m in data.get("closing", [])}, league))
+        entry["closing_missed"] = set(_keyed({m: True for m in data.get("closing_missed", [])}, league))
+        free = data.get("free", {})
+        entry["free"] = {"spreads": _keyed(free.get("spreads", {}), league), "totals": _keyed(free.get("totals", {}), league)}
 
-        print("✅ Pregame spreads/totals loaded into memory.")
+        print(f"✅ {league.label} pregame spreads/totals loaded into memory.")
     except Exception as e:
         print(f"⚠️ Failed to load pregame file: {e}")
 
+    return entry
 
-_load_pregame_cache()
+def _pregame_lines(league: League):
+    return _st().pregame.get(league.key) or _load_pregame_cache(league)
 
-def _fetch_odds_data(market_type="spreads"):
-    now_ts = time.time()
-    entry = _cache.get(market_type)
-    if entry and (now_ts - entry["timestamp"] < CACHE_TTL):
-        return entry["data"]
-
-    try:
-        params = {
-            "apiKey": ODDS_API_KEY,
-            "regions": "us",
-            "markets": market_type,
-            "oddsFormat": "decimal",
-        }
-        response = requests.get(ODDS_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        _cache[market_type] = {"timestamp": now_ts, "data": data}
-        return data
-    except Exception as e:
-        print(f"⚠️ Error fetching odds for {market_type}: {e}")
-        return []
-
-def _abbr_key(away_name: str, home_name: str) -> str:
-    away_abbr = REV_TEAM_MAP.get(away_name, away_name)
-    home_abbr = REV_TEAM_MAP.get(home_name, home_name)
-    return f"{away_abbr} @ {home_abbr}"
-
-def _find_team_spread(team_abbr, outcomes):
+def refresh_pregame_lines(league: League = NBA) -> bool:
     """
-    The Odds API uses full team names in outcomes like:
-        [{'name': 'Los Angeles Lakers', 'point': -4.5}, ...]
-    So we match by FULL name derived from TEAM_MAP.
+    Reload the pregame file if it changed on disk (tomorrow's pregame_setup, or
+    capture_closing_lines in another process) or the slate date rolled over.
+    Long-running engines call this every tick; returns True if it reloaded.
     """
-    full_name = TEAM_MAP.get(team_abbr)
-    if not full_name:
-        return None
+    entry = _st().pregame.get(league.key)
+    if entry is not None and entry["stamp"] == _pregame_stamp(league):
+        return False
+    _load_pregame_cache(league)
+    return True
+
+def _fetch_lock(cache_key):
+    with _st().fetch_locks_guard:
+        return _st().fetch_locks.setdefault(cache_key, threading.Lock())
+
+def _get_odds(markets: str, league: League, **params):
+    """One Odds API request; the response headers update the quota model."""
+    params = {
+        "apiKey": ODDS_API_KEY,
+        "regions": ODDS_REGIONS,
+        "markets": markets,
+        "oddsFormat": "decimal",
+        **params,
+    }
+    r = http_client.get("odds", league.odds_url, params=params, timeout=10)
+    odds_quota.record(r.headers)
+    return codec.loads(r.content)
+
+def _fetch_odds_data(market_type="spreads", league: League = NBA):
+    cache_key = (league.key, market_type)
+
+    with _fetch_lock(cache_key):
+        now_ts = _now_ts()
+        entry = _st().cache.get(cache_key)
+        if entry and (now_ts - entry["timestamp"] < CACHE_TTL):
+            return entry["data"]
+
+        try:
+            data = _get_odds(market_type, league)
+            _st().cache[cache_key] = {
+                "timestamp": now_ts,
+                "data": data,
+                "lines": parse_odds_lines(data, market_type, league),
+            }
+            _st().degraded.pop(cache_key, None)
+            return data
+        except Exception as e:
+            print(f"⚠️ Error fetching {league.label} odds for {market_type}: {e}")
+            if entry:
+                age = int((now_ts - entry["timestamp"]) / 60)
+                _st().degraded[cache_key] = f"stale ({age} min old)"
+                return entry["data"]
+            _st().degraded[cache_key] = "unavailable"
+            return []
+
+def _refresh_slate(markets, league: League):
+    """One whole-slate request for several markets; fills every market's cache."""
+    cost = odds_quota.request_cost(len(markets))
+    if not odds_quota.can_spend(cost):
+        print(f"⚠️ Odds quota low ({odds_quota.remaining()} left); skipping {league.label} slate refresh.")
+        return
 
-    for name, point in outcomes.items():
-        if name.lower() == full_name.lower():
-            return point
-    return None
+    with _fetch_lock((league.key, "slate")):
+        now_ts = _now_ts()
+        try:
+            data = _get_odds(",".join(markets), league)
+        except Exception as e:
+            print(f"⚠️ Error fetching {league.label} odds slate: {e}")
+            return
+
+        lines = parse_odds_lines(data, ",".join(markets), league)
+        for market in markets:
+            _st().cache[(league.key, market)] = {"timestamp": now_ts, "data": data, "lines": lines}
+            _st().degraded.pop((league.key, market), None)
+
+def _slate_fresh(market, league: League, now_ts):
+    entry = _st().cache.get((league.key, market))
+    return entry is not None and now_ts - entry["timestamp"] < CACHE_TTL
+
+def _event_fresh(key, league: League, now_ts):
+    hit = _st().event_lines.get((league.key, key))
+    return hit is not None and now_ts - hit[0] < CACHE_TTL
+
+def _upcoming_halftimes(league: League, exclude, now):
+    """Games (outside `exclude`) expected to reach halftime before the odds cache expires."""
+    horizon = now + timedelta(seconds=CACHE_TTL)
+    count = 0
+    for key, ev in get_pregame_events(league).items():
+        if key in exclude or not ev.get("commence"):
+            continue
+        halftime = datetime.fromisoformat(ev["commence"]) + timedelta(seconds=HALFTIME_AFTER_TIP)
+        if now < halftime <= horizon:
+            count += 1
+    return count
 
-def record_all_pregame_lines():
-    spreads = {}
-    totals = {}
+def prefetch_halftime_lines(keys, league: League = NBA, markets=("spreads", "totals"), triggers=None):
+    """
+    Load live lines for the games at halftime this tick, in one request.
 
-    now = datetime.now(timezone.utc)
-    start_window = now.replace(hour=17, minute=0, second=0, microsecond=0)
-    if now.hour < 5:
-        start_window -= timedelta(days=1)
-    end_window = start_window + timedelta(hours=12)
+    With triggers (the loosest subscriber thresholds), games whose free ESPN
+    line has moved nowhere near them are settled from that line and cost
+    nothing (see needs_paid_line).
 
-    spread_data = _fetch_odds_data("spreads")
-    total_data = _fetch_odds_data("totals")
+    Both a targeted eventIds request and a whole-slate request cost
+    markets × regions, so: a fresh slate cache costs nothing; if more games
+    will hit halftime before the cache expires (or an event ID is unknown),
+    one slate request serves them all; otherwise only the halftime events are
+    fetched, with a payload the size of the batch instead of the slate.
+    """
+    now_ts = _now_ts()
+    if not keys or not markets or all(_slate_fresh(m, league, now_ts) for m in markets):
+        return
 
-    for game in spread_data:
-        commence_time = game.get("commence_time")
-        if not commence_time:
-            continue
+    if triggers is not None:
+        settled = [k for k in keys if not any(needs_paid_line(k, m, triggers, league) for m in markets)]
+        for key in settled:
+            _st().free_settled[(league.key, key)] = now_ts
+        if settled:
+            print(f"🆓 {league.label} odds: {len(settled)} game(s) settled from ESPN scoreboard lines.")
+        keys = [k for k in keys if k not in settled]
+        if not keys:
+            return
+
+    stale = [k for k in keys if not _event_fresh(k, league, now_ts)]
+    if not stale:
+        return
 
-        game_dt = datetime.fromisoformat(commence_time.replace("Z", "+00:00"))
-        if not (start_window <= game_dt <= end_window):
-            continue
+    ids = {eid: k for k in stale if (eid := _odds_event_id(k, league))}
+    upcoming = _upcoming_halftimes(league, set(keys), _utcnow())
 
-        home = game["home_team"]
-        away = game["away_team"]
-        abbr_key = _abbr_key(away, home)
+    if len(ids) < len(stale) or upcoming:
+        reason = f"{upcoming} more halftime(s) due" if upcoming else "event IDs unknown"
+        print(f"📡 {league.label} odds: whole-slate refresh ({reason}).")
+        _refresh_slate(markets, league)
+        return
 
-        market = next((m for m in game["bookmakers"][0]["markets"] 
-                       if m["key"] == "spreads"), None)
-        if not market:
-            continue
+    lines = fetch_event_lines(list(ids), league, ",".join(markets))
+    if lines is None:
+        return
+    for key, line in lines.items():
+        _st().event_lines[(league.key, key)] = (now_ts, line)
+    print(f"🎯 {league.label} odds: fetched {len(lines)} halftime event(s) only.")
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+def parse_player_points(event):
+    """{normalized player name: over/under points line}, median across bookmakers."""
+    quotes = {}
+    for book in event.get("bookmakers") or []:
+        for market in book.get("markets") or []:
+            if market.get("key") != "player_points":
+                continue
+            for o in market.get("outcomes") or []:
+                if o.get("name") == "Over" and o.get("description") and o.get("point") is not None:
+                    quotes.setdefault(normalize_name(o["description"]), []).append(o["point"])
+    return {norm: _median(points) for norm, points in quotes.items()}
+
+def get_player_points_lines(key, league: League = NBA):
+    """
+    Live player points lines for one game: a single /events/{id}/odds request
+    for every player, cached for the rest of the half. {} when unavailable.
+    """
+    event_id = _odds_event_id(key, league)
+    if not event_id:
+        return {}
+
+    cache_key = (league.key, event_id)
+    with _fetch_lock(("props",) + cache_key):
+        hit = _st().props.get(cache_key)
+        if hit and _now_ts() - hit[0] < PROPS_CACHE_TTL:
+            return hit[1]
+
+        if not odds_quota.can_spend(odds_quota.request_cost(1)):
+            print(f"⚠️ Odds quota low ({odds_quota.remaining()} left); no player lines for {league.teams.matchup_str(key)}.")
+            return {}
+
+        params = {"apiKey": ODDS_API_KEY, "regions": ODDS_REGIONS, "markets": "player_points", "oddsFormat": "decimal"}
+        try:
+            r = http_client.get("odds", league.event_odds_url(event_id), params=params, timeout=10)
+            odds_quota.record(r.headers)
+            lines = parse_player_points(codec.loads(r.content))
+        except Exception as e:
+            print(f"⚠️ Error fetching player points for {league.teams.matchup_str(key)}: {e}")
+            return {}
+
+        _st().props[cache_key] = (_now_ts(), lines)
+        return lines
+
+def _live_line(key, market, league: League):
+    st = _st()
+    now_ts = st.now_ts()
+    hit = st.event_lines.get((league.key, key))
+    if hit and now_ts - hit[0] < CACHE_TTL:
+        return hit[1]
+
+    # Settled from ESPN's line this tick: don't pay for it now
+    settled = st.free_settled.get((league.key, key))
+    if settled is not None and now_ts - settled < CACHE_TTL:
+        return free_line(key, league)
+
+    # Paid line when it's cached or affordable; otherwise (or if the game is missing) ESPN's
+    entry = st.cache.get((league.key, market))
+    if entry is not None and now_ts - entry["timestamp"] < CACHE_TTL:
+        lines = entry["lines"]
+    elif odds_quota.can_spend(odds_quota.request_cost(1)):
+        lines = _odds_lines(market, league)
+    else:
+        lines = {}
+    line = lines.get(key)
+    if line is not None and getattr(line, _FIELDS[market]) is not None:
+        return line
+    return free_line(key, league)
+
+# --- Free lines: odds embedded in the ESPN scoreboard ---
+#
+# Every scoreboard poll carries a spread and over/under for most games at no
+# cost. They're ESPN's book, not the Odds API consensus, so they decide
+# whether to pay for a line rather than replace it: a game whose ESPN line has
+# moved (since ESPN's own pregame line) well short of every trigger can't
+# alert, and skips the Odds API. An unmoved ESPN line may simply not be live,
+# so it never settles a game on its own. When the Odds API is unavailable or
+# out of quota, the free line stands in. Free lines carry source="espn" and are
+# only ever compared with ESPN's pregame line (get_spread_pair/get_total_pair):
+# two books' numbers differ without the line having moved.
+
+_FIELDS = {"spreads": "spread", "totals": "total"}
+
+def record_scoreboard_lines(games, league: League = NBA):
+    """Keep the scoreboard's free lines for this tick's games."""
+    now_ts = _now_ts()
+    for g in games:
+        if g.key is not None and (g.spread is not None or g.total is not None):
+            _st().free_lines[(league.key, g.key)] = (now_ts, OddsLine(key=g.key, event_id=None, commence_time=None,
+                                                                 spread=g.spread, total=g.total, source="espn"))
+
+def free_line(key, league: League = NBA):
+    hit = _st().free_lines.get((league.key, key))
+    if hit and _now_ts() - hit[0] < CACHE_TTL:
+        return hit[1]
+    return None
 
-        outcomes = {o["name"]: o.get("point") for o in market["outcomes"]}
+def needs_paid_line(key, market, triggers, league: League = NBA):
+    """
+    Does this game's halftime decision need the Odds API line? False only
+    when ESPN's line has moved since its pregame value and stays clear of
+    the trigger (and, for spreads, of a favorite flip) by the safety margin.
+    """
+    field = _FIELDS[market]
+    live = free_line(key, league)
+    live = getattr(live, field) if live else None
+    free_pre = _pregame_lines(league)["free"][market].get(key)
+    if live is None or free_pre is None or live == free_pre:
+        return True
+
+    if market == "spreads":
+        pre = get_pregame_spreads(league).get(key, free_pre)
+        flip_risk = pre < 0 and live > -FREE_LINE_SPREAD_MARGIN
+        return flip_risk or abs(live - free_pre) >= triggers["spread"] - FREE_LINE_SPREAD_MARGIN
+    return abs(live - free_pre) / free_pre >= triggers["total"] - FREE_LINE_TOTAL_MARGIN
+
+def _game_key(game, league: League = NBA, join: Optional[JoinTable] = None):
+    # Tonight's join table knows the event by ID; team names are the fallback
+    key = (join or _join(league)).key_for_odds(game.get("id"))
+    if key is not None:
+        return key
+    key = league.teams.matchup_key(game.get("away_team"), game.get("home_team"))
+    if key is None:
+        print(f"⚠️ Unmapped team in odds feed: {game.get('away_team')} @ {game.get('home_team')}")
+    return key
+
+def _odds_lines(market_type, league: League = NBA):
+    _fetch_odds_data(market_type, league)
+    entry = _st().cache.get((league.key, market_type))
+    return entry["lines"] if entry else {}
+
+def _market_outcomes(game, market_type):
+    """Outcomes of the first bookmaker that quotes this market."""
+    for book in game.get("bookmakers") or []:
+        market = next((m for m in book["markets"] if m["key"] == market_type), None)
+        if market:
+            return market["outcomes"]
+    return None
 
-        home_abbr = REV_TEAM_MAP.get(home)
-        spread_val = _find_team_spread(home_abbr, outcomes)
+def _find_team_spread(tid, outcomes, league: League = NBA):
+    """
+    The Odds API uses full team names in outcomes like:
+        [{'name': 'Los Angeles Lakers', 'point': -4.5}, ...]
+    So we resolve each outcome name through the team registry.
+    """
+    for o in outcomes:
+        if league.teams.team_id(o["name"]) == tid:
+            return o.get("point")
+    return None
 
-        if spread_val is not None:
-            spreads[abbr_key] = spread_val
+def _find_over(outcomes):
+    for o in outcomes:
+        if o["name"] == "Over":
+            return o.get("point")
+    return None
 
-    # Process totals
-    for game in total_data:
-        commence_time = game.get("commence_time")
-        if not commence_time:
-            continue
+def _commence(game):
+    commence_time = game.get("commence_time")
+    if not commence_time:
+        return None
+    return datetime.fromisoformat(commence_time.replace("Z", "+00:00"))
 
-        game_dt = datetime.fromisoformat(commence_time.replace("Z", "+00:00"))
-        if not (start_window <= game_dt <= end_window):
+def parse_odds_lines(data, markets, league: League = NBA):
+    """Parse an odds payload into {matchup key: OddsLine}; markets is e.g. "spreads" or "spreads,totals"."""
+    wanted = markets.split(",")
+    join = _join(league)
+    lines = {}
+    for game in data:
+        key = _game_key(game, league, join)
+        if key is None:
             continue
 
-        home = game["home_team"]
-        away = game["away_team"]
-        abbr_key = _abbr_key(away, home)
+        line = OddsLine(key=key, event_id=game.get("id"), commence_time=_commence(game))
+        if "spreads" in wanted:
+            outcomes = _market_outcomes(game, "spreads")
+            if outcomes:
+                line.spread = _find_team_spread(key[1], outcomes, league)
+        if "totals" in wanted:
+            outcomes = _market_outcomes(game, "totals")
+            if outcomes:
+                line.total = _find_over(outcomes)
+        lines[key] = line
+    return lines
+
+def _in_window(line, start_window, end_window):
+    return line.commence_time is not None and start_window <= line.commence_time <= end_window
+
+def record_all_pregame_lines(league: League = NBA, games=()):
+    """
+    Tonight's pregame spreads/totals from the Odds API. games (tonight's ESPN
+    scoreboard) supply the free ESPN lines, kept as their own baseline ("free")
+    for live free lines, including games the Odds API didn't price (e.g. quota
+    exhausted).
+    """
+    spreads = {}
+    totals = {}
+    events = {}
+
+    now = _utcnow()
+    start_window = now.replace(hour=17, minute=0, second=0, microsecond=0)
+    if now.hour < 5:
+        start_window -= timedelta(days=1)
+    end_window = start_window + timedelta(hours=12)
 
-        market = next((m for m in game["bookmakers"][0]["markets"]
-                       if m["key"] == "totals"), None)
-        if not market:
+    for market in ("spreads", "totals"):
+        for key, line in _odds_lines(market, league).items():
+            if not _in_window(line, start_window, end_window):
+                continue
+            matchup = league.teams.matchup_str(key)
+            # Odds API event ID + tip time, for closing-line capture and per-event fetches
+            events.setdefault(matchup, {"id": line.event_id, "commence": line.commence_time.isoformat()})
+            if market == "spreads" and line.spread is not None:
+                spreads[matchup] = line.spread
+            elif market == "totals" and line.total:
+                totals[matchup] = line.total
+
+    free = {"spreads": {}, "totals": {}}
+    for g in games:
+        if g.key is None:
             continue
+        matchup = league.teams.matchup_str(g.key)
+        if g.spread is not None:
+            free["spreads"][matchup] = g.spread
+        if g.total:
+            free["totals"][matchup] = g.total
 
-        outcomes = {o["name"]: o.get("point") for o in market["outcomes"]}
-        total_val = outcomes.get("Over")
-
-        if total_val:
-            totals[abbr_key] = total_val
+    # Games the Odds API didn't price keep only their ESPN baseline (in "free")
+    free_only = len((free["spreads"].keys() | free["totals"].keys()) - (spreads.keys() | totals.keys()))
 
     result = {
         "date": start_window.strftime("%Y-%m-%d"),
         "spreads": spreads,
-        "totals": totals
+        "totals": totals,
+        "events": events,
+        "closing": [],
+        "free": free,
     }
 
-    with open(PREGAME_FILE, "w") as f:
-        json.dump(result, f, indent=2)
+    _write_pregame(result, league)
 
-    print(f"💾 Saved {len(spreads)} spreads + {len(totals)} totals.")
+    print(f"💾 Saved {len(spreads)} {league.label} spreads + {len(totals)} totals.")
+    if free_only:
+        print(f"🆓 {free_only} {league.label} game(s) priced only by the ESPN scoreboard (missing from the Odds API).")
 
     # Refresh in-memory cache
-    _load_pregame_cache()
+    _load_pregame_cache(league)
 
     return result
 
-def get_live_spread(matchup):
-    away_abbr, _, home_abbr = matchup.partition(" @ ")
-    away_abbr = normalize_team_abbr(away_abbr)
-    home_abbr = normalize_team_abbr(home_abbr)
-
-    home_full = TEAM_MAP[home_abbr]
-    away_full = TEAM_MAP[away_abbr]
+def _write_pregame(doc, league: League):
+    codec.write(league.pregame_path, doc)
 
-    data = _fetch_odds_data("spreads")
-
-    for game in data:
-        if game["home_team"] == home_full and game["away_team"] == away_full:
-            market = next((m for m in game["bookmakers"][0]["markets"] 
-                           if m["key"] == "spreads"), None)
-            if not market:
-                return None
-
-            outcomes = {o["name"]: o.get("point") for o in market["outcomes"]}
-            return _find_team_spread(home_abbr, outcomes)
-
-    return None
-
-def get_live_total(matchup):
-    away_abbr, _, home_abbr = matchup.partition(" @ ")
-    away_abbr = normalize_team_abbr(away_abbr)
-    home_abbr = normalize_team_abbr(home_abbr)
-
-    home_full = TEAM_MAP[home_abbr]
-    away_full = TEAM_MAP[away_abbr]
-
-    data = _fetch_odds_data("totals")
-
-    for game in data:
-        if game["home_team"] == home_full and game["away_team"] == away_full:
-            market = next((m for m in game["bookmakers"][0]["markets"]
-                           if m["key"] == "totals"), None)
-            if not market:
-                return None
-
-            outcomes = {o["name"]: o.get("point") for o in market["outcomes"]}
-            return outcomes.get("Over")
-
-    return None
-
-def get_pregame_spreads():
-    return _pregame_spreads
+def fetch_event_lines(event_ids, league: League = NBA, markets: str = "spreads,totals"):
+    """
+    Lines for specific Odds API events in one request (billed per market, not per
+    event). Returns {matchup key: OddsLine}, or None when the quota can't cover it.
+    """
+    cost = odds_quota.request_cost(len(markets.split(",")))
+    if not odds_quota.can_spend(cost):
+        print(f"⚠️ Odds quota low ({odds_quota.remaining()} left); skipping {len(event_ids)} event(s).")
+        return None
 
-def get_pregame_totals():
-    return _pregame_totals
+    try:
+        data = _get_odds(markets, league, eventIds=",".join(sorted(event_ids)))
+    except Exception as e:
+        print(f"⚠️ Error fetching {league.label} odds for events {','.join(event_ids)}: {e}")
+        return None
+    return parse_odds_lines(data, markets, league)
 
-def mark_game_processed(matchup):
-    _processed_games.add(matchup)
+def record_closing_lines(lines, league: League = NBA, missed=()):
+    """
+    Overwrite the pregame baseline with closing lines captured just before tip.
+    Matchup keys in `missed` are marked so the scheduler stops waiting for them.
+    """
+    path = league.pregame_path
+    if not os.path.exists(path):
+        print(f"⚠️ No {path}; run pregame_setup first.")
+        return
 
-def is_game_processed(matchup):
-    return matchup in _processed_games
\ No newline at end of file
+    doc = codec.read(path)
+
+    closing = set(doc.get("closing", []))
+    # Keep whatever spelling the file already uses for a matchup
+    spelled = {league.teams.parse_matchup(m): m for m in doc.get("events", {})}
+    for key, line in lines.items():
+        matchup = spelled.get(key) or league.teams.matchup_str(key)
+        if line.spread is not None:
+            doc["spreads"][matchup] = line.spread
+        if line.total:
+            doc["totals"][matchup] = line.total
+        closing.add(matchup)
+    doc["closing"] = sorted(closing)
+    doc["closing_missed"] = sorted(set(doc.get("closing_missed", [])) | {league.teams.matchup_str(k) for k in missed})
+
+    _write_pregame(doc, league)
+    _load_pregame_cache(league)
+
+def get_pregame_events(league: League = NBA):
+    """{matchup key: {"id": Odds API event ID, "commence": ISO tip time}} from pregame."""
+    return _pregame_lines(league)["events"]
+
+def get_closing_captured(league: League = NBA):
+    """Matchup keys whose closing line was captured or given up on."""
+    entry = _pregame_lines(league)
+    return entry["closing"] | entry["closing_missed"]
+
+def _pair(key, market, league: League):
+    line = _live_line(key, market, league)
+    live = getattr(line, _FIELDS[market]) if line else None
+    entry = _pregame_lines(league)
+    baseline = entry["free"][market] if line is not None and line.source == "espn" else entry[market]
+    return baseline.get(key), live
+
+def get_spread_pair(key, league: League = NBA):
+    """(pregame, live) home spread from the same book, so a move is a move; either may be None."""
+    return _pair(key, "spreads", league)
+
+def get_total_pair(key, league: League = NBA):
+    """(pregame, live) over/under from the same book; either may be None."""
+    return _pair(key, "totals", league)
+
+def get_live_spread(key, league: League = NBA):
+    """Live home spread for a matchup key, or None if the game isn't on the board."""
+    line = _live_line(key, "spreads", league)
+    return line.spread if line else None
+
+def get_live_total(key, league: League = NBA):
+    """Live over/under for a matchup key, or None if the game isn't on the board."""
+    line = _live_line(key, "totals", league)
+    return line.total if line else None
+
+def degraded_markets(league: League = NBA):
+    """{market_type: reason} for markets whose last fetch failed."""
+    return {market: reason for (lg, market), reason in _st().degraded.items() if lg == league.key}
+
+def get_pregame_spreads(league: League = NBA):
+    return _pregame_lines(league)["spreads"]
+
+def get_pregame_totals(league: League = NBA):
+    return _pregame_lines(league)["totals"]
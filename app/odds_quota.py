@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from app import codec
+from app.constants import ODDS_QUOTA_RESERVE, ODDS_REGIONS
+
+# Odds API quota model
+#
+# The Odds API bills each /odds request at (markets × regions), however many
+# events it returns, and reports the running balance in response headers
+# (x-requests-remaining / x-requests-used / x-requests-last). The latest
+# balance is kept in state/odds_quota.json so every script plans against it.
+
+QUOTA_FILE = "state/odds_quota.json"
+
+_lock = threading.Lock()
+_state: Dict[str, Optional[float]] = {"remaining": None, "used": None, "last": None, "updated": None}
+
+
+def _load():
+    if not os.path.exists(QUOTA_FILE):
+        return
+    try:
+        _state.update(codec.read(QUOTA_FILE))
+    except Exception as e:
+        print(f"⚠️ Failed to load odds quota: {e}")
+
+
+_load()
+
+
+def request_cost(markets: int, regions: int = len(ODDS_REGIONS.split(","))) -> int:
+    return markets * regions
+
+
+def remaining() -> Optional[int]:
+    with _lock:
+        value = _state["remaining"]
+    return int(value) if value is not None else None
+
+
+def can_spend(cost: int, reserve: int = ODDS_QUOTA_RESERVE) -> bool:
+    """Unknown balance (first run) is allowed; otherwise keep `reserve` requests back."""
+    left = remaining()
+    return left is None or left - cost >= reserve
+
+
+def record(headers):
+    """Update the balance from an Odds API response's headers."""
+    def header(name):
+        value = headers.get(name)
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    with _lock:
+        if header("x-requests-remaining") is None:
+            return
+        _state.update({
+            "remaining": header("x-requests-remaining"),
+            "used": header("x-requests-used"),
+            "last": header("x-requests-last"),
+            "updated": time.time(),
+        })
+        snapshot = codec.dumps(_state)
+
+    codec.write_raw(QUOTA_FILE, snapshot)
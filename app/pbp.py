@@ -0,0 +1,227 @@
+from __future__ import annotations
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from app import codec, http_client
+from app.constants import PBP_PAGE_SIZE
+from app.espn_api import normalize_name
+from app.leagues import League, NBA
+from app.records import PlayerLine
+
+# Incremental play-by-play ingest
+#
+# ESPN's core API serves an event's plays oldest first, PBP_PAGE_SIZE per page.
+# A PlayByPlay keeps a cursor (plays consumed so far) in state/pbp/<event>.json,
+# so each update() requests only the page holding the cursor and any after it,
+# and folds just the new plays into running per-player counters:
+#
+#   points   scoring plays credit scoreValue to the first participant
+#   FGA/FGM  shooting plays other than free throws
+#   minutes  stints open on "enters the game" (or, for anyone on the floor at
+#            the start of a period, from the period start at their first play)
+#            and close on being subbed out or at the end of the period
+#
+# A player who stays on the floor for a whole period without touching a play
+# isn't seen until their next play; in practice that only happens in garbage time.
+#
+# A cursor is written on every update, so one untouched for PBP_CURSOR_TTL
+# belongs to a finished game; prune_cursors() clears those out at pregame setup.
+
+PBP_DIR = "state/pbp"
+
+_REF_ID = re.compile(r"/(?:athletes|teams)/(\d+)")
+
+
+def _ref_id(ref: Optional[str]) -> Optional[str]:
+    m = _REF_ID.search(ref or "")
+    return m[1] if m else None
+
+
+def _participants(play: Dict[str, Any]) -> List[tuple]:
+    """(athlete ID, $ref) for each participant, in ESPN's order (shooter / entering player first)."""
+    refs = [(p.get("athlete") or {}).get("$ref") for p in play.get("participants") or []]
+    return [(_ref_id(ref), ref) for ref in refs if _ref_id(ref)]
+
+
+class PlayByPlay:
+    def __init__(self, event_id: str, league: League = NBA, path: Optional[str] = None):
+        self.event_id = event_id
+        self.league = league
+        self.path = path or os.path.join(PBP_DIR, f"{event_id}.json")
+
+        doc = codec.read(self.path, {})
+        self.count: int = doc.get("count", 0)              # plays consumed
+        self.period: int = doc.get("period", 0)
+        self.elapsed: float = doc.get("elapsed", 0.0)      # seconds into the current period
+        self.seen: set = set(doc.get("seen", []))          # players who've touched a play this period
+        self.on_court: Dict[str, float] = doc.get("on_court", {})  # open stints: athlete → start
+        self.players: Dict[str, Dict[str, Any]] = doc.get("players", {})
+        self.names: Dict[str, str] = doc.get("names", {})  # athlete ID → display name
+        self.teams: Dict[str, str] = doc.get("teams", {})  # ESPN team ID → abbreviation
+
+    def save(self):
+        codec.write(self.path, {
+            "count": self.count, "period": self.period, "elapsed": self.elapsed,
+            "seen": sorted(self.seen), "on_court": self.on_court,
+            "players": self.players, "names": self.names, "teams": self.teams,
+        })
+
+    def seed(self, lines: List[PlayerLine]):
+        """Borrow names and teams from a boxscore so lines() needn't resolve athlete refs."""
+        for p in lines:
+            self.names[p.id] = p.name
+            if p.id in self.players and p.team:
+                self.players[p.id]["team"] = p.team
+
+    # --- Fetching ---
+
+    def update(self) -> int:
+        """Fetch and apply every play after the cursor; returns how many were new."""
+        new = 0
+        page = self.count // PBP_PAGE_SIZE + 1
+        while True:
+            try:
+                data = http_client.get_json(
+                    "espn", self.league.plays_url(self.event_id),
+                    params={"limit": PBP_PAGE_SIZE, "page": page}, timeout=10,
+                )
+            except Exception as e:
+                print(f"⚠️ ERROR loading ESPN plays {self.event_id}: {e}")
+                break
+
+            items = data.get("items") or []
+            fresh = items[self.count - (page - 1) * PBP_PAGE_SIZE:]
+            for play in fresh:
+                self.apply(play)
+            self.count += len(fresh)
+            new += len(fresh)
+
+            if page >= (data.get("pageCount") or 1) or len(items) < PBP_PAGE_SIZE:
+                break
+            page += 1
+
+        return new
+
+    @staticmethod
+    def _resolve(cache: Dict[str, str], ref: Optional[str], field: str) -> Optional[str]:
+        """Display name / abbreviation behind a core API $ref, fetched once per event."""
+        key = _ref_id(ref)
+        if key is None:
+            return None
+        if key not in cache:
+            try:
+                doc = http_client.get_json("espn", ref.replace("http://", "https://"), timeout=10)
+            except Exception as e:
+                print(f"⚠️ ERROR resolving {ref}: {e}")
+                return key
+            cache[key] = doc.get(field) or key
+        return cache[key]
+
+    # --- Applying plays ---
+
+    def _player(self, athlete: str, ref: str, play: Dict[str, Any], primary: bool) -> Dict[str, Any]:
+        p = self.players.get(athlete)
+        if p is None:
+            p = self.players[athlete] = {"ref": ref, "team": None, "points": 0, "seconds": 0.0, "fgm": 0, "fga": 0}
+        if p["team"] is None and primary:
+            # The play's team is the first participant's (a blocker or stealer is the opponent)
+            p["team"] = self._resolve(self.teams, (play.get("team") or {}).get("$ref"), "abbreviation")
+        return p
+
+    def _touch(self, athlete: str, ref: str, play: Dict[str, Any], primary: bool = False):
+        """First play of the period for someone not subbed in: on the floor since the period began."""
+        self._player(athlete, ref, play, primary)
+        if athlete not in self.seen:
+            self.seen.add(athlete)
+            self.on_court.setdefault(athlete, 0.0)
+
+    def _close(self, athlete: str, at: float):
+        start = self.on_court.pop(athlete, None)
+        if start is not None:
+            self.players[athlete]["seconds"] += max(0.0, at - start)
+
+    def _end_period(self):
+        length = self.league.period_length(self.period)
+        for athlete in list(self.on_court):
+            self._close(athlete, length)
+        self.seen.clear()
+        self.elapsed = float(length)
+
+    def apply(self, play: Dict[str, Any]):
+        period = (play.get("period") or {}).get("number") or self.period or 1
+        if period != self.period:
+            if self.period:
+                self._end_period()
+            self.period = period
+
+        clock = (play.get("clock") or {}).get("value")
+        if clock is not None:
+            self.elapsed = max(0.0, self.league.period_length(period) - float(clock))
+
+        kind = ((play.get("type") or {}).get("text") or "").lower()
+        athletes = _participants(play)
+
+        if "substitution" in kind and athletes:
+            (entering, entering_ref), leaving = athletes[0], athletes[1] if len(athletes) > 1 else None
+            if leaving:
+                self._touch(*leaving, play, primary=True)
+                self._close(leaving[0], self.elapsed)
+            self._player(entering, entering_ref, play, primary=True)
+            self.seen.add(entering)
+            self.on_court[entering] = self.elapsed
+            return
+
+        for i, (athlete, ref) in enumerate(athletes):
+            self._touch(athlete, ref, play, primary=i == 0)
+
+        if not athletes:
+            if "end period" in kind or "end of" in kind:
+                self._end_period()
+            return
+
+        shooter = self.players[athletes[0][0]]
+        if play.get("shootingPlay") and "free throw" not in kind:
+            shooter["fga"] += 1
+            if play.get("scoringPlay"):
+                shooter["fgm"] += 1
+        if play.get("scoringPlay"):
+            shooter["points"] += int(play.get("scoreValue") or 0)
+
+    # --- Output ---
+
+    def lines(self) -> List[PlayerLine]:
+        """Current stat lines, open stints counted up to the latest play."""
+        out = []
+        for athlete, p in self.players.items():
+            seconds = p["seconds"]
+            if athlete in self.on_court:
+                seconds += max(0.0, self.elapsed - self.on_court[athlete])
+            name = self._resolve(self.names, p["ref"], "displayName") or athlete
+            out.append(PlayerLine(
+                id=athlete,
+                name=name,
+                norm=normalize_name(name),
+                team=p["team"],
+                points=p["points"],
+                seconds=int(round(seconds)),
+                fgm=p["fgm"],
+                fga=p["fga"],
+            ))
+        return out
+
+
+def prune_cursors(older_than: float, directory: str = PBP_DIR) -> int:
+    """Delete cursor files last written before `older_than` (epoch seconds); returns how many."""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        try:
+            if os.path.getmtime(path) < older_than:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass            # another process got there first
+    return removed
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from app.constants import (
     MIN_MINUTES_FOR_VALID_SAMPLE,
     CONFIDENCE_WEIGHTS,
@@ -7,19 +7,34 @@ from app.constants import (
     EXPECTED_HALF_FGA,
     confidence_to_label,
 )
-from app.espn_api import fetch_boxscore_players, normalize_name
-
-def compute_confidence(pts, avg_ppg, min_float, fga, home_score, away_score, ppg_weight):
-    expected_half_pts = avg_ppg / 2 if avg_ppg else (EXPECTED_LEAGUE_LEADER_PPG / 2)
+from app.grading import player_line
+from app.leagues import League, NBA
+from app.projections import project_players, simulate_players
+from app.providers import fetch_boxscore_players
+from app.records import Alert, PlayerLine
+from app.season_store import SeasonStore
+from app.trigger_plans import PlayerPlan, player_plan
+
+def confidence_features(pts, avg_ppg, min_float, fga, home_score, away_score, ppg_weight,
+                        half_minutes=EXPECTED_HALF_MINUTES, half_fga=EXPECTED_HALF_FGA,
+                        leader_ppg=EXPECTED_LEAGUE_LEADER_PPG):
+    """Return the (U, M, Y, C, P) factors that compute_confidence weights."""
+    expected_half_pts = avg_ppg / 2 if avg_ppg else (leader_ppg / 2)
     U = min(1, pts / expected_half_pts) if expected_half_pts > 0 else 1
-    M = min(1, min_float / EXPECTED_HALF_MINUTES)
-    Y = min(1, fga / EXPECTED_HALF_FGA) if fga is not None else 0
+    M = min(1, min_float / half_minutes) if half_minutes > 0 else 0
+    Y = min(1, fga / half_fga) if fga is not None and half_fga > 0 else 0
 
     diff = abs(home_score - away_score)
     C = max(0, 1 - diff / 25)
 
     P = min(1, ppg_weight or 1)
 
+    return U, M, Y, C, P
+
+
+def weighted_confidence(features):
+    U, M, Y, C, P = features
+
     w = CONFIDENCE_WEIGHTS
     confidence = (
         (1 - U) * w["U"] +
@@ -32,65 +47,136 @@ def compute_confidence(pts, avg_ppg, min_float, fga, home_score, away_score, ppg
     return round(max(0, min(confidence, 1)), 2)
 
 
+def compute_confidence(pts, avg_ppg, min_float, fga, home_score, away_score, ppg_weight,
+                       half_minutes=EXPECTED_HALF_MINUTES, half_fga=EXPECTED_HALF_FGA):
+    return weighted_confidence(confidence_features(
+        pts, avg_ppg, min_float, fga, home_score, away_score, ppg_weight,
+        half_minutes, half_fga,
+    ))
+
+
 def analyze_game_players(
     event_id: str,
     matchup_abbr: str,
     top_scorers: Dict[str, Dict],
     home_score: int,
-    away_score: int
-) -> List[str]:
-    
-    alerts: List[str] = []
-
-    players = fetch_boxscore_players(event_id)
+    away_score: int,
+    store: Optional[SeasonStore] = None,
+    feature_sink: Optional[List[Dict]] = None,
+    league: League = NBA,
+    pace_trigger: Optional[float] = None,
+    points_lines: Optional[Callable[[], Dict[str, float]]] = None,
+    plan: Optional[Dict[str, PlayerPlan]] = None,
+    players: Optional[List[PlayerLine]] = None,
+) -> List[Alert]:
+    """
+    points_lines, when given, loads the game's player points market lines
+    ({normalized name: line}); it is only called once a tracked player
+    actually triggers, so quiet games cost no odds request.
+
+    plan holds the game's pregame-compiled scorers (app/trigger_plans.py);
+    without one, each tracked scorer's cut-off and baselines are worked out here.
+
+    players are the game's halftime stat lines when the caller already fetched
+    them; otherwise they're fetched here.
+    """
+
+    triggered = []
+    rows: List[Dict] = []            # this game's feature rows (also in feature_sink)
+    lines: Optional[Dict[str, float]] = None
+    pace_trigger = league.pace_trigger if pace_trigger is None else pace_trigger
+
+    if players is None:
+        players = fetch_boxscore_players(event_id, league)
     if not players:
-        return [f"⚠️ ESPN summary missing for {matchup_abbr}"]
+        return [Alert(kind="POINTS", text=f"⚠️ Boxscore missing for {matchup_abbr}")]
 
-    print(f"📊 DEBUG: {matchup_abbr} — Loaded {len(players)} players from ESPN.")
+    print(f"📊 DEBUG: {matchup_abbr} — Loaded {len(players)} players.")
 
     for p in players:
-        name = p["name"]
-        pts = p["points"]
-        fga = p["fga"]
-        minutes = p["minutes"]
+        pts = p.points
+        min_float = p.minutes
 
         # Skip zero-impact stints
-        if pts == 0 and minutes == "0:00":
+        if pts == 0 and p.seconds == 0:
             continue
 
-        # Convert "12:34" into floating minutes
-        try:
-            mm, ss = minutes.split(":")
-            min_float = int(mm) + int(ss) / 60
-        except:
-            min_float = 0
-
         # Skip minimal minutes unless scoring >5
         if min_float < MIN_MINUTES_FOR_VALID_SAMPLE and pts < 5:
             continue
 
-        # Use normalized name for matching
-        norm = normalize_name(name)
+        # Name was normalized once at parse time
+        info = plan.get(p.norm) if plan is not None else None
+        if info is None:
+            if p.norm not in top_scorers:
+                continue
+            info = player_plan(p.norm, top_scorers[p.norm], p.team, pace_trigger, store, league)
 
-        if norm not in top_scorers:
-            continue
-
-        player_info = top_scorers[norm]
-        avg_ppg = player_info["ppg"]
-        ppg_weight = player_info["ppg_weight"]
+        avg_ppg = info.ppg
+        half_minutes, half_fga, form_ppg = info.half_minutes, info.half_fga, info.form_ppg
 
         # Halftime confidence
-        conf = compute_confidence(
-            pts, avg_ppg, min_float, fga, home_score, away_score, ppg_weight
+        features = confidence_features(
+            pts, form_ppg, min_float, p.fga, home_score, away_score, info.ppg_weight,
+            half_minutes, half_fga, league.leader_ppg,
         )
+        conf = weighted_confidence(features)
         pace = pts / avg_ppg if avg_ppg > 0 else 0
 
-        # Trigger only if underperforming (<50% pace)
-        if pace < 0.50:
-            conf_label = confidence_to_label(conf, "POINTS")
-            alerts.append(
-                f"🎯 {name}: {pts} pts in {minutes} min (season avg {avg_ppg:.1f})\n"
-                f"Scoey's Take: {conf_label}"
-            )
+        # Every tracked player is a calibration sample, alerted or not
+        if feature_sink is not None:
+            row = {
+                "event_id": event_id,
+                "name": p.name,
+                "norm": p.norm,
+                "pts": pts,
+                "avg": avg_ppg,
+                "pace": round(pace, 4),
+                "features": [round(x, 4) for x in features],
+            }
+            rows.append(row)
+            feature_sink.append(row)
+
+        # Trigger only if underperforming (below the pace-trigger cut-off)
+        if pts < info.cutoff:
+            triggered.append((p, avg_ppg, form_ppg, half_minutes, half_fga, pace, conf))
+
+    if not triggered:
+        return []
+
+    if points_lines:
+        lines = points_lines()
+    lines = lines or {}
+
+    # Calibration grades against the market line wherever the game had one
+    for row in rows:
+        row["line"] = lines.get(row["norm"])
+
+    # One vectorized simulation for every triggered player in the game
+    finals = simulate_players(
+        [p.points for p, *_ in triggered],
+        [p.minutes for p, *_ in triggered],
+        [p.fga for p, *_ in triggered],
+        [form for _, _, form, *_ in triggered],
+        [t[3] for t in triggered],
+        [t[4] for t in triggered],
+        home_score - away_score,
+    )
+    grade_lines = [player_line(avg, lines.get(p.norm)) for p, avg, *_ in triggered]
+    projections = project_players(finals, grade_lines)
+
+    alerts: List[Alert] = []
+    for (p, avg_ppg, _, _, _, pace, conf), line, proj in zip(triggered, grade_lines, projections):
+        market = f", line {lines[p.norm]:.1f}" if p.norm in lines else ""
+        alerts.append(Alert(
+            kind="POINTS",
+            text=(
+                f"🎯 {p.name}: {p.points} pts in {p.minutes_display} min (season avg {avg_ppg:.1f}{market})\n"
+                f"🎲 Projected {proj.mean:.1f} pts, Over {line:.1f}: {proj.p_over:.0%}\n"
+                f"Scoey's Take: {confidence_to_label(conf, 'POINTS')}"
+            ),
+            magnitude=pace,
+            confidence=conf,
+        ))
 
     return alerts
\ No newline at end of file
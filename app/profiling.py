@@ -0,0 +1,126 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from app import http_client
+
+# Profiling mode for the scripts (--profile)
+#
+# Records a cProfile trace (main thread plus every task wrapped with
+# Profiler.wrap, so thread-pool work is included), tracemalloc peak memory and
+# wall time per named stage. Writes logs/profiles/<script>-<timestamp>.prof
+# (load with pstats/snakeviz) and a .txt summary with the top-N functions.
+#
+# Combine with --fixtures DIR to replay HTTP responses recorded earlier with
+# --record DIR, so a slow night can be profiled afterwards, offline.
+#
+# Before 3.12 cProfile hooks only the thread that enabled it, so each wrapped
+# task runs its own profiler and the results are merged on exit. From 3.12 it
+# sits on sys.monitoring, which sees every thread and admits one profiler at a
+# time (a second enable() raises ValueError), so wrap() leaves tasks alone.
+
+PROFILE_DIR = "logs/profiles"
+TOP_N = 30
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class Profiler:
+    def __init__(self, name: str, enabled: bool = False, top: int = TOP_N):
+        self.name = name
+        self.enabled = enabled
+        self.top = top
+        self.stages = []            # (stage, seconds, peak bytes)
+        self._main = cProfile.Profile() if enabled else None
+        self._workers = []
+        self._lock = threading.Lock()
+        self._start = 0.0
+
+    def __enter__(self):
+        if self.enabled:
+            tracemalloc.start()
+            self._start = time.perf_counter()
+            self._main.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.enabled:
+            self._main.disable()
+            wall = time.perf_counter() - self._start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write(wall, peak)
+        return False
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            self.stages.append((name, time.perf_counter() - start, peak))
+
+    def wrap(self, fn):
+        """Profile fn when it runs on a worker thread (cProfile only sees its own thread before 3.12)."""
+        if not self.enabled or PROFILES_ALL_THREADS:
+            return fn
+
+        def run(*args, **kwargs):
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.disable()
+                with self._lock:
+                    self._workers.append(prof)
+        return run
+
+    def _write(self, wall: float, peak: int):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+        out = io.StringIO()
+        stats = pstats.Stats(self._main, stream=out)
+        for prof in self._workers:
+            stats.add(prof)
+        stats.dump_stats(base + ".prof")
+
+        out.write(f"{self.name}: wall {wall:.3f}s, peak traced memory {peak / 1e6:.1f} MB\n\n")
+        out.write(f"{'stage':<24}{'wall (s)':>10}{'peak (MB)':>12}\n")
+        for stage, seconds, stage_peak in self.stages:
+            out.write(f"{stage:<24}{seconds:>10.3f}{stage_peak / 1e6:>12.1f}\n")
+        out.write("\n")
+
+        stats.sort_stats("cumulative").print_stats(self.top)
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+        print(f"⏱️ Profile written to {base}.txt / .prof ({wall:.2f}s, peak {peak / 1e6:.1f} MB)")
+
+
+def add_profiling_args(parser):
+    parser.add_argument("--profile", action="store_true", help="write a cProfile/tracemalloc report under logs/profiles/")
+    parser.add_argument("--fixtures", metavar="DIR", help="replay recorded HTTP responses from DIR")
+    parser.add_argument("--record", metavar="DIR", help="record HTTP responses into DIR")
+
+
+def profiler_from_args(name: str, args) -> Profiler:
+    if args.fixtures:
+        http_client.use_fixtures(args.fixtures, record=False)
+    elif args.record:
+        http_client.use_fixtures(args.record, record=True)
+    return Profiler(name, enabled=args.profile)
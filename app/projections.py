@@ -0,0 +1,110 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.constants import (
+    BLOWOUT_MARGIN,
+    PLAYER_MINUTES_SD,
+    PLAYER_RATE_SHAPE,
+    PROJECTION_PRIOR_MINUTES,
+    PROJECTION_SIMS,
+    TOTAL_PACE_PRIOR,
+    TOTAL_SECOND_HALF_SD,
+)
+
+# Monte Carlo second-half projections
+#
+# Players: second-half minutes ~ Normal(expected half minutes, shrunk in a
+# blowout), scoring rate ~ Gamma around the season rate blended with the
+# first-half rate (weighted by minutes played) and nudged by FGA usage, and
+# points ~ Poisson(rate × minutes). The gamma mixture gives the fat right
+# tail real box scores have.
+#
+# Totals: second-half points ~ Normal around a blend of the pregame pace
+# (half the pregame total) and first-half pace, with the sd scaled to the
+# league's scoring level.
+#
+# p_over/p_under are the model's own probabilities against the line given; they
+# haven't been calibrated against graded outcomes, so read them as a ranking of
+# edges rather than hit rates.
+#
+# One game is a single (players × sims) draw, so even 20k sims per game keeps
+# a full slate to a few milliseconds per game.
+
+
+@dataclass(slots=True)
+class Projection:
+    mean: float                      # projected final points
+    p_over: Optional[float] = None   # P(final > line); pushes count as neither side
+    p_under: Optional[float] = None
+
+    def side(self) -> Optional[str]:
+        """The side the simulation favours, or None without a line."""
+        if self.p_over is None:
+            return None
+        return "Over" if self.p_over >= self.p_under else "Under"
+
+    def edge(self) -> float:
+        """Probability of the favoured side minus a coin flip."""
+        if self.p_over is None:
+            return 0.0
+        return max(self.p_over, self.p_under) - 0.5
+
+
+def _rng(seed: Optional[int]) -> np.random.Generator:
+    # A fresh generator per call: halftime games are analyzed on parallel threads
+    return np.random.default_rng(seed)
+
+
+def _against(finals: np.ndarray, line: Optional[float], mean: float) -> Projection:
+    mean = round(float(mean), 1)
+    if line is None:
+        return Projection(mean)
+    return Projection(mean, float(np.mean(finals > line)), float(np.mean(finals < line)))
+
+
+def simulate_players(pts: Sequence[float], minutes: Sequence[float], fga: Sequence[float],
+                     ppg: Sequence[float], half_minutes: Sequence[float], half_fga: Sequence[float],
+                     margin: float, sims: int = PROJECTION_SIMS, seed: Optional[int] = None) -> np.ndarray:
+    """Final-points draws, shape (players, sims), for players at halftime."""
+    pts = np.asarray(pts, dtype=np.float64)[:, None]
+    played = np.asarray(minutes, dtype=np.float64)[:, None]
+    fga = np.asarray(fga, dtype=np.float64)[:, None]
+    ppg = np.asarray(ppg, dtype=np.float64)[:, None]
+    half_minutes = np.maximum(np.asarray(half_minutes, dtype=np.float64)[:, None], 1.0)
+    half_fga = np.maximum(np.asarray(half_fga, dtype=np.float64)[:, None], 1.0)
+    rng = _rng(seed)
+
+    # Scoring rate: season prior shrunk toward the first half, scaled by usage
+    season_rate = ppg / (2 * half_minutes)
+    first_half_rate = np.divide(pts, played, out=season_rate.copy(), where=played > 0)
+    rate = (season_rate * PROJECTION_PRIOR_MINUTES + first_half_rate * played) / (PROJECTION_PRIOR_MINUTES + played)
+    rate *= np.clip(0.85 + 0.15 * fga / half_fga, 0.85, 1.15)
+
+    # Second-half minutes: starters sit in blowouts
+    blowout = np.clip(1 - max(0.0, abs(margin) - BLOWOUT_MARGIN) / 30, 0.5, 1.0)
+    expected = half_minutes * blowout
+    minutes_2h = rng.normal(expected, PLAYER_MINUTES_SD * expected, size=(len(pts), sims))
+    np.clip(minutes_2h, 0.0, 2 * half_minutes, out=minutes_2h)
+
+    rates = rng.gamma(PLAYER_RATE_SHAPE, 1 / PLAYER_RATE_SHAPE, size=minutes_2h.shape) * rate
+    return pts + rng.poisson(rates * minutes_2h)
+
+
+def project_players(finals: np.ndarray, lines: Sequence[Optional[float]]) -> list:
+    """One Projection per simulate_players row, against each player's line (or None)."""
+    means = finals.mean(axis=1)
+    return [_against(row, line, mean) for row, line, mean in zip(finals, lines, means)]
+
+
+def project_total(home_score: int, away_score: int, pre_total: Optional[float], line: Optional[float],
+                  sims: int = PROJECTION_SIMS, seed: Optional[int] = None) -> Projection:
+    """Final combined score from the halftime score and pregame pace."""
+    first_half = home_score + away_score
+    pace = first_half if pre_total is None else TOTAL_PACE_PRIOR * pre_total / 2 + (1 - TOTAL_PACE_PRIOR) * first_half
+    sd = TOTAL_SECOND_HALF_SD * np.sqrt(max(pace, 1.0) / 115)
+
+    finals = first_half + _rng(seed).normal(pace, sd, size=sims)
+    return _against(finals, line, first_half + pace)
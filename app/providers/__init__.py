@@ -0,0 +1,38 @@
+from __future__ import annotations
+from typing import List, Optional
+
+from app.join_table import JoinTable
+from app.leagues import League, NBA
+from app.providers.base import IncompleteData, StatsProvider
+from app.providers.espn import EspnProvider
+from app.providers.nba_cdn import NbaCdnProvider
+from app.providers.pool import AllProvidersFailed, ProviderPool
+from app.records import Game, PlayerLine
+
+# Scoreboard and boxscore through the default pool: ESPN first, NBA.com's live
+# CDN as the second source for NBA games. Same signatures as the app.espn_api
+# functions they stand in for on the halftime path, plus an optional join: the
+# tick's JoinTable, so the pool doesn't re-read it from disk on every call.
+
+POOL = ProviderPool([EspnProvider(), NbaCdnProvider()])
+
+
+def get_today_games(league: League = NBA, join: Optional[JoinTable] = None) -> List[Game]:
+    try:
+        return POOL.scoreboard(league, join)
+    except AllProvidersFailed as e:
+        print(f"⚠️ No {league.label} scoreboard from any provider: {e}")
+        return []
+
+
+def iter_halftimes(league: League = NBA, join: Optional[JoinTable] = None) -> List[Game]:
+    return [g for g in get_today_games(league, join) if g.is_halftime]
+
+
+def fetch_boxscore_players(event_id: str, league: League = NBA, join: Optional[JoinTable] = None) -> List[PlayerLine]:
+    try:
+        return POOL.boxscore(event_id, league, join)
+    except AllProvidersFailed as e:
+        print(f"⚠️ No boxscore for {event_id} from any provider: {e}")
+        return []
+
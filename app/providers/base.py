@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import List
+
+from app.leagues import League
+from app.records import Game, PlayerLine
+
+# Stats provider contract
+#
+# A provider turns one upstream's scoreboard and boxscore into the shared
+# records (Game, PlayerLine), so the alert path never sees provider JSON.
+#
+#   name                 label used in logs and pool stats
+#   upstream             http_client upstream (rate limit + circuit breaker)
+#   espn_ids             whether scoreboard() Game.game_id is the ESPN event ID
+#   supports(league)     whether it can serve this league at all
+#   scoreboard(league)   tonight's games; raise on any failure rather than
+#                        returning a partial slate
+#   boxscore(game, league)
+#                        player lines for a game; raise IncompleteData when the
+#                        upstream answered without usable player stats
+#
+# Outside the pool Game.game_id is always the ESPN event ID (the key for
+# processed games, halftime claims and logs). A provider with its own IDs sets
+# espn_ids = False; the pool swaps in the ESPN ID by matchup and boxscore()
+# gets the Game back, so the provider finds its own ID through Game.key.
+# Anything implementing these members, e.g. a stand-in returning canned
+# records, can go in a ProviderPool.
+
+
+class IncompleteData(Exception):
+    """The upstream answered, but without the data we asked for."""
+
+
+class StatsProvider:
+    name = "base"
+    upstream = ""
+    espn_ids = True
+
+    def supports(self, league: League) -> bool:
+        return True
+
+    def scoreboard(self, league: League) -> List[Game]:
+        raise NotImplementedError
+
+    def boxscore(self, game: Game, league: League) -> List[PlayerLine]:
+        raise NotImplementedError
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from typing import List
+
+from app import http_client
+from app.espn_api import get_today_games, parse_boxscore_players
+from app.leagues import League
+from app.providers.base import IncompleteData, StatsProvider
+from app.records import Game, PlayerLine
+
+
+class EspnProvider(StatsProvider):
+    name = "espn"
+    upstream = "espn"
+
+    def scoreboard(self, league: League) -> List[Game]:
+        return get_today_games(league, strict=True)
+
+    def boxscore(self, game: Game, league: League) -> List[PlayerLine]:
+        data = http_client.get_json(self.upstream, league.summary_url(game.game_id), timeout=10)
+        players = parse_boxscore_players(data)
+        if not players:
+            raise IncompleteData(f"ESPN summary {game.game_id} has no player stats")
+        return players
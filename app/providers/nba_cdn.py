@@ -0,0 +1,125 @@
+from __future__ import annotations
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app import http_client
+from app.espn_api import normalize_name
+from app.leagues import League
+from app.providers.base import IncompleteData, StatsProvider
+from app.records import Game, PlayerLine
+from app.teams import MatchupKey
+
+# NBA.com live-data CDN (public JSON, NBA only)
+#
+# Game IDs here are NBA's ("0022500201"), not ESPN's. Games from this feed
+# carry the NBA ID in Game.nba_game_id; the pool swaps in the ESPN event ID by
+# matchup and drops games it can't map. A boxscore for an ESPN-sourced game is found through this feed's
+# own scoreboard, also by matchup.
+
+CDN_BASE_URL = "https://cdn.nba.com/static/json/liveData"
+SCOREBOARD_TTL = 60             # seconds a scoreboard is reused to resolve boxscore IDs
+
+_ISO_MINUTES = re.compile(r"PT(?:(\d+)M)?(?:(\d+)(?:\.\d+)?S)?")
+
+
+def parse_iso_seconds(value: Optional[str]) -> int:
+    """NBA CDN minutes come as ISO durations, e.g. "PT17M32.00S"."""
+    m = _ISO_MINUTES.fullmatch(value or "")
+    if not m:
+        return 0
+    return int(m[1] or 0) * 60 + int(m[2] or 0)
+
+
+def _to_game(g: Dict[str, Any], league: League) -> Game:
+    away, home = g.get("awayTeam") or {}, g.get("homeTeam") or {}
+    away_abbr, home_abbr = away.get("teamTricode"), home.get("teamTricode")
+    status, text, period = g.get("gameStatus"), g.get("gameStatusText") or "", g.get("period")
+
+    if status == 3:
+        name, detail = "STATUS_FINAL", "Final"
+    elif status == 2 and period == 2 and text.lower().startswith("half"):
+        name, detail = "STATUS_HALFTIME", "Halftime"
+    elif status == 2:
+        name, detail = "STATUS_IN_PROGRESS", text
+    else:
+        name, detail = "STATUS_SCHEDULED", text
+
+    return Game(
+        game_id=f"nba-{g.get('gameId')}",        # replaced with the ESPN event ID (or dropped) by the pool
+        nba_game_id=g.get("gameId"),
+        matchup=f"{away_abbr} @ {home_abbr}" if away_abbr and home_abbr else None,
+        key=league.teams.matchup_key(away_abbr, home_abbr),
+        away_abbr=away_abbr,
+        home_abbr=home_abbr,
+        away_score=away.get("score"),
+        home_score=home.get("score"),
+        status_name=name,
+        status_detail=detail,
+        period=period,
+        clock=g.get("gameClock"),
+    )
+
+
+def parse_boxscore(data: Dict[str, Any]) -> List[PlayerLine]:
+    out = []
+    game = data.get("game") or {}
+    for side in ("awayTeam", "homeTeam"):
+        team = game.get(side) or {}
+        for p in team.get("players") or []:
+            stats = p.get("statistics") or {}
+            name = p.get("name") or f"{p.get('firstName', '')} {p.get('familyName', '')}".strip()
+            out.append(PlayerLine(
+                id=str(p.get("personId")),
+                name=name,
+                norm=normalize_name(name),
+                team=team.get("teamTricode"),
+                points=int(stats.get("points") or 0),
+                seconds=parse_iso_seconds(stats.get("minutes")),
+                fgm=int(stats.get("fieldGoalsMade") or 0),
+                fga=int(stats.get("fieldGoalsAttempted") or 0),
+            ))
+    return out
+
+
+class NbaCdnProvider(StatsProvider):
+    name = "nba_cdn"
+    upstream = "nba_cdn"
+    espn_ids = False
+
+    def __init__(self):
+        self._ids: Dict[MatchupKey, str] = {}
+        self._ids_at = 0.0
+        self._lock = threading.Lock()
+
+    def supports(self, league: League) -> bool:
+        return league.key == "nba"
+
+    def scoreboard(self, league: League) -> List[Game]:
+        data = http_client.get_json(self.upstream, f"{CDN_BASE_URL}/scoreboard/todaysScoreboard_00.json", timeout=10)
+        games = [_to_game(g, league) for g in (data.get("scoreboard") or {}).get("games") or []]
+        with self._lock:
+            self._ids = {g.key: g.nba_game_id for g in games if g.key is not None}
+            self._ids_at = time.monotonic()
+        return [g for g in games if g.matchup]
+
+    def _nba_id(self, game: Game, league: League) -> str:
+        if game.nba_game_id and game.nba_game_id.startswith("00"):
+            return game.nba_game_id
+        with self._lock:
+            stale = time.monotonic() - self._ids_at > SCOREBOARD_TTL
+        if stale or game.key not in self._ids:
+            self.scoreboard(league)
+        nba_id = self._ids.get(game.key)
+        if nba_id is None:
+            raise IncompleteData(f"{game.matchup} not on the NBA.com scoreboard")
+        return nba_id
+
+    def boxscore(self, game: Game, league: League) -> List[PlayerLine]:
+        nba_id = self._nba_id(game, league)
+        data = http_client.get_json(self.upstream, f"{CDN_BASE_URL}/boxscore/boxscore_{nba_id}.json", timeout=10)
+        players = parse_boxscore(data)
+        if not players:
+            raise IncompleteData(f"NBA.com boxscore {nba_id} has no player stats")
+        return players
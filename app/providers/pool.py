@@ -0,0 +1,178 @@
+from __future__ import annotations
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app import resilience
+from app.constants import MAX_CONCURRENT_GAMES, PROVIDER_EWMA_ALPHA, PROVIDER_ERROR_PENALTY
+from app.join_table import JoinTable
+from app.leagues import League
+from app.providers.base import StatsProvider
+from app.records import Game, PlayerLine
+
+# Provider pool: pick per request, race past the latency budget
+#
+# Every (provider, operation) pair keeps an EWMA of its latency and error rate.
+# A request goes to the lowest score (latency × (1 + penalty × error rate)),
+# skipping providers whose circuit breaker is open. If the pick hasn't answered
+# within its p95 latency budget the next one starts too and the first good
+# answer wins; an error or IncompleteData moves on to the next straight away.
+# Latency priors come from the breakers' persisted samples, so a fresh cron
+# tick still knows which upstream has been slow.
+#
+# The executor has a thread per provider for every game the engine analyzes at
+# once (MAX_CONCURRENT_GAMES), and latency is timed from when a call starts
+# running, so a busy slate doesn't count queueing against a provider.
+#
+# Games from ESPN scoreboards are added to tonight's join table
+# (app/join_table.py), which is how games from other providers get their
+# ESPN IDs. A game the table can't map is left out of that scoreboard: halftime
+# claims, leases and processed IDs are all ESPN event IDs, and a stand-in ID
+# would let the same halftime be claimed again once ESPN is back. ESPN games the
+# table already knows take their matchup key from it (by event ID) rather
+# than from the scoreboard's team names. Reading the
+# table is a disk read, so callers build it once per tick and pass it in; a
+# call without one reads it once itself.
+
+
+class AllProvidersFailed(Exception):
+    """No provider produced a usable answer."""
+
+
+class ProviderPool:
+    def __init__(self, providers: List[StatsProvider], alpha: float = PROVIDER_EWMA_ALPHA,
+                 penalty: float = PROVIDER_ERROR_PENALTY, concurrency: int = MAX_CONCURRENT_GAMES):
+        self.providers = providers
+        self.alpha = alpha
+        self.penalty = penalty
+        self._stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._games: Dict[str, Game] = {}          # last scoreboard, by ESPN event ID
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency * len(providers), thread_name_prefix="provider")
+
+    # --- Ranking ---
+
+    def _entry(self, p: StatsProvider, op: str) -> Dict[str, float]:
+        return self._stats.setdefault((p.name, op), {"latency": resilience.latency_budget(p.upstream), "errors": 0.0})
+
+    def score(self, p: StatsProvider, op: str) -> float:
+        with self._lock:
+            e = self._entry(p, op)
+            return e["latency"] * (1 + self.penalty * e["errors"])
+
+    def _observe(self, p: StatsProvider, op: str, latency: float, ok: bool):
+        a = self.alpha
+        with self._lock:
+            e = self._entry(p, op)
+            e["latency"] = (1 - a) * e["latency"] + a * latency
+            e["errors"] = (1 - a) * e["errors"] + a * (0.0 if ok else 1.0)
+
+    def ranked(self, league: League, op: str) -> List[StatsProvider]:
+        usable = [p for p in self.providers if p.supports(league) and not resilience.is_open(p.upstream)]
+        return sorted(usable, key=lambda p: self.score(p, op))     # stable: ties keep list order
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {f"{name}.{op}": {k: round(v, 3) for k, v in e.items()} for (name, op), e in self._stats.items()}
+
+    # --- Racing ---
+
+    def _run(self, op: str, league: League, call: Callable[[StatsProvider], object]):
+        queue = self.ranked(league, op)
+        if not queue:
+            raise AllProvidersFailed(f"no {op} provider available for {league.label}")
+
+        pending = {}
+        errors = []
+
+        def launch():
+            p = queue.pop(0)
+            started = [time.monotonic()]
+
+            def timed(provider):
+                started[0] = time.monotonic()      # from when it runs, not when it was queued
+                return call(provider)
+
+            fut = self._executor.submit(contextvars.copy_context().run, timed, p)
+            # Losers of a race still report in, so a slow provider's average catches up
+            fut.add_done_callback(lambda f: self._observe(p, op, time.monotonic() - started[0], f.exception() is None))
+            pending[fut] = p
+            return p
+
+        last = launch()
+        while pending:
+            budget = resilience.latency_budget(last.upstream) if queue else None
+            done, _ = wait(pending, timeout=budget, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"🏁 {last.name} {op} past its {budget:.1f}s budget; racing {queue[0].name}.")
+                last = launch()
+                continue
+
+            for fut in done:
+                p = pending.pop(fut)
+                try:
+                    return p, fut.result()
+                except Exception as e:
+                    errors.append(f"{p.name}: {e}")
+                    if queue:
+                        print(f"⚠️ {p.name} {op} failed ({e}); trying {queue[0].name}.")
+                        last = launch()
+
+        raise AllProvidersFailed(f"{league.label} {op}: " + "; ".join(errors))
+
+    # --- ESPN event IDs ---
+
+    def _learn_ids(self, games: List[Game], table: JoinTable):
+        for g in games:
+            key = table.key(g.game_id)
+            if key is not None:
+                g.key = key
+        if table.add(games):
+            table.save()
+
+    def _espn_ids(self, games: List[Game], table: JoinTable) -> List[Game]:
+        mapped, skipped = [], []
+        for g in games:
+            eid = table.espn_id(g.key)
+            if eid:
+                g.game_id = eid
+                mapped.append(g)
+            else:
+                skipped.append(g.matchup)
+        if skipped:
+            print(f"⏭️ No ESPN event ID in the join table for {', '.join(skipped)}; skipping until there is one.")
+        return mapped
+
+    def _game(self, event_id: str, league: League, join: Optional[JoinTable]) -> Game:
+        with self._lock:
+            game = self._games.get(event_id)
+        if game is not None:
+            return game
+        key = (join or JoinTable(league)).key(event_id)
+        if key is None:
+            return Game(event_id, None, None, None, None, None, None)
+        away, home = league.teams.abbr(key[0]), league.teams.abbr(key[1])
+        return Game(event_id, league.teams.matchup_str(key), key, away, home, None, None)
+
+    # --- Public ---
+
+    def scoreboard(self, league: League, join: Optional[JoinTable] = None) -> List[Game]:
+        p, games = self._run("scoreboard", league, lambda p: p.scoreboard(league))
+        join = join or JoinTable(league)
+        if p.espn_ids:
+            self._learn_ids(games, join)
+        else:
+            games = self._espn_ids(games, join)
+        with self._lock:
+            self._games.update((g.game_id, g) for g in games)
+        return games
+
+    def boxscore(self, event_id: str, league: League, join: Optional[JoinTable] = None) -> List[PlayerLine]:
+        game = self._game(event_id, league, join)
+        _, players = self._run("boxscore", league, lambda p: p.boxscore(game, league))
+        return players
+
+    def close(self):
+        self._executor.shutdown(wait=False)
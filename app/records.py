@@ -0,0 +1,106 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.teams import MatchupKey
+
+# Compact record types shared by every module.
+# Slotted dataclasses: no per-instance __dict__, and everything that used to be
+# re-parsed in the alert loop (minutes, FG made/attempted) is parsed once here.
+
+VOID_STATUSES = frozenset({"STATUS_POSTPONED", "STATUS_CANCELED", "STATUS_SUSPENDED", "STATUS_FORFEIT"})
+
+
+@dataclass(slots=True)
+class Game:
+    game_id: str                     # ESPN event ID
+    matchup: Optional[str]           # ESPN abbreviations, e.g. "GS @ OKC"
+    key: Optional[MatchupKey]        # (away_id, home_id), None if an alias is unmapped
+    away_abbr: Optional[str]
+    home_abbr: Optional[str]
+    away_score: Optional[int]
+    home_score: Optional[int]
+    status_name: str = ""
+    status_detail: str = ""
+    period: Optional[int] = None
+    clock: Optional[str] = None
+    nba_game_id: Optional[str] = None
+    spread: Optional[float] = None   # home spread from ESPN's scoreboard odds (free, secondary source)
+    total: Optional[float] = None    # over/under from ESPN's scoreboard odds
+
+    @property
+    def is_final(self) -> bool:
+        return "final" in self.status_name.lower()
+
+    @property
+    def is_void(self) -> bool:
+        """Postponed, canceled or suspended: never goes final on its scheduled day."""
+        return self.status_name in VOID_STATUSES
+
+    @property
+    def is_halftime(self) -> bool:
+        return "Halftime" in self.status_detail
+
+
+@dataclass(slots=True)
+class PlayerLine:
+    id: str
+    name: str
+    norm: str                        # normalize_name(name), computed once
+    team: Optional[str]
+    points: int = 0
+    seconds: int = 0
+    fgm: int = 0
+    fga: int = 0
+
+    @property
+    def minutes(self) -> float:
+        return self.seconds / 60
+
+    @property
+    def minutes_display(self) -> str:
+        return f"{self.seconds // 60}:{self.seconds % 60:02d}"
+
+
+@dataclass(slots=True)
+class OddsLine:
+    key: MatchupKey
+    event_id: Optional[str]
+    commence_time: Optional[datetime]
+    spread: Optional[float] = None   # home team spread
+    total: Optional[float] = None    # over/under points
+    source: str = "odds_api"         # "espn" for free scoreboard lines; compare only against the same source's pregame line
+
+
+def parse_seconds(minutes) -> int:
+    """ESPN minutes come as "MM:SS" or a bare "34"; return whole seconds."""
+    if not minutes or not isinstance(minutes, str):
+        return 0
+    try:
+        if ":" in minutes:
+            mm, ss = minutes.split(":")
+            return int(mm) * 60 + int(ss)
+        return int(minutes) * 60
+    except ValueError:
+        return 0
+
+
+def parse_made_attempted(stat) -> tuple:
+    """Parse "M-A" shooting strings into (made, attempted) integers."""
+    if not isinstance(stat, str) or "-" not in stat:
+        return 0, 0
+    made, _, attempted = stat.partition("-")
+    try:
+        return int(made), int(attempted)
+    except ValueError:
+        return 0, 0
+
+
+@dataclass(slots=True)
+class Alert:
+    kind: str                        # "POINTS" | "SPREAD" | "TOTAL"
+    text: str
+    magnitude: float = 0.0           # pace (POINTS), |Δ| pts (SPREAD), |Δ|/pre (TOTAL)
+    confidence: Optional[float] = None
+    always: bool = False             # bypass movement thresholds (e.g. favorite flipped)
@@ -0,0 +1,157 @@
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List
+
+from app import codec
+from app.constants import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_COOLDOWN,
+    HEDGE_MIN_BUDGET,
+    HEDGE_PERCENTILE,
+    LATENCY_SAMPLES,
+)
+
+# Per-upstream circuit breakers
+#
+# closed    → requests flow; consecutive failures are counted
+# open      → requests fail fast with UpstreamUnavailable until the cooldown ends
+# half_open → one probe request is let through; success closes, failure re-opens
+#
+# Only upstream faults count as failures: 5xx responses, timeouts and
+# connection errors (see http_client._send). A 4xx is the caller's problem, so
+# it just releases a half-open probe without touching the counters.
+#
+# State (and recent latency samples, used for hedging budgets) is persisted to
+# state/circuit_breakers.json, so a cron tick remembers that ESPN was down on
+# the previous tick instead of walking into the same 10s timeouts again.
+# Several processes save that file, so save() merges instead of overwriting:
+# each entry carries an `updated` stamp and, per upstream, the newer one wins;
+# upstreams this process never touched are kept as they are on disk.
+
+BREAKER_FILE = "state/circuit_breakers.json"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+_lock = threading.Lock()
+_state: Dict[str, Dict] = {}
+_probing = set()
+_touched = set()
+_dirty = False
+
+
+def _load():
+    global _state
+    if not os.path.exists(BREAKER_FILE):
+        return
+    try:
+        _state = codec.read(BREAKER_FILE)
+    except Exception as e:
+        print(f"⚠️ Failed to load circuit breaker state: {e}")
+
+
+def save():
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        ours = {name: dict(_state[name]) for name in _touched}
+        _dirty = False
+
+    try:
+        merged = codec.read(BREAKER_FILE, {})
+    except Exception as e:
+        print(f"⚠️ Failed to re-read circuit breaker state; overwriting: {e}")
+        merged = {}
+    for name, entry in ours.items():
+        if entry.get("updated", 0.0) >= merged.get(name, {}).get("updated", 0.0):
+            merged[name] = entry
+    codec.write(BREAKER_FILE, merged)
+
+
+_load()
+atexit.register(save)
+
+
+def _entry(upstream: str) -> Dict:
+    return _state.setdefault(upstream, {"state": CLOSED, "failures": 0, "opened_at": 0.0, "latencies": []})
+
+
+def _touch(upstream: str, e: Dict):
+    """Mark an entry changed by this process (caller holds _lock)."""
+    global _dirty
+    e["updated"] = time.time()
+    _touched.add(upstream)
+    _dirty = True
+
+
+def allow(upstream: str) -> bool:
+    """May we call this upstream right now?"""
+    with _lock:
+        e = _entry(upstream)
+        if e["state"] == CLOSED:
+            return True
+
+        if e["state"] == OPEN:
+            if time.time() - e["opened_at"] < BREAKER_COOLDOWN:
+                return False
+            e["state"] = HALF_OPEN
+            _touch(upstream, e)
+
+        # Half-open: a single probe at a time
+        if upstream in _probing:
+            return False
+        _probing.add(upstream)
+        return True
+
+
+def record_success(upstream: str, latency: float):
+    with _lock:
+        e = _entry(upstream)
+        if e["state"] != CLOSED:
+            print(f"✅ {upstream} recovered; circuit closed.")
+        e["state"] = CLOSED
+        e["failures"] = 0
+        e["latencies"] = (e["latencies"] + [round(latency, 3)])[-LATENCY_SAMPLES:]
+        _probing.discard(upstream)
+        _touch(upstream, e)
+
+
+def record_failure(upstream: str):
+    with _lock:
+        e = _entry(upstream)
+        e["failures"] += 1
+        _probing.discard(upstream)
+        if e["state"] == HALF_OPEN or e["failures"] >= BREAKER_FAILURE_THRESHOLD:
+            if e["state"] != OPEN:
+                print(f"🔌 {upstream} circuit opened after {e['failures']} failures.")
+            e["state"] = OPEN
+            e["opened_at"] = time.time()
+        _touch(upstream, e)
+
+
+def release(upstream: str):
+    """The call ended without saying anything about the upstream's health (e.g. a 4xx)."""
+    with _lock:
+        _probing.discard(upstream)
+
+
+def is_open(upstream: str) -> bool:
+    with _lock:
+        return _entry(upstream)["state"] == OPEN
+
+
+def latency_budget(upstream: str) -> float:
+    """p95 of recent latencies: how long to wait before sending a hedge request."""
+    with _lock:
+        samples: List[float] = sorted(_entry(upstream)["latencies"])
+    if len(samples) < 5:
+        return max(HEDGE_MIN_BUDGET, 2.0)
+    idx = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE))
+    return max(HEDGE_MIN_BUDGET, samples[idx])
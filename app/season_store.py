@@ -0,0 +1,191 @@
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app import codec
+from app.records import PlayerLine
+from app.teams import team_id
+
+# Columnar season store of final player boxscores.
+#
+# Each column is a preallocated players × games .npy file opened with mmap, so
+# opening the store costs a few page-table entries no matter how much of the
+# season is in it. Per-player history is a contiguous row slice: rolling
+# averages are zero-copy views.
+#
+# Appends write cells past each player's committed count first, then commit the
+# new counts + event ID in meta.json with an atomic rename. A crash mid-ingest
+# leaves only uncommitted cells behind, which the next run overwrites.
+
+STORE_DIR = "state/season_store"
+META_FILE = "meta.json"
+MAX_PLAYERS = 1024
+MAX_GAMES = 110          # 82 regular season + cup + playoffs, with headroom
+
+COLUMNS = {
+    "points": np.int16,
+    "seconds": np.int32,
+    "fga": np.int16,
+    "team": np.int16,     # team ID from app.teams, -1 if unmapped
+    "event": np.int64,    # ESPN event ID
+}
+
+
+@dataclass(slots=True)
+class Baseline:
+    games: int
+    ppg: float
+    half_minutes: float
+    half_fga: float
+
+
+class SeasonStore:
+    def __init__(self, path: str, mode: str = "r"):
+        self.path = path
+        self.mode = mode
+
+        meta = codec.read(os.path.join(path, META_FILE))
+
+        self.players: List[Dict[str, str]] = meta["players"]
+        self.counts: List[int] = meta["counts"]
+        self.events = set(meta["events"])
+        self._rows = {p["norm"]: i for i, p in enumerate(self.players)}
+
+        self.cols = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in COLUMNS
+        }
+
+    # --- Opening ---
+    @classmethod
+    def create(cls, path: str = STORE_DIR) -> "SeasonStore":
+        os.makedirs(path, exist_ok=True)
+        for name, dtype in COLUMNS.items():
+            col = np.lib.format.open_memmap(
+                os.path.join(path, f"{name}.npy"), mode="w+",
+                dtype=dtype, shape=(MAX_PLAYERS, MAX_GAMES),
+            )
+            col.flush()
+            del col
+
+        _write_meta(path, {"players": [], "counts": [], "events": []})
+        return cls(path, mode="r+")
+
+    @classmethod
+    def open(cls, path: str = STORE_DIR, writable: bool = False) -> Optional["SeasonStore"]:
+        """Open an existing store, or None if it hasn't been created yet."""
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            return None
+        try:
+            return cls(path, mode="r+" if writable else "r")
+        except Exception as e:
+            print(f"⚠️ Failed to open season store: {e}")
+            return None
+
+    @classmethod
+    def open_or_create(cls, path: str = STORE_DIR) -> "SeasonStore":
+        return cls.open(path, writable=True) or cls.create(path)
+
+    # --- Writing ---
+    def has_event(self, event_id: str) -> bool:
+        return str(event_id) in self.events
+
+    def append_game(self, event_id: str, players: List[PlayerLine]) -> int:
+        """Append one final boxscore. Returns number of player rows written."""
+        event_id = str(event_id)
+        if self.has_event(event_id):
+            return 0
+
+        counts = list(self.counts)
+        written = 0
+
+        for p in players:
+            if p.seconds == 0 and p.points == 0:
+                continue  # DNP
+
+            row = self._row_for(p, counts)
+            if row is None:
+                continue
+
+            slot = counts[row]
+            if slot >= MAX_GAMES:
+                print(f"⚠️ Season store full for {p.name}")
+                continue
+
+            tid = team_id(p.team)
+            self.cols["points"][row, slot] = p.points
+            self.cols["seconds"][row, slot] = p.seconds
+            self.cols["fga"][row, slot] = p.fga
+            self.cols["team"][row, slot] = -1 if tid is None else tid
+            self.cols["event"][row, slot] = int(event_id)
+            counts[row] = slot + 1
+            written += 1
+
+        for col in self.cols.values():
+            col.flush()
+
+        # Commit point: counts + event become visible together
+        self.counts = counts
+        self.events.add(event_id)
+        _write_meta(self.path, {
+            "players": self.players,
+            "counts": self.counts,
+            "events": sorted(self.events),
+        })
+        return written
+
+    def _row_for(self, p: PlayerLine, counts: List[int]) -> Optional[int]:
+        row = self._rows.get(p.norm)
+        if row is not None:
+            return row
+
+        if len(self.players) >= MAX_PLAYERS:
+            print(f"⚠️ Season store has no room for new player {p.name}")
+            return None
+
+        row = len(self.players)
+        self.players.append({"id": p.id, "name": p.name, "norm": p.norm})
+        counts.append(0)
+        self._rows[p.norm] = row
+        return row
+
+    # --- Reading ---
+    def history(self, norm: str, window: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Zero-copy column views of a player's last `window` games."""
+        row = self._rows.get(norm)
+        if row is None:
+            return None
+
+        n = self.counts[row]
+        start = max(0, n - window) if window else 0
+        return {name: col[row, start:n] for name, col in self.cols.items()}
+
+    def event_points(self, event_id: str) -> Dict[str, int]:
+        """Final points for every player in one game, keyed by normalized name."""
+        n = len(self.players)
+        rows, slots = np.nonzero(self.cols["event"][:n] == int(event_id))
+        return {
+            self.players[r]["norm"]: int(self.cols["points"][r, s])
+            for r, s in zip(rows, slots)
+            if s < self.counts[r]
+        }
+
+    def baseline(self, norm: str, window: int = 10) -> Optional[Baseline]:
+        """Rolling per-game averages, halved for halftime comparisons."""
+        hist = self.history(norm, window)
+        if hist is None or len(hist["points"]) == 0:
+            return None
+
+        return Baseline(
+            games=len(hist["points"]),
+            ppg=float(hist["points"].mean()),
+            half_minutes=float(hist["seconds"].mean()) / 60 / 2,
+            half_fga=float(hist["fga"].mean()) / 2,
+        )
+
+
+def _write_meta(path: str, meta: Dict) -> None:
+    codec.write(os.path.join(path, META_FILE), meta)
@@ -1,8 +1,8 @@
-from app.odds_api import (
-    get_live_spread,
-    get_pregame_spreads,
-)
-from app.constants import confidence_to_label
+from app.odds_api import get_spread_pair
+from app.constants import tier_to_label
+from app.leagues import League, NBA
+from app.records import Alert
+from app.trigger_plans import LinePlan, spread_plan
 
 
 def _pick_team_to_bet(pregame_spread: float, current_margin: float) -> str:
@@ -15,28 +15,35 @@ def _pick_team_to_bet(pregame_spread: float, current_margin: float) -> str:
     return "underdog" if is_covering else "favorite"
 
 
-def analyze_spread_movement(matchup: str):
+def analyze_spread_movement(key, league: League = NBA, trigger=None, plan: LinePlan = None):
+    """
+    key is the (away_id, home_id) matchup key from the league's team registry.
+    trigger overrides league.spread_trigger (subscribers may ask for looser alerts).
+    plan is the game's pregame-compiled spread bands (app/trigger_plans.py).
+    """
     alerts = []
+    trigger = league.spread_trigger if trigger is None else trigger
 
-    # matchup is already ABBR, no conversions needed
-    abbr_key = matchup
-    away_abbr, _, home_abbr = abbr_key.partition(" @ ")
-
-    pre_spreads = get_pregame_spreads()
-    pre_spread = pre_spreads.get(abbr_key)
-    live_spread = get_live_spread(abbr_key)
+    # Both from the Odds API, or both from ESPN's scoreboard (free line fallback)
+    pre_spread, live_spread = get_spread_pair(key, league)
 
     if pre_spread is None or live_spread is None:
         return alerts
 
+    # Recompile if there was no plan or the closing line replaced its baseline
+    if plan is None or plan.pre != pre_spread:
+        plan = spread_plan(pre_spread, trigger)
+
     delta = live_spread - pre_spread
     flip = pre_spread < 0 and live_spread > 0
 
     # Ignore small movements (unless the favorite flipped)
-    if abs(delta) < 3 and not flip:
+    if plan.quiet(live_spread) and not flip:
         return alerts
 
-    label = confidence_to_label(abs(delta), "SPREAD")
+    label = tier_to_label(plan.tier(live_spread), "SPREAD")
+
+    away_abbr, home_abbr = league.teams.abbr(key[0]), league.teams.abbr(key[1])
 
     # Identify pregame fav/underdog
     favorite_team = home_abbr if pre_spread < 0 else away_abbr
@@ -56,10 +63,15 @@ def analyze_spread_movement(matchup: str):
 
     emoji = "🚨 UPSET WATCH:" if flip else "↔️"
 
-    alerts.append(
-        f"{emoji} Spread changed by {abs(delta)} pts "
-        f"(Pre: {pre_spread:+.1f}, Live: {live_spread:+.1f})\n"
-        f"Scoey's Take: {label} {live_side_team} {live_side_line:+.1f}"
-    )
+    alerts.append(Alert(
+        kind="SPREAD",
+        text=(
+            f"{emoji} Spread changed by {abs(delta)} pts "
+            f"(Pre: {pre_spread:+.1f}, Live: {live_spread:+.1f})\n"
+            f"Scoey's Take: {label} {live_side_team} {live_side_line:+.1f}"
+        ),
+        magnitude=abs(delta),
+        always=flip,
+    ))
 
     return alerts
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import contextvars
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app import codec
+from app.discord_alert import send_discord_alert
+from app.keys import DISCORD_WEBHOOK_URL, NBA_WEBHOOK_URL
+from app.leagues import League, LEAGUES
+from app.records import Alert
+from app.teams import MatchupKey
+
+# Subscription routing
+#
+# state/subscriptions.json lists channels, each with its own filters:
+#
+#   {"subscribers": [
+#     {"name": "celtics", "webhook": "$CELTICS_WEBHOOK_URL",
+#      "leagues": ["nba"], "teams": ["BOS"], "alerts": ["SPREAD", "TOTAL"],
+#      "min_confidence": 0.5, "thresholds": {"spread": 4.0},
+#      "notify_empty": false}
+#   ]}
+#
+# Omitted filters mean "everything". min_confidence only filters alerts that
+# carry a confidence (CONFIDENCE_KINDS: POINTS, TOTAL); SPREAD and PREGAME
+# messages have none and always pass it, so a subscriber that sets it while
+# taking only untyped kinds is rejected as misconfigured. The config is compiled once into an index
+# keyed by (league, alert kind, team ID or None for all teams), so matching an
+# alert touches only the buckets for its game's two teams plus the catch-all.
+# Analyzers run once per game at the loosest thresholds any subscriber wants;
+# each subscriber's own thresholds are then applied to the few matched entries.
+
+SUBSCRIPTIONS_FILE = "state/subscriptions.json"
+ALERT_KINDS = ("POINTS", "SPREAD", "TOTAL", "PREGAME")
+CONFIDENCE_KINDS = frozenset({"POINTS", "TOTAL"})       # kinds whose Alert carries a confidence
+MAX_DELIVERY_WORKERS = 8
+
+ANY_TEAM = None
+
+
+@dataclass(slots=True)
+class Subscriber:
+    name: str
+    webhook: str
+    leagues: FrozenSet[str]
+    teams: Dict[str, FrozenSet[str]]          # league → team abbreviations (empty = all)
+    kinds: FrozenSet[str]
+    min_confidence: float = 0.0
+    thresholds: Dict[str, float] = field(default_factory=dict)
+    notify_empty: bool = False
+
+    def threshold(self, name: str, league: League) -> float:
+        default = {
+            "spread": league.spread_trigger,
+            "total": league.total_trigger,
+            "pace": league.pace_trigger,
+        }[name]
+        return self.thresholds.get(name, default)
+
+    def accepts(self, alert: Alert, league: League) -> bool:
+        # min_confidence only applies to alerts that carry one (CONFIDENCE_KINDS)
+        if alert.confidence is not None and alert.confidence < self.min_confidence:
+            return False
+        if alert.kind == "POINTS":
+            return alert.magnitude < self.threshold("pace", league)
+        if alert.kind == "SPREAD":
+            return alert.always or alert.magnitude >= self.threshold("spread", league)
+        if alert.kind == "TOTAL":
+            return alert.magnitude >= self.threshold("total", league)
+        return True
+
+
+def _resolve_webhook(value: Optional[str]) -> Optional[str]:
+    if value and value.startswith("$"):
+        return os.getenv(value[1:])
+    return value
+
+
+def _default_subscribers() -> List[dict]:
+    """No config file: keep the original two channels receiving everything."""
+    return [
+        {"name": "discord", "webhook": DISCORD_WEBHOOK_URL, "notify_empty": True},
+        {"name": "nba", "webhook": NBA_WEBHOOK_URL, "notify_empty": True},
+    ]
+
+
+def load_subscribers(path: str = SUBSCRIPTIONS_FILE) -> List[Subscriber]:
+    raw = _default_subscribers()
+    if os.path.exists(path):
+        raw = codec.read(path).get("subscribers", [])
+
+    subs = []
+    for entry in raw:
+        webhook = _resolve_webhook(entry.get("webhook"))
+        if not webhook:
+            print(f"⚠️ Subscriber {entry.get('name')} has no webhook; skipping.")
+            continue
+
+        name = entry.get("name", webhook[-8:])
+        leagues = frozenset(k.lower() for k in entry.get("leagues") or LEAGUES)
+        teams = entry.get("teams") or []
+        kinds = frozenset(k.upper() for k in entry.get("alerts") or ALERT_KINDS)
+        min_confidence = float(entry.get("min_confidence", 0.0))
+        if min_confidence > 0 and not kinds & CONFIDENCE_KINDS:
+            print(f"⚠️ Subscriber {name} sets min_confidence but only takes {', '.join(sorted(kinds))} "
+                  f"alerts, which carry no confidence; skipping.")
+            continue
+
+        subs.append(Subscriber(
+            name=name,
+            webhook=webhook,
+            leagues=leagues,
+            teams={lg: frozenset(t.upper() for t in teams) for lg in leagues},
+            kinds=kinds,
+            min_confidence=min_confidence,
+            thresholds={k: float(v) for k, v in (entry.get("thresholds") or {}).items()},
+            notify_empty=bool(entry.get("notify_empty", False)),
+        ))
+    return subs
+
+
+class Router:
+    def __init__(self, subscribers: List[Subscriber], send: Callable[[str, str, str], None] = send_discord_alert):
+        self.subscribers = subscribers
+        self.send = send             # delivery sink: send(message, webhook, title)
+        # (league, kind, team_id or ANY_TEAM) → subscriber indices
+        self._index: Dict[Tuple[str, str, Optional[int]], List[int]] = defaultdict(list)
+        # league → subscribers that want a message even when nothing fired
+        self._empty: Dict[str, List[int]] = defaultdict(list)
+        self._loosest: Dict[str, Dict[str, float]] = {}
+        self._compile()
+
+    @classmethod
+    def from_config(cls, path: str = SUBSCRIPTIONS_FILE, send: Callable[[str, str, str], None] = send_discord_alert) -> "Router":
+        return cls(load_subscribers(path), send)
+
+    def _compile(self):
+        for i, sub in enumerate(self.subscribers):
+            for lg_key in sub.leagues:
+                league = LEAGUES.get(lg_key)
+                if league is None:
+                    print(f"⚠️ Subscriber {sub.name}: unknown league {lg_key}")
+                    continue
+
+                team_ids: List[Optional[int]] = [ANY_TEAM]
+                if sub.teams.get(lg_key):
+                    team_ids = []
+                    for abbr in sub.teams[lg_key]:
+                        tid = league.teams.learn(abbr, abbr)
+                        if tid is None:
+                            print(f"⚠️ Subscriber {sub.name}: unknown {league.label} team {abbr}")
+                            continue
+                        team_ids.append(tid)
+
+                for kind in sub.kinds:
+                    for tid in team_ids:
+                        self._index[(lg_key, kind, tid)].append(i)
+
+                if sub.notify_empty:
+                    self._empty[lg_key].append(i)
+
+    def _candidates(self, league: League, kind: str, key: Optional[MatchupKey]) -> Set[int]:
+        out = set(self._index.get((league.key, kind, ANY_TEAM), ()))
+        if key is not None:
+            out.update(self._index.get((league.key, kind, key[0]), ()))
+            out.update(self._index.get((league.key, kind, key[1]), ()))
+        return out
+
+    def loosest(self, league: League) -> Dict[str, float]:
+        """Thresholds the analyzers should run at so every subscriber gets what it asked for."""
+        cached = self._loosest.get(league.key)
+        if cached:
+            return cached
+
+        subs = [s for s in self.subscribers if league.key in s.leagues]
+        if not subs:
+            return {"spread": league.spread_trigger, "total": league.total_trigger, "pace": league.pace_trigger}
+        cached = self._loosest[league.key] = {
+            "spread": min(s.threshold("spread", league) for s in subs),
+            "total": min(s.threshold("total", league) for s in subs),
+            "pace": max(s.threshold("pace", league) for s in subs),
+        }
+        return cached
+
+    def wants(self, league: League, kind: str, key: Optional[MatchupKey]) -> bool:
+        return bool(self._candidates(league, kind, key))
+
+    def route(self, league: League, key: Optional[MatchupKey], alerts: List[Alert]) -> Dict[int, List[Alert]]:
+        """Match each alert against the index; returns subscriber index → its alerts."""
+        routed: Dict[int, List[Alert]] = defaultdict(list)
+        for alert in alerts:
+            for i in self._candidates(league, alert.kind, key):
+                if self.subscribers[i].accepts(alert, league):
+                    routed[i].append(alert)
+        return routed
+
+    def deliver(self, league: League, routed: Dict[int, List[Alert]], title: str,
+                empty_message: Optional[str] = None, notes: Optional[List[str]] = None):
+        """
+        Single fan-out: one message per subscriber, all sent in parallel.
+        notes (e.g. degraded-mode flags) are appended to every message.
+        """
+        footer = "\n\n" + "\n".join(notes) if notes else ""
+        sends = [
+            (self.subscribers[i].webhook, "\n\n".join(a.text for a in alerts) + footer)
+            for i, alerts in routed.items()
+        ]
+        if empty_message:
+            sends += [
+                (self.subscribers[i].webhook, empty_message + footer)
+                for i in self._empty.get(league.key, ())
+                if i not in routed
+            ]
+
+        if not sends:
+            return
+        with ThreadPoolExecutor(max_workers=min(MAX_DELIVERY_WORKERS, len(sends))) as pool:
+            for webhook, message in sends:
+                pool.submit(contextvars.copy_context().run, self.send, message, webhook, title)
+
+    def broadcast(self, league: League, kind: str, title: str, message: str):
+        """Send one message to every subscriber taking `kind` alerts for the league (team filters ignored)."""
+        routed = {
+            i: [Alert(kind=kind, text=message)]
+            for i, sub in enumerate(self.subscribers)
+            if league.key in sub.leagues and kind in sub.kinds
+        }
+        self.deliver(league, routed, title)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+
+from app import clock, codec
+from app.espn_api import fetch_team_roster
+from app.leagues import League, NBA
+from app.records import PlayerLine
+from app.teams import MatchupKey
+
+# Team → roster index (state/team_index.json, state/<league>/ for other leagues)
+#
+#   {"teams": {"MIL": {"players": ["giannisantetokounmpo", ...], "refreshed": "2025-11-14T22:00:00+00:00"}}}
+#
+# Full rosters (normalized names) are kept, not just tracked scorers, so a
+# change to top_scorers.json needs no re-fetch: tracked() intersects at lookup.
+# pregame_setup refreshes tonight's teams from ESPN; every boxscore we parse
+# anyway (nightly ingest) moves a player whose team changed, so trades show up
+# without waiting for the next roster refresh.
+#
+# At halftime a game whose two rosters are known and hold no tracked scorer
+# skips the ESPN summary (the heaviest request we make) and only checks odds.
+
+
+class TeamIndex:
+    def __init__(self, league: League = NBA, path: Optional[str] = None):
+        self.league = league
+        self.path = path or league.team_index_path
+        self.teams: Dict[str, Dict] = codec.read(self.path, {}).get("teams", {})
+        self._team_of = {norm: abbr for abbr, t in self.teams.items() for norm in t["players"]}
+        self._dirty = False
+
+    def canonical(self, abbr: Optional[str]) -> Optional[str]:
+        tid = self.league.teams.team_id(abbr)
+        return self.league.teams.abbr(tid) if tid is not None else abbr
+
+    def save(self):
+        if self._dirty:
+            codec.write(self.path, {"teams": dict(sorted(self.teams.items()))})
+            self._dirty = False
+
+    def _set_team(self, norm: str, abbr: str):
+        old = self._team_of.get(norm)
+        if old == abbr:
+            return
+        if old in self.teams:
+            self.teams[old]["players"].remove(norm)
+        self.teams.setdefault(abbr, {"players": [], "refreshed": None})["players"].append(norm)
+        self._team_of[norm] = abbr
+        self._dirty = True
+
+    # --- Updating ---
+
+    def refresh(self, espn_abbrs: Iterable[str]) -> int:
+        """Re-fetch the given teams' rosters; returns how many were refreshed."""
+        refreshed = 0
+        now = clock.now().isoformat(timespec="seconds")
+
+        for espn_abbr in dict.fromkeys(a for a in espn_abbrs if a):
+            roster = fetch_team_roster(espn_abbr, self.league)
+            if roster is None:
+                continue                 # keep the last known roster
+            abbr = self.canonical(espn_abbr)
+
+            for norm in [n for n, team in self._team_of.items() if team == abbr and n not in roster]:
+                self.teams[abbr]["players"].remove(norm)
+                del self._team_of[norm]
+            for norm in roster:
+                self._set_team(norm, abbr)
+
+            self.teams.setdefault(abbr, {"players": [], "refreshed": None})["refreshed"] = now
+            self._dirty = True
+            refreshed += 1
+
+        return refreshed
+
+    def observe(self, players: List[PlayerLine]) -> List[str]:
+        """Move players a boxscore shows on a new team; returns the names that moved."""
+        moved = []
+        for p in players:
+            if not p.team:
+                continue
+            abbr = self.canonical(p.team)
+            old = self._team_of.get(p.norm)
+            if old is not None and old != abbr:
+                moved.append(f"{p.name} ({old} → {abbr})")
+            if old != abbr:
+                self._set_team(p.norm, abbr)
+        return moved
+
+    # --- Lookups ---
+
+    def known(self, abbr: Optional[str]) -> bool:
+        return self.canonical(abbr) in self.teams
+
+    def tracked(self, abbr: Optional[str], tracked: Dict[str, Dict]) -> List[str]:
+        """Tracked scorers (normalized names) on a team's roster."""
+        team = self.teams.get(self.canonical(abbr))
+        return [norm for norm in team["players"] if norm in tracked] if team else []
+
+    def has_tracked(self, key: Optional[MatchupKey], tracked: Dict[str, Dict]) -> bool:
+        """False only when both rosters are known and neither has a tracked scorer."""
+        if key is None:
+            return True
+        abbrs = [self.league.teams.abbr(tid) for tid in key]
+        if not all(self.known(a) for a in abbrs):
+            return True
+        return any(self.tracked(a, tracked) for a in abbrs)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.constants import TEAM_MAP, ESPN_TEAM_ALIASES, WNBA_TEAM_MAP, WNBA_ESPN_TEAM_ALIASES
+
+# Canonical team registries
+# Every alias we see (our abbreviation, ESPN short code, Odds API full name)
+# resolves to a small integer team ID. Matchups are (away_id, home_id) tuples
+# interned per registry, so the same matchup is always the same object.
+#
+# NBA/WNBA registries are fixed at import. Leagues with hundreds of teams
+# (NCAA) start empty and learn teams from the ESPN scoreboard as they appear.
+
+MatchupKey = Tuple[int, int]
+
+
+class TeamRegistry:
+    def __init__(self, team_map: Dict[str, str], aliases: Dict[str, str], dynamic: bool = False):
+        self.dynamic = dynamic
+        self.abbrs: List[str] = []
+        self.names: List[str] = []
+        self._alias_to_id: Dict[str, int] = {}
+        self._matchups: Dict[MatchupKey, MatchupKey] = {}
+        self._lock = threading.Lock()
+
+        for abbr, name in team_map.items():
+            self._add(abbr, name)
+        for alias, abbr in aliases.items():
+            self._alias_to_id[alias] = self._alias_to_id[abbr]
+
+        n = len(self.abbrs)
+        for a in range(n):
+            for h in range(n):
+                self._matchups[(a, h)] = (a, h)
+
+    def __len__(self) -> int:
+        return len(self.abbrs)
+
+    def _add(self, abbr: str, name: str) -> int:
+        tid = len(self.abbrs)
+        self.abbrs.append(abbr)
+        self.names.append(name)
+        self._alias_to_id[abbr.upper()] = tid
+        self._alias_to_id[name.upper()] = tid
+        return tid
+
+    def learn(self, abbr: Optional[str], name: Optional[str]) -> Optional[int]:
+        """Register a team seen in a feed (dynamic registries only)."""
+        tid = self.team_id(abbr) if abbr else None
+        if tid is not None or not self.dynamic or not abbr:
+            return tid
+        with self._lock:
+            tid = self.team_id(abbr)
+            if tid is None:
+                tid = self._add(abbr, name or abbr)
+        return tid
+
+    def team_id(self, alias: Optional[str]) -> Optional[int]:
+        """Resolve any known alias (e.g. 'UTAH', 'UTA', 'Utah Jazz') to a team ID."""
+        if not alias:
+            return None
+        tid = self._alias_to_id.get(alias)
+        if tid is None:
+            tid = self._alias_to_id.get(alias.strip().upper())
+        return tid
+
+    def abbr(self, tid: int) -> str:
+        return self.abbrs[tid]
+
+    def name(self, tid: int) -> str:
+        return self.names[tid]
+
+    def matchup_key(self, away: Optional[str], home: Optional[str]) -> Optional[MatchupKey]:
+        """Return the interned (away_id, home_id) key, or None if either alias is unknown."""
+        away_id = self.team_id(away)
+        home_id = self.team_id(home)
+        if away_id is None or home_id is None:
+            return None
+        key = (away_id, home_id)
+        return self._matchups.get(key) or self._matchups.setdefault(key, key)
+
+    def parse_matchup(self, matchup: str) -> Optional[MatchupKey]:
+        """Parse 'AWAY @ HOME' (abbreviations or full names) into a matchup key."""
+        away, _, home = matchup.partition("@")
+        return self.matchup_key(away.strip(), home.strip())
+
+    def matchup_str(self, key: MatchupKey) -> str:
+        """Format a matchup key using our abbreviations, e.g. 'TOR @ CLE'."""
+        return f"{self.abbrs[key[0]]} @ {self.abbrs[key[1]]}"
+
+
+NBA_TEAMS = TeamRegistry(TEAM_MAP, ESPN_TEAM_ALIASES)
+WNBA_TEAMS = TeamRegistry(WNBA_TEAM_MAP, WNBA_ESPN_TEAM_ALIASES)
+
+# NBA shorthands used throughout the app
+TEAM_ABBRS = NBA_TEAMS.abbrs
+TEAM_NAMES = NBA_TEAMS.names
+NUM_TEAMS = len(NBA_TEAMS)
+
+team_id = NBA_TEAMS.team_id
+team_abbr = NBA_TEAMS.abbr
+team_name = NBA_TEAMS.name
+matchup_key = NBA_TEAMS.matchup_key
+parse_matchup = NBA_TEAMS.parse_matchup
+matchup_str = NBA_TEAMS.matchup_str
@@ -1,39 +1,61 @@
-from app.odds_api import get_live_total, get_pregame_totals
+from app.odds_api import get_total_pair
 from app.constants import confidence_to_label
-
-
-def analyze_total_movement(matchup: str):
+from app.leagues import League, NBA
+from app.projections import project_total
+from app.records import Alert
+from app.trigger_plans import LinePlan, total_plan
+
+
+def analyze_total_movement(key, league: League = NBA, trigger=None, home_score=None, away_score=None,
+                           plan: LinePlan = None):
+    """
+    key is the (away_id, home_id) matchup key from the league's team registry.
+    trigger overrides league.total_trigger (subscribers may ask for looser alerts).
+    With the halftime score, the side comes from a simulated final total
+    against the live line instead of fading the movement, labelled by the
+    simulation's edge (TOTAL_EDGE_CONFIDENCE_MAP, provisional). The simulated
+    probabilities are model estimates, not calibrated hit rates. plan is the
+    game's pregame-compiled no-trigger band (app/trigger_plans.py).
+    """
     alerts = []
+    trigger = league.total_trigger if trigger is None else trigger
 
-    abbr_key = matchup  # canonical
-    pre_totals = get_pregame_totals()
-    pre_total = pre_totals.get(abbr_key)
-    live_total = get_live_total(abbr_key)
+    # Both from the Odds API, or both from ESPN's scoreboard (free line fallback)
+    pre_total, live_total = get_total_pair(key, league)
 
     if pre_total is None or live_total is None:
         return alerts
 
-    delta = live_total - pre_total
-    pct_change = abs(delta) / pre_total
+    if plan is None or plan.pre != pre_total:
+        plan = total_plan(pre_total, trigger)
 
-    # Only trigger for ≥5% movement
-    if pct_change < 0.05:
+    # Only trigger for ≥5% movement (league-specific)
+    if plan.quiet(live_total):
         return alerts
 
-    label = confidence_to_label(pct_change, "TOTAL")
+    delta = live_total - pre_total
+    pct_change = abs(delta) / pre_total
 
     # Movement direction
     tag = "📈" if delta > 0 else "📉"
     direction = "up" if delta > 0 else "down"
-
-    # If total moves UP → game expected to be lower scoring (bet UNDER)
-    # If total moves DOWN → expect OVER
-    recommended_side = "Under" if delta > 0 else "Over"
-
     msg = (
         f"{tag}: Total moved {direction} {abs(delta):.1f} pts "
         f"(Pre: {pre_total:.1f}, Live: {live_total:.1f})\n"
-        f"Scoey's Take: {label} {recommended_side} {live_total:.1f}"
     )
-    alerts.append(msg)
+
+    if home_score is None or away_score is None:
+        # No score: fade the move (total UP → expect lower scoring, bet UNDER)
+        recommended_side = "Under" if delta > 0 else "Over"
+        label = confidence_to_label(pct_change, "TOTAL")
+        confidence = None
+    else:
+        proj = project_total(home_score, away_score, pre_total, live_total)
+        recommended_side = proj.side()
+        label = confidence_to_label(proj.edge(), "TOTAL_EDGE")
+        confidence = round(max(proj.p_over, proj.p_under), 3)
+        msg += f"🎲 Projected {proj.mean:.1f}, Over {proj.p_over:.0%} / Under {proj.p_under:.0%}\n"
+
+    msg += f"Scoey's Take: {label} {recommended_side} {live_total:.1f}"
+    alerts.append(Alert(kind="TOTAL", text=msg, magnitude=pct_change, confidence=confidence))
     return alerts
\ No newline at end of file
@@ -0,0 +1,146 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from app import codec
+from app.constants import BASELINE_WINDOW, MIN_BASELINE_GAMES, SPREADS_CONFIDENCE_MAP
+from app.leagues import League, NBA
+from app.records import Game
+from app.season_store import SeasonStore
+from app.team_index import TeamIndex
+from app.teams import MatchupKey
+
+# Per-game trigger plans, compiled by pregame_setup
+#
+# Everything about a game that is known before tip-off is worked out once and
+# saved to state/trigger_plans.json (state/<league>/ for other leagues):
+#
+#   players  tracked top scorers on either roster (app/team_index.py), each with the
+#            points cut-off below which they trigger (pace trigger × season
+#            avg) and their season-store baselines
+#   spread   the pregame line, the live-line band that does NOT trigger, and
+#            the live-line band for each SPREADS_CONFIDENCE_MAP label tier
+#   total    the pregame total and its no-trigger band
+#
+# At halftime a game's alerts are a dict lookup plus a few comparisons. A plan
+# is only used while the subscriber thresholds it was compiled with still
+# apply; otherwise the analyzers work everything out as before.
+
+
+@dataclass(slots=True)
+class PlayerPlan:
+    name: str
+    team: Optional[str]
+    ppg: float
+    ppg_weight: float
+    cutoff: float                    # trigger while halftime points < cutoff
+    form_ppg: float                  # season-store rolling ppg (ppg when too few games)
+    half_minutes: float
+    half_fga: float
+
+
+@dataclass(slots=True)
+class LinePlan:
+    pre: float
+    lo: float                        # live lines strictly inside (lo, hi) don't trigger
+    hi: float
+    tiers: List[List[float]] = field(default_factory=list)   # [lo, hi] per label tier
+
+    def quiet(self, live: float) -> bool:
+        return self.lo < live < self.hi
+
+    def tier(self, live: float) -> int:
+        for i, (lo, hi) in enumerate(self.tiers):
+            if lo <= live <= hi:
+                return i
+        return len(self.tiers) - 1
+
+
+@dataclass(slots=True)
+class GamePlan:
+    matchup: str
+    players: Dict[str, PlayerPlan] = field(default_factory=dict)   # normalized name → plan
+    spread: Optional[LinePlan] = None
+    total: Optional[LinePlan] = None
+
+
+def spread_plan(pre: float, trigger: float) -> LinePlan:
+    tiers = [[pre - t, pre + t] for t, _ in SPREADS_CONFIDENCE_MAP]
+    return LinePlan(pre, pre - trigger, pre + trigger, tiers)
+
+
+def total_plan(pre: float, trigger: float) -> LinePlan:
+    return LinePlan(pre, pre * (1 - trigger), pre * (1 + trigger))
+
+
+def player_plan(norm: str, info: Dict, team: Optional[str], pace_trigger: float,
+                store: Optional[SeasonStore], league: League = NBA) -> PlayerPlan:
+    """A tracked scorer's cut-off and baselines (per-player season-store ones when there are enough games)."""
+    form_ppg, half_minutes, half_fga = info["ppg"], league.half_minutes, league.half_fga
+    base = store.baseline(norm, BASELINE_WINDOW) if store else None
+    if base and base.games >= MIN_BASELINE_GAMES:
+        half_minutes, half_fga, form_ppg = base.half_minutes, base.half_fga, base.ppg
+
+    return PlayerPlan(
+        name=info["name"], team=team, ppg=info["ppg"], ppg_weight=info["ppg_weight"],
+        cutoff=pace_trigger * info["ppg"], form_ppg=form_ppg,
+        half_minutes=half_minutes, half_fga=half_fga,
+    )
+
+
+def compile_plans(games: List[Game], top_scorers: Dict[str, Dict], pregame: Dict, triggers: Dict[str, float],
+                  index: TeamIndex, league: League = NBA, store: Optional[SeasonStore] = None) -> Dict[str, GamePlan]:
+    """{matchup: GamePlan} for tonight's games; pregame is record_all_pregame_lines' document."""
+    plans = {}
+
+    for g in games:
+        if g.key is None:
+            continue
+        matchup = league.teams.matchup_str(g.key)
+        plan = GamePlan(matchup)
+
+        for team in (g.away_abbr, g.home_abbr):
+            for norm in index.tracked(team, top_scorers):
+                plan.players[norm] = player_plan(norm, top_scorers[norm], team, triggers["pace"], store, league)
+
+        spread = pregame.get("spreads", {}).get(matchup)
+        total = pregame.get("totals", {}).get(matchup)
+        plan.spread = spread_plan(spread, triggers["spread"]) if spread is not None else None
+        plan.total = total_plan(total, triggers["total"]) if total is not None else None
+        plans[matchup] = plan
+
+    return plans
+
+
+def save_plans(plans: Dict[str, GamePlan], triggers: Dict[str, float], league: League = NBA):
+    codec.write(league.trigger_plans_path, {
+        "triggers": triggers,
+        "games": {matchup: asdict(plan) for matchup, plan in plans.items()},
+    })
+
+
+def _line(doc: Optional[Dict]) -> Optional[LinePlan]:
+    return LinePlan(**doc) if doc else None
+
+
+def load_plans(league: League, triggers: Dict[str, float]) -> Dict[MatchupKey, GamePlan]:
+    """Tonight's plans by matchup key; empty if missing or compiled for other thresholds."""
+    doc = codec.read(league.trigger_plans_path)
+    if not doc:
+        return {}
+    if doc.get("triggers") != triggers:
+        print(f"⚠️ {league.label} trigger plans were compiled for other thresholds; evaluating from scratch.")
+        return {}
+
+    plans = {}
+    for matchup, g in doc.get("games", {}).items():
+        key = league.teams.parse_matchup(matchup)
+        if key is None:
+            continue
+        plans[key] = GamePlan(
+            matchup=matchup,
+            players={norm: PlayerPlan(**p) for norm, p in g.get("players", {}).items()},
+            spread=_line(g.get("spread")),
+            total=_line(g.get("total")),
+        )
+    return plans
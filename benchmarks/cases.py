@@ -0,0 +1,232 @@
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+from app import codec, http_client, odds_api
+from app.espn_api import normalize_name, parse_boxscore_players
+from app.grading import Finals, format_day, grade_picks, iter_picks
+from app.leagues import NBA
+from app.player_alerts import analyze_game_players, compute_confidence
+from app.projections import project_players, project_total, simulate_players
+from app.teams import parse_matchup
+
+# Benchmark cases for the hot paths
+#
+# Each case is a setup function that loads its payload from benchmarks/payloads
+# and returns the zero-argument callable to time. Setup is never timed. HTTP is
+# served from the payloads (see serve_payloads), so nothing leaves the machine.
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+LOG_COPIES = 40          # "large log": the sample night repeated ~ a month and a half of halftimes
+
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def load_payload(name):
+    path = os.path.join(PAYLOAD_DIR, name)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f) if name.endswith(".json") else f.read()
+
+
+def _tonight(slate):
+    """Move the recorded slate onto tonight's pregame window so nothing is filtered out."""
+    day = datetime.now(timezone.utc).replace(hour=23, minute=0, second=0, microsecond=0)
+    if datetime.now(timezone.utc).hour < 5:
+        day -= timedelta(days=1)
+    for i, game in enumerate(slate):
+        game["commence_time"] = (day + timedelta(minutes=30 * (i % 6))).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return slate
+
+
+class _Response:
+    headers = {}
+
+    def __init__(self, body):
+        self.content = codec.dumps(body)      # raw bytes, so decoding is part of what's timed
+
+    def json(self):
+        return codec.loads(self.content)
+
+
+def serve_payloads():
+    """Answer http_client.get/get_json from the checked-in payloads; returns the originals."""
+    summary = load_payload("summary.json")
+    odds = {
+        "spreads": _tonight(load_payload("odds_spreads.json")),
+        "totals": _tonight(load_payload("odds_totals.json")),
+    }
+
+    def get(upstream, url, params=None, timeout=10):
+        if upstream == "odds":
+            return _Response(odds[params["markets"]])
+        return _Response(summary)
+
+    def get_json(upstream, url, params=None, timeout=10, hedge=False):
+        return get(upstream, url, params, timeout).json()
+
+    original = http_client.get, http_client.get_json
+    http_client.get, http_client.get_json = get, get_json
+    return original
+
+
+def _top_scorers():
+    return {
+        normalize_name(p["name"]): {"name": p["name"], "ppg": p["ppg"], "ppg_weight": p["ppg_weight"]}
+        for p in load_payload("top_scorers.json")["players"]
+    }
+
+
+def _raw_payload(name):
+    with open(os.path.join(PAYLOAD_DIR, name), "rb") as f:
+        return f.read()
+
+
+@case("decode summary (codec)")
+def bench_decode_summary_codec():
+    raw = _raw_payload("summary.json")
+    return lambda: codec.loads(raw)
+
+
+@case("decode summary (stdlib json)")
+def bench_decode_summary_stdlib():
+    raw = _raw_payload("summary.json")
+    return lambda: json.loads(raw)
+
+
+@case("decode odds slate (codec)")
+def bench_decode_odds_codec():
+    raw = _raw_payload("odds_spreads.json")
+    return lambda: codec.loads(raw)
+
+
+@case("decode odds slate (stdlib json)")
+def bench_decode_odds_stdlib():
+    raw = _raw_payload("odds_spreads.json")
+    return lambda: json.loads(raw)
+
+
+@case("encode pregame state (codec)")
+def bench_encode_codec():
+    doc = {"spreads": {f"T{i} @ H{i}": -3.5 for i in range(15)}, "events": load_payload("odds_spreads.json")}
+    return lambda: codec.dumps(doc)
+
+
+@case("encode pregame state (stdlib json)")
+def bench_encode_stdlib():
+    doc = {"spreads": {f"T{i} @ H{i}": -3.5 for i in range(15)}, "events": load_payload("odds_spreads.json")}
+    return lambda: json.dumps(doc, indent=2).encode()
+
+
+@case("parse_boxscore_players")
+def bench_parse_boxscore():
+    data = load_payload("summary.json")
+    return lambda: parse_boxscore_players(data)
+
+
+@case("normalize_name")
+def bench_normalize_name():
+    names = [a["athlete"]["displayName"]
+             for team in load_payload("summary.json")["boxscore"]["players"]
+             for a in team["statistics"][0]["athletes"]]
+    names += [p["name"] for p in load_payload("top_scorers.json")["players"]]
+
+    def run():
+        for name in names:
+            normalize_name(name)
+    return run
+
+
+@case("compute_confidence")
+def bench_compute_confidence():
+    players = parse_boxscore_players(load_payload("summary.json"))
+    rng = random.Random(34)
+    rows = [(p.points, rng.uniform(10, 33), p.minutes, p.fga, 55, 48, rng.uniform(0.3, 0.9)) for p in players]
+
+    def run():
+        for row in rows:
+            compute_confidence(*row)
+    return run
+
+
+@case("analyze_game_players")
+def bench_analyze_game_players():
+    top_scorers = _top_scorers()
+    # Track the whole roster so every player goes through the confidence path
+    for p in parse_boxscore_players(load_payload("summary.json")):
+        top_scorers.setdefault(p.norm, {"name": p.name, "ppg": 15.0, "ppg_weight": 0.375})
+
+    def run():
+        # A fresh sink per iteration, so feature rows don't pile up across runs
+        return analyze_game_players("401810077", "CHA @ MIL", top_scorers, 55, 48,
+                                    feature_sink=[], league=NBA, pace_trigger=0.9)
+    return run
+
+
+@case("project slate (15 games)")
+def bench_project_slate():
+    # Three triggered players and one total per game, PROJECTION_SIMS draws each
+    players = ([8, 5, 11], [17.0, 14.0, 15.0], [9, 6, 10], [21.1, 18.1, 33.4], [17.0, 16.0, 18.0], [8.0, 7.0, 11.0])
+
+    def run():
+        for _ in range(15):
+            project_players(simulate_players(*players, 7), [20.5, 14.5, 25.5])
+            project_total(55, 48, 228.5, 221.5)
+    return run
+
+
+@case("get_live_spread+total (cold)")
+def bench_live_lines_cold():
+    keys = list(odds_api.parse_odds_lines(_tonight(load_payload("odds_spreads.json")), "spreads", NBA))
+
+    def run():
+        odds_api._st().cache.clear()
+        for key in keys:
+            odds_api.get_live_spread(key, NBA)
+            odds_api.get_live_total(key, NBA)
+    return run
+
+
+@case("get_live_spread+total (warm)")
+def bench_live_lines_warm():
+    keys = list(odds_api.parse_odds_lines(_tonight(load_payload("odds_spreads.json")), "spreads", NBA))
+    odds_api._st().cache.clear()
+
+    def run():
+        for key in keys:
+            odds_api.get_live_spread(key, NBA)
+            odds_api.get_live_total(key, NBA)
+    return run
+
+
+@case("record_all_pregame_lines")
+def bench_record_pregame():
+    def run():
+        odds_api._st().cache.clear()
+        odds_api.record_all_pregame_lines(NBA)
+    return run
+
+
+@case("grade_log")
+def bench_grade_log():
+    night = load_payload("performance_log.log")
+    lines = ("\n\n".join([night] * LOG_COPIES)).splitlines(keepends=True)
+
+    # Synthetic finals for every matchup and player the log mentions
+    rng = random.Random(34)
+    finals = Finals()
+    for block in night.split("Halftime Alerts for ")[1:]:
+        key = parse_matchup(block.split(":")[0])
+        finals.scores[key] = {"away": rng.randint(95, 130), "home": rng.randint(95, 130), "game_id": "0"}
+        finals.points[key] = {normalize_name(name): rng.randint(5, 40)
+                              for name in re.findall(r"🎯 ([A-Za-z .'-]+):", block)}
+
+    return lambda: format_day("2025-11-14", grade_picks(list(iter_picks(lines)), finals))
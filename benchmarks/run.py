@@ -0,0 +1,156 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.cases import CASES, serve_payloads
+from app import codec, http_client
+
+# Micro-benchmarks for the hot paths
+#
+#   python -m benchmarks.run                 # run and compare against the baseline
+#   python -m benchmarks.run --save          # run and write a new baseline
+#   python -m benchmarks.run -k odds         # only cases whose name contains "odds"
+#
+# Reports ops/sec (best of --repeat timed rounds, GC off like timeit) and
+# tracemalloc allocations per op (peak and retained KB). A case regresses when
+# ops/sec drops, or peak allocation grows, by more than --threshold versus
+# benchmarks/baseline.json; the exit code is then 1.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+MIN_ROUND_TIME = 0.2     # seconds per timed round
+ALLOC_OPS = 5
+
+
+def _loops_for(fn) -> int:
+    """Double the loop count until one round takes at least MIN_ROUND_TIME."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= MIN_ROUND_TIME:
+            return loops
+        loops *= 2
+
+
+def _time(fn, repeat: int) -> float:
+    loops = _loops_for(fn)
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return 1.0 / best
+
+
+def _allocations(fn):
+    """(peak KB, retained KB) per op, averaged over ALLOC_OPS calls."""
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(ALLOC_OPS):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - current
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_total / ALLOC_OPS / 1024, max(0, after - before) / ALLOC_OPS / 1024
+
+
+def run_case(name: str, repeat: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn = CASES[name]()
+        fn()                                  # warm caches, lazy imports, registries
+        ops = _time(fn, repeat)
+        peak_kb, retained_kb = _allocations(fn)
+    return {"ops_per_sec": round(ops, 1), "peak_kb": round(peak_kb, 2), "retained_kb": round(retained_kb, 2)}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: {base['ops_per_sec']:,.0f} → {r['ops_per_sec']:,.0f} ops/sec")
+        if base["peak_kb"] > 0 and r["peak_kb"] > base["peak_kb"] * (1 + threshold):
+            regressions.append(f"{name}: peak {base['peak_kb']:.1f} → {r['peak_kb']:.1f} KB/op")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    print(f"{'case':<36}{'ops/sec':>14}{'Δ':>9}{'peak KB/op':>13}{'retained KB/op':>16}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{r['ops_per_sec'] / base['ops_per_sec'] - 1:+.0%}" if base else "new"
+        print(f"{name:<36}{r['ops_per_sec']:>14,.1f}{delta:>9}{r['peak_kb']:>13.1f}{r['retained_kb']:>16.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot-path micro-benchmarks.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown / allocation growth")
+    parser.add_argument("--save", action="store_true", help=f"write results to {BASELINE_FILE}")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+
+    names = [n for n in CASES if args.pattern in n]
+    original_get = serve_payloads()
+    cwd = os.getcwd()
+    results = {}
+
+    # record_all_pregame_lines writes state/ files: keep them out of the repo
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name in names:
+                results[name] = run_case(name, args.repeat)
+        finally:
+            os.chdir(cwd)
+            http_client.get, http_client.get_json = original_get
+
+    print(f"JSON codec backend: {codec.BACKEND}\n")
+    print_table(results, baseline)
+
+    if args.save:
+        merged = {**baseline, **results}
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "cases": merged}, f, indent=2)
+        print(f"💾 Baseline saved to {BASELINE_FILE}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\n🚨 Regressions vs baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ No regressions." if baseline else "\nℹ️ No baseline yet; run with --save.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+from app.calibration import (
+    to_matrix,
+    fit_weights,
+    fit_label_thresholds,
+    fit_pace_trigger,
+    GRID_STEP,
+)
+from app import codec
+from app.constants import CONFIDENCE_WEIGHTS_FILE
+from app.grading import grade_player_points
+from app.season_store import SeasonStore
+
+FEATURES_DIR = "logs/features"
+PROPOSED_FILE = CONFIDENCE_WEIGHTS_FILE.replace(".json", ".proposed.json")
+
+
+def load_graded_rows(store, start=None, end=None):
+    """Yield (features, pace, hit) for every halftime feature row with a final in the store."""
+    finals_by_event = {}
+
+    for path in sorted(glob.glob(os.path.join(FEATURES_DIR, "*.jsonl"))):
+        day = os.path.basename(path).replace(".jsonl", "")
+        if (start and day < start) or (end and day > end):
+            continue
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                row = codec.loads(line)
+                event_id = row["event_id"]
+                if event_id not in finals_by_event:
+                    finals_by_event[event_id] = store.event_points(event_id)
+
+                final_pts = finals_by_event[event_id].get(row["norm"])
+                if final_pts is None:
+                    continue
+
+                # The market line the alert would have been graded on, when recorded
+                _, covered = grade_player_points(final_pts, row["avg"], row.get("line"))
+                if covered is None:
+                    continue                     # push on a whole-number line
+                yield row["features"], row["pace"], covered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit confidence weights to graded halftime outcomes.")
+    parser.add_argument("--start", help="first log day, YYYY-MM-DD")
+    parser.add_argument("--end", help="last log day, YYYY-MM-DD")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--step", type=float, default=GRID_STEP)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+
+    store = SeasonStore.open()
+    if store is None:
+        print("❌ No season store. Run scripts/ingest_boxscores.py first.")
+        return
+
+    rows = list(load_graded_rows(store, args.start, args.end))
+    if len(rows) < args.folds * 10:
+        print(f"❌ Only {len(rows)} graded samples; not enough to calibrate.")
+        return
+
+    X = to_matrix([r[0] for r in rows])
+    pace = np.array([r[1] for r in rows])
+    y = np.array([r[2] for r in rows], dtype=np.int8)
+
+    print(f"📊 {len(rows)} graded samples ({int(y.sum())} covers) loaded in {time.perf_counter() - t0:.2f}s")
+
+    fit = fit_weights(X, y, folds=args.folds, step=args.step, workers=args.workers)
+    trigger, record = fit_pace_trigger(pace, y)
+
+    w = np.array(list(fit["weights"].values()))
+    fired = pace < trigger
+    thresholds = fit_label_thresholds((X @ w)[fired] if fired.any() else X @ w)
+
+    proposal = {
+        "weights": fit["weights"],
+        "pace_trigger": trigger,
+        "points_thresholds": thresholds,
+        "samples": len(rows),
+        "train_auc": fit["train_auc"],
+        "cv_auc": fit["cv_auc"],
+        "fold_weight_std": fit["fold_weight_std"],
+        "pace_record": record,
+    }
+
+    # Pretty: this file is meant to be reviewed before it's adopted
+    codec.write(PROPOSED_FILE, proposal, pretty=True)
+
+    print(codec.dumps(proposal, pretty=True).decode())
+    print(f"💾 Wrote {PROPOSED_FILE} in {time.perf_counter() - t0:.2f}s. "
+          f"Rename to {CONFIDENCE_WEIGHTS_FILE} to adopt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+from app.closing_lines import capture_due
+from app.leagues import parse_leagues
+from app import odds_quota
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture each game's closing line just before tip-off.")
+    parser.add_argument("--leagues", default="nba", help="comma-separated, e.g. nba,wnba,ncaab")
+    parser.add_argument("--wait", action="store_true", help="keep running, sleeping until each capture, until the slate is done")
+    args = parser.parse_args()
+
+    leagues = parse_leagues(args.leagues)
+
+    while True:
+        upcoming = [t for t in (capture_due(league) for league in leagues) if t is not None]
+
+        if not upcoming:
+            print(f"✅ All closing lines handled. Odds quota remaining: {odds_quota.remaining()}")
+            return
+        if not args.wait:
+            print(f"⏭️ Next closing-line capture at {min(upcoming):%H:%M}Z.")
+            return
+
+        delay = max(0.0, (min(upcoming) - datetime.now(timezone.utc)).total_seconds())
+        print(f"💤 Sleeping {delay / 60:.1f} min until the next tip group.")
+        time.sleep(delay)
+
+
+if __name__ == "__main__":
+    main()
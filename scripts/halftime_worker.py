@@ -0,0 +1,117 @@
+import argparse
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from app import resilience
+from app.constants import WORKER_HEARTBEAT
+from app.engine import AlertEngine
+from app.join_table import JoinTable
+from app.providers import get_today_games
+from app.leagues import parse_leagues
+from app.leases import LeaseStore
+from app.profiling import Profiler
+
+# Long-running halftime worker
+#
+#   python -m scripts.halftime_worker --leagues nba,wnba     # run one per core / host
+#
+# Each worker heartbeats every WORKER_HEARTBEAT seconds, leases its share of
+# the live games (app/leases.py) and only watches those. A worker that dies or
+# hangs on an upstream stops renewing, so its games move to the others within
+# LEASE_TTL. At halftime the game is claimed exactly once before anything is
+# posted, so redundant workers (and the cron checker) never double-alert.
+# Posted games are also recorded in ProcessedStore, like the cron checker does.
+# While a tick is busy analyzing and posting, a side thread keeps heartbeating
+# so the worker's other leases don't lapse mid-halftime.
+
+
+def live_game_ids(games):
+    return [g.game_id for g in games if not g.is_final and (g.period or 0) >= 1]
+
+
+@contextmanager
+def heartbeating(store, interval):
+    """Renew store's leases every `interval` seconds from a side thread while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        # SQLite connections stay on their own thread: the side thread opens its own
+        side = LeaseStore(store.path, worker=store.worker, ttl=store.ttl)
+        try:
+            while not stop.wait(interval):
+                try:
+                    side.heartbeat()
+                except Exception as e:
+                    print(f"⚠️ Heartbeat failed: {e}")
+        finally:
+            side.close()
+
+    thread = threading.Thread(target=beat, name="heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def tick(store, engine, interval=WORKER_HEARTBEAT):
+    store.heartbeat()
+    jobs = []
+    joins = {}          # tonight's join tables, read once per tick
+
+    for league in engine.leagues:
+        with engine.context():
+            joins[league.key] = JoinTable(league)
+            games = get_today_games(league, joins[league.key])
+        held = set(store.acquire(live_game_ids(games), league.key))
+        jobs += [
+            (g, league) for g in games
+            if g.game_id in held and g.is_halftime and store.claim_halftime(g.game_id)
+        ]
+        if held:
+            print(f"[{datetime.now():%H:%M:%S}] {store.worker} watching {len(held)} {league.label} game(s).")
+
+    if jobs:
+        with heartbeating(store, interval):
+            done = engine.process_halftimes(jobs, joins)
+        if done:
+            engine.state.save(engine.state.load() | set(done))
+        print(f"✅ {store.worker} processed {len(done)} halftime(s).")
+        resilience.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease live games and post their halftime alerts.")
+    parser.add_argument("--leagues", default="nba", help="comma-separated, e.g. nba,wnba,ncaab")
+    parser.add_argument("--worker-id", default=None, help="defaults to <host>:<pid>")
+    parser.add_argument("--interval", type=float, default=WORKER_HEARTBEAT, help="seconds between heartbeats")
+    args = parser.parse_args()
+
+    leagues = parse_leagues(args.leagues)
+    store = LeaseStore(worker=args.worker_id)
+    store.prune(time.time() - 86400)
+    engine = AlertEngine(leagues, claims=store, prof=Profiler("halftime_worker"))
+    print(f"👷 Worker {store.worker} started ({', '.join(lg.label for lg in leagues)}).")
+
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                tick(store, engine, args.interval)
+            except Exception as e:
+                print(f"⚠️ Worker tick failed: {e}")
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("👋 Shutting down; releasing leases.")
+    finally:
+        engine.close()
+        store.leave()
+        resilience.save()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
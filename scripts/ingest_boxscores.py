@@ -0,0 +1,50 @@
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from app.espn_api import get_games_for_date, fetch_boxscore_players
+from app.season_store import SeasonStore, STORE_DIR
+from app.team_index import TeamIndex
+
+
+def ingest_date(store: SeasonStore, date_str: str, index: TeamIndex) -> int:
+    """Append every final boxscore on an ESPN date that isn't in the store yet."""
+    added = 0
+    for g in get_games_for_date(date_str):
+        if not g.is_final or store.has_event(g.game_id):
+            continue
+
+        players = fetch_boxscore_players(g.game_id)
+        if not players:
+            print(f"⚠️ No boxscore for {g.matchup} ({g.game_id}); will retry next run.")
+            continue
+
+        rows = store.append_game(g.game_id, players)
+        print(f"➕ {date_str} {g.matchup}: {rows} player rows")
+
+        for move in index.observe(players):
+            print(f"🔁 Roster change: {move}")
+        added += 1
+
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append final boxscores to the season store.")
+    parser.add_argument("--days", type=int, default=1, help="how many days back to ingest (default: yesterday)")
+    parser.add_argument("--path", default=STORE_DIR)
+    args = parser.parse_args()
+
+    store = SeasonStore.open_or_create(args.path)
+    index = TeamIndex()
+    today = datetime.now(timezone.utc)
+
+    added = 0
+    for back in range(args.days, 0, -1):
+        added += ingest_date(store, (today - timedelta(days=back)).strftime("%Y%m%d"), index)
+    index.save()
+
+    print(f"💾 Ingested {added} new games ({len(store.events)} total, {len(store.players)} players).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+from datetime import datetime, timedelta
+
+from app.leagues import parse_leagues
+from app.ledger import DIMENSIONS, Ledger, format_record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Win/loss record from the graded-picks ledger.")
+    parser.add_argument("--days", type=int, default=30, help="window ending yesterday (0 = whole ledger)")
+    parser.add_argument("--by", choices=DIMENSIONS, default="type")
+    parser.add_argument("--top", type=int, help="only show the N most-picked values")
+    parser.add_argument("--update", action="store_true", help="grade any finished days missing from the ledger first")
+    parser.add_argument("--leagues", default="nba", help="comma-separated, e.g. nba,wnba,ncaab")
+    args = parser.parse_args()
+
+    yesterday = (datetime.now() - timedelta(days=1)).date()
+    leagues = parse_leagues(args.leagues)
+    ledger = Ledger()
+    if args.update:
+        for league in leagues:
+            ledger.update(through=yesterday, league=league)
+
+    if args.days:
+        start = yesterday - timedelta(days=args.days - 1)
+        heading = f"Last {args.days} days by {args.by}"
+    else:
+        start = datetime.min.date()
+        heading = f"Season to date by {args.by}"
+
+    rows = ledger.record(start, yesterday, by=args.by, leagues=leagues)
+    if not rows:
+        print("⚠️ No graded picks in that window.")
+        return
+
+    print("\n".join(format_record(rows, heading, args.top)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,18 @@
+import argparse
 import os
 import sys
-import re
-import requests
 from datetime import datetime, timedelta
 
 # Ensure local app package is importable
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from app import http_client
+from app.discord_alert import webhook_upstream
 from app.keys import LOG_BOT_URL
-from app.espn_api import (
-    get_yesterday_games,
-    fetch_boxscore_players,
-    normalize_name,
-)
-from app.constants import SPREADS_CONFIDENCE_MAP, TOTAL_CONFIDENCE_MAP, POINTS_CONFIDENCE_MAP, REV_ESPN_TEAM_MAP
-
-def extract_phrases(conf_map):
-    phrases = []
-    for _, plist in conf_map:
-        phrases.extend(plist)
-    return phrases
-
-SPREAD_PHRASES = extract_phrases(SPREADS_CONFIDENCE_MAP)
-TOTAL_PHRASES = extract_phrases(TOTAL_CONFIDENCE_MAP)
-PLAYER_PHRASES = extract_phrases(POINTS_CONFIDENCE_MAP)
+from app.grading import Record, format_day, grade_day, iter_days
+from app.leagues import NBA, parse_leagues
+from app.ledger import Ledger
+from app.profiling import add_profiling_args, profiler_from_args
 
 def send_discord_message(content: str, title: str):
     data = {
@@ -34,273 +23,87 @@ def send_discord_message(content: str, title: str):
         }]
     }
     try:
-        r = requests.post(LOG_BOT_URL, json=data, timeout=10)
-        r.raise_for_status()
+        http_client.post_json(webhook_upstream(LOG_BOT_URL), LOG_BOT_URL, data, timeout=10)
         print("✅ Sent to Discord.")
     except Exception as e:
         print(f"❌ Discord send error: {e}")
 
-def read_yesterday_log():
-    filename = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d.log")
-    path = os.path.join("logs/performance_logs", filename)
-
-    if not os.path.exists(path):
-        return None, filename
 
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read().strip(), filename
-    
-def normalize_team(t):
-    # t = "NOP" from alert
-    t = t.upper()
-    # convert alert team to ESPN-format if needed
-    if t in REV_ESPN_TEAM_MAP:
-        return REV_ESPN_TEAM_MAP[t]   # "NOP" → "NO"
-    return t
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
 
-def get_final_results_map():
-    """Return dict keyed by (AWAY, HOME) with scores and event IDs."""
-    games = get_yesterday_games()
-    finals = {}
 
-    for g in games:
-        if g["status_name"] and "final" in g["status_name"].lower():
-            away = g["away_abbr"]
-            home = g["home_abbr"]
-            finals[(away, home)] = {
-                "away": g["away_score"],
-                "home": g["home_score"],
-                "game_id": g["game_id"],
-            }
+def evaluate_range(start, end, prof, league=NBA):
+    """Grade each day in [start, end]; returns (report lines, cumulative record, days graded)."""
+    single_day = start == end
+    output = [] if single_day else [f"📊 **Alert Evaluation {start} → {end}**", ""]
+    cumulative = Record()
+    days = 0
 
-    return finals
-
-def get_final_boxscores(finals):
-    """Load all final boxscores keyed by (AWAY, HOME)."""
-    boxscores = {}
-
-    for (away, home), info in finals.items():
-        event_id = info.get("game_id")
-        if not event_id:
-            boxscores[(away, home)] = {}
+    for day in iter_days(start, end):
+        with prof.stage("grade"):
+            graded = grade_day(day, league)
+        if graded is None:
             continue
 
-        players = fetch_boxscore_players(event_id)
-        boxscores[(away, home)] = {
-            normalize_name(p["name"]): p for p in players
-        }
-
-    return boxscores
-
-def build_spread_regex():
-    # Escape regex special characters in phrases
-    escaped = [re.escape(p) for p in SPREAD_PHRASES]
-    phrase_union = "|".join(escaped)
-
-    # Scoey's Take: <phrase> TEAM +/-X.X
-    return re.compile(
-        rf"Scoey's Take:\s*(?:{phrase_union})\s+([A-Z]{{2,3}})\s*([+-]?\d+\.\d+)",
-        re.I,
-    )
-
-def evaluate_spread(team, line, away, home, finals):
-    away = normalize_team(away)
-    home = normalize_team(home)
-
-    if (away, home) not in finals:
-        return "⚠️ No final found", None
-
-    home_score = finals[(away, home)]["home"]
-    away_score = finals[(away, home)]["away"]
-
-    # Determine if pick team was home or away
-    team_score = home_score if team == home else away_score
-    opp_score = away_score if team == home else home_score
-
-    # Margin from perspective of the picked team
-    margin = team_score - opp_score
-
-    # Adjusted result with the spread applied
-    # Bet wins if team_score + line > opp_score
-    adjusted = team_score + line - opp_score
-
-    if adjusted > 0:
-        covered = True
-        result = "✔️ Covered"
-    elif adjusted == 0:
-        covered = None  # push (unlikely with .5 lines)
-        result = "➖ Push"
-    else:
-        covered = False
-        result = "❌ Missed"
-
-    msg = (
-        f"{result}: Final margin was {margin:+} "
-        f"({away} {away_score} – {home} {home_score})"
-    )
-
-    return msg, covered
-
-
-def evaluate_total(direction, target, away, home, finals):
-    if (away, home) not in finals:
-        return "⚠️ No final found", None
-
-    home_score = finals[(away, home)]["home"]
-    away_score = finals[(away, home)]["away"]
-
-    total = home_score + away_score
-
-    if direction.lower() == "under":
-        hit = total < target
-        result = "✔️ Under hit" if hit else "❌ Under missed"
-    else:
-        hit = total > target
-        result = "✔️ Over hit" if hit else "❌ Over missed"
+        day_lines, record = format_day(day.isoformat(), graded)
+        cumulative.merge(record)
+        days += 1
 
-    msg = (
-        f"{result}: Final total was {total} "
-        f"({away} {away_score} – {home} {home_score})"
-    )
+        if single_day:
+            output.extend(day_lines)
+            output.extend(record.summary("Final Daily Summary"))
+        else:
+            output.append(f"**{day}:** {record.overall()}")
 
-    return msg, hit
-
-
-def evaluate_player(player_name, ht_pts, avg, away, home, finals, boxscores):
-    key = (away, home)
-    if key not in boxscores:
-        return "⚠️ No boxscore found", None
-
-    lookup = boxscores[key]
-    norm = normalize_name(player_name)
-
-    if norm not in lookup:
-        return f"⚠️ Final stats not found for {player_name}", None
-
-    final_pts = lookup[norm]["points"]
-
-    # Your “cover” rule:
-    # - if avg < 30: 85% of avg, rounded to a .5 line
-    # - else: flat 25.5 line
-    needed = int(avg * 0.85) - 0.5 if avg < 30 else 25.5
-
-    covered = final_pts >= needed
-    result = "✔️ Covered" if covered else "❌ Missed"
-
-    msg = f"Over {needed} {result}: Final pts {final_pts}"
-
-    return msg, covered
+    if days and not single_day:
+        output.extend(cumulative.summary(f"Cumulative Record ({days} days)"))
+    return output, cumulative, days
 
 
 def main():
-    log_content, log_filename = read_yesterday_log()
-    log_date = log_filename.replace(".log", "")
-    title = f"{log_date}'s Log"
-
-    if not log_content:
-        send_discord_message("⚠️ No log file or empty.", title)
-        return
-
-    # Build regex once
-    SPREAD_REGEX = build_spread_regex()
-
-    # ---- Load finals & boxscores ----
-    finals = get_final_results_map()
-    boxscores = get_final_boxscores(finals)
-
-    # ---- Record tracking ----
-    spread_hits = 0
-    spread_misses = 0
-    total_hits = 0
-    total_misses = 0
-    player_hits = 0
-    player_misses = 0
-
-    output = [f"📊 **Alert Evaluation for {log_date}**"]
-    blocks = re.split(r"Halftime Alerts for ", log_content)[1:]
-
-    for block in blocks:
-        header_line = block.split("\n")[0]
-        matchup = header_line.replace(":", "").strip()
-        away, _, home = matchup.partition("@")
-        away = away.strip()
-        home = home.strip()
-
-        output.append(f"\n### 🏀 {away} @ {home}")
-
-        # ------- Spread -------
-        spread_match = SPREAD_REGEX.search(block)
-        if spread_match:
-            team = normalize_team(spread_match.group(1))
-            line = float(spread_match.group(2))
-            msg, hit = evaluate_spread(team, line, away, home, finals)
-            output.append(f"- **Spread Pick:** {team} {line:+} → {msg}")
-
-            if hit is True:
-                spread_hits += 1
-            elif hit is False:
-                spread_misses += 1
-
-        # ------- Totals -------
-        # We can still just detect Over/Under directly; phrases don't matter here
-        total_match = re.search(r"Under\s+(\d+\.\d+)|Over\s+(\d+\.\d+)", block, re.I)
-        if total_match:
-            under = total_match.group(1)
-            over = total_match.group(2)
-
-            if under:
-                msg, hit = evaluate_total("under", float(under), away, home, finals)
-                output.append(f"- **Total Pick:** Under {under} → {msg}")
-                if hit is True:
-                    total_hits += 1
-                elif hit is False:
-                    total_misses += 1
-
-            if over:
-                msg, hit = evaluate_total("over", float(over), away, home, finals)
-                output.append(f"- **Total Pick:** Over {over} → {msg}")
-                if hit is True:
-                    total_hits += 1
-                elif hit is False:
-                    total_misses += 1
-
-        # ------- Player -------
-        player_match = re.findall(
-            r"🎯 ([A-Za-z .'-]+): (\d+) pts.*?avg (\d+\.\d+)",
-            block,
-        )
-        for name, pts, avg in player_match:
-            pts = int(pts)
-            avg = float(avg)
+    parser = argparse.ArgumentParser(description="Grade halftime alerts against final results.")
+    parser.add_argument("--start", type=parse_date, help="first log date (YYYY-MM-DD); default yesterday")
+    parser.add_argument("--end", type=parse_date, help="last log date (YYYY-MM-DD); default --start")
+    parser.add_argument("--days", type=int, help="grade the last N days ending yesterday")
+    parser.add_argument("--no-send", action="store_true", help="print the report instead of posting it")
+    parser.add_argument("--leagues", default="nba", help="comma-separated, e.g. nba,wnba,ncaab")
+    add_profiling_args(parser)
+    args = parser.parse_args()
+
+    yesterday = (datetime.now() - timedelta(days=1)).date()
+    if args.days:
+        start, end = yesterday - timedelta(days=args.days - 1), yesterday
+    else:
+        start = args.start or yesterday
+        end = args.end or start
 
-            msg, hit = evaluate_player(name, pts, avg, away, home, finals, boxscores)
-            output.append(f"- **Player:** {name} → {msg}")
+    with profiler_from_args("log_alerts", args) as prof:
+        ledger = Ledger()
+        for league in parse_leagues(args.leagues):
+            run(start, end, args.no_send, prof, league)
 
-            if hit is True:
-                player_hits += 1
-            elif hit is False:
-                player_misses += 1
+            # Fold newly finished days into the season ledger (finals are cached by now)
+            with prof.stage("ledger"):
+                ledger.update(through=yesterday, league=league)
 
-    # ---- FINAL SUMMARY ----
-    total_hits_all = spread_hits + total_hits + player_hits
-    total_misses_all = spread_misses + total_misses + player_misses
-    total_all = total_hits_all + total_misses_all
 
-    winrate = (total_hits_all / total_all * 100) if total_all > 0 else 0.0
+def run(start, end, no_send, prof, league=NBA):
+    title = f"{start}'s Log" if start == end else f"{start} → {end} Log"
+    if league is not NBA:
+        title = f"{league.label} {title}"
 
-    summary = [
-        "\n\n🏁 **Final Daily Summary**",
-        f"**Overall Record:** {total_hits_all}–{total_misses_all} ({winrate:.1f}%)",
-        "",
-        f"📊 **Spreads:** {spread_hits}–{spread_misses}",
-        f"📈 **Totals:** {total_hits}–{total_misses}",
-        f"🎯 **Player Props:** {player_hits}–{player_misses}",
-    ]
+    output, _, days = evaluate_range(start, end, prof, league)
+    final_message = "\n".join(output) if days else "⚠️ No log file or empty."
 
-    output.extend(summary)
+    with prof.stage("send"):
+        if no_send:
+            print(final_message)
+        else:
+            send_report(final_message, title)
 
-    final_message = "\n".join(output)
 
+def send_report(final_message, title):
     if len(final_message) < 1900:
         send_discord_message(final_message, title)
     else:
@@ -309,4 +112,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
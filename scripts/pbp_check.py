@@ -0,0 +1,45 @@
+import argparse
+
+from app.espn_api import fetch_boxscore_players
+from app.leagues import get_league
+from app.pbp import PlayByPlay
+
+# Compare play-by-play stat lines with ESPN's boxscore for one event
+#
+#   python -m scripts.pbp_check 401810077            # e.g. at halftime
+#
+# Points and FGA should match exactly; minutes within a minute (the boxscore
+# rounds, and a player idle for a whole period is only seen at their next play).
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check play-by-play stat lines against the boxscore.")
+    parser.add_argument("event_id")
+    parser.add_argument("--league", default="nba")
+    args = parser.parse_args()
+
+    league = get_league(args.league)
+    box = {p.id: p for p in fetch_boxscore_players(args.event_id, league)}
+
+    pbp = PlayByPlay(args.event_id, league)
+    pbp.seed(list(box.values()))
+    print(f"📥 {pbp.update()} new plays ({pbp.count} total, period {pbp.period}).")
+    pbp.save()
+
+    mismatches = 0
+    for line in pbp.lines():
+        ref = box.get(line.id)
+        if ref is None:
+            continue
+        if (line.points, line.fga) != (ref.points, ref.fga) or abs(line.minutes - ref.minutes) > 1:
+            mismatches += 1
+            print(
+                f"⚠️ {line.name}: pbp {line.points} pts, {line.fga} FGA, {line.minutes_display} min"
+                f" | box {ref.points} pts, {ref.fga} FGA, {ref.minutes_display} min"
+            )
+
+    print("✅ Play-by-play matches the boxscore." if not mismatches else f"❌ {mismatches} player(s) differ.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app import resilience
+from app.constants import LIVE_POLL_INTERVAL
+from app.leagues import parse_leagues
+from app.live_tracker import format_update, pending, poll
+from scripts.log_alerts import send_report
+
+# Second-half tracker for alerted games
+#
+#   python -m scripts.track_live             # one poll (cron, every few minutes)
+#   python -m scripts.track_live --wait      # keep polling until every alerted game is final
+#
+# Only the events that produced a halftime alert are polled. Each game is
+# graded the moment it goes final and the night's running record is posted.
+# Yesterday is checked too, for games that were still live at midnight.
+
+
+def tracked_days():
+    today = datetime.now().date()
+    return [today - timedelta(days=1), today]
+
+
+def poll_once(leagues, no_send) -> int:
+    """Poll every league/day once; returns how many tracked games are still live."""
+    live = 0
+    for league in leagues:
+        for day in tracked_days():
+            if not pending(day, league):
+                continue
+
+            finished = poll(day, league)
+            if finished:
+                message = format_update(finished, day, league)
+                title = f"🏀 {league.label} Live Grades ({day})"
+                if no_send:
+                    print(f"{title}\n{message}")
+                else:
+                    send_report(message, title)
+            live += len(pending(day, league))
+    return live
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade alerted picks as their games go final.")
+    parser.add_argument("--leagues", default="nba", help="comma-separated, e.g. nba,wnba,ncaab")
+    parser.add_argument("--wait", action="store_true", help="keep polling until every alerted game is final")
+    parser.add_argument("--no-send", action="store_true", help="print updates instead of posting them")
+    args = parser.parse_args()
+
+    leagues = parse_leagues(args.leagues)
+
+    while True:
+        live = poll_once(leagues, args.no_send)
+        resilience.save()
+
+        if not live:
+            print("✅ No alerted games in progress.")
+            return
+        if not args.wait:
+            print(f"⏳ {live} alerted game(s) still in progress.")
+            return
+
+        print(f"💤 {live} alerted game(s) still in progress; next poll in {LIVE_POLL_INTERVAL}s.")
+        time.sleep(LIVE_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
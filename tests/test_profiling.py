@@ -0,0 +1,27 @@
+import pstats
+
+from app import profiling
+from app.engine import AlertEngine, ProcessedStore
+from app.profiling import Profiler
+
+
+def _square(x):
+    return x * x
+
+
+def test_profiled_submit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+
+    prof = Profiler("test", enabled=True)
+    engine = AlertEngine(state=ProcessedStore(str(tmp_path / "processed.json")), prof=prof, max_workers=2)
+    try:
+        with prof:
+            results = [f.result() for f in [engine._submit(_square, n) for n in range(4)]]
+    finally:
+        engine.close()
+
+    assert results == [0, 1, 4, 9]
+    (dump,) = (tmp_path / "profiles").glob("test-*.prof")
+    functions = {name for _, _, name in pstats.Stats(str(dump)).stats}
+    assert "_square" in functions